@@ -0,0 +1,160 @@
+import re
+import threading
+
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIBeliefSystem
+
+
+_word = re.compile(r"\w+")
+
+# words that do not narrow a description down
+_stopwords = frozenset(("a", "an", "the", "and", "with", "of", "is", "that", "this"))
+
+
+def _tokens(value, name: str = "") -> set:
+    # the words of the values, attribute names are not indexed. a flag (a boolean
+    # attribute) that is set is described by its name, e.g., {"presence": True}
+    if isinstance(value, bool):
+        return set(_word.findall(name.lower())) if value else set()
+    if isinstance(value, dict):
+        tokens = set()
+        for k, v in value.items():
+            tokens.update(_tokens(v, str(k)))
+        return tokens
+    if isinstance(value, (list, tuple, set, frozenset)):
+        tokens = set()
+        for v in value:
+            tokens.update(_tokens(v, name))
+        return tokens
+    if value is None:
+        return set()
+    return set(_word.findall(str(value).lower()))
+
+
+class InMemoryBeliefSystem(HRIBeliefSystem):
+    """
+    Reference in-memory implementation of the HRIBeliefSystem interface.
+
+    Persons, objects and robots are kept in per-type id maps, together with an inverted index
+    from the tokens of their attribute values to their ids, so get() answers a description by
+    intersecting the id sets of its words instead of scanning every stored item.
+    Attribute names are not indexed, except the names of the boolean attributes that are set.
+
+    get("person", "presence") returns every person whose presence is set,
+    get("bottle", "beautiful red") returns every object that is a bottle, beautiful and red.
+
+    Descriptions containing words the index has never seen (e.g., "the bottle with my favorite color")
+    cannot be resolved by the index, these are passed to the optional fallback callable
+    fallback(type, description, candidates) -> list, typically backed by an LLM, together with
+    the items of the requested type that match the words the index does know. Without a fallback such queries return an empty list.
+
+    Returned items are shallow copies of the stored dictionaries.
+    """
+
+    kinds = ("person", "object", "robot")
+
+    def __init__(self, fallback=None) -> None:
+        self.fallback = fallback
+        self._items = {kind: dict() for kind in self.kinds}     # kind -> id -> item
+        self._tokens = {kind: dict() for kind in self.kinds}    # kind -> id -> tokens
+        self._index = {kind: dict() for kind in self.kinds}     # kind -> token -> ids
+        self._robot_id = None
+        self._lock = threading.RLock()
+
+
+    def __getstate__(self) -> dict:
+        # picklable for handlers running in a process pool, the lock is not shared
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+
+    def _update(self, kind: str, info: dict):
+        item_id = info["id"]
+        with self._lock:
+            item = self._items[kind].get(item_id)
+            if item is None:
+                item = self._items[kind][item_id] = dict(info)
+            else:
+                item.update(info)
+
+            index = self._index[kind]
+            old = self._tokens[kind].get(item_id, set())
+            new = _tokens(item)
+            for token in old - new:
+                ids = index[token]
+                ids.discard(item_id)
+                if not ids:
+                    del index[token]
+            for token in new - old:
+                index.setdefault(token, set()).add(item_id)
+            self._tokens[kind][item_id] = new
+
+
+    def updateRobotInfo(self, robot: dict):
+        self._update("robot", robot)
+        self._robot_id = robot["id"]
+
+
+    def updatePersonInfo(self, person: dict):
+        self._update("person", person)
+
+
+    def updateObjectInfo(self, object: dict):
+        self._update("object", object)
+
+
+    def remove(self, type: str, id):
+        with self._lock:
+            self._items[type].pop(id, None)
+            index = self._index[type]
+            for token in self._tokens[type].pop(id, ()):
+                ids = index[token]
+                ids.discard(id)
+                if not ids:
+                    del index[token]
+
+
+    def get(self, type: str, description: str) -> list:
+        kind = type if type in self.kinds else "object"
+        words = [w for w in _word.findall(description.lower()) if w not in _stopwords]
+        if kind != type:
+            # an object label, e.g., "bottle"
+            words.extend(_word.findall(type.lower()))
+
+        with self._lock:
+            items = self._items[kind]
+            index = self._index[kind]
+            if not words:
+                return [dict(item) for item in items.values()]
+
+            known = [w for w in words if w in index]
+            if len(known) < len(words) and self.fallback is None:
+                return []
+
+            ids = None
+            if known:
+                # smallest posting first, so the intersection shrinks as fast as possible
+                postings = sorted((index[w] for w in known), key=len)
+                ids = set(postings[0])
+                for posting in postings[1:]:
+                    ids &= posting
+                    if not ids:
+                        break
+            if len(known) == len(words):
+                return [dict(items[item_id]) for item_id in ids]
+
+            # the remaining words are left to the fallback, among the items matching the known ones
+            candidates = [dict(item) for item in (items.values() if ids is None else map(items.get, ids))]
+
+        return self.fallback(type, description, candidates)
+
+
+    def getRobot(self) -> dict:
+        with self._lock:
+            robot = self._items["robot"].get(self._robot_id)
+            return dict(robot) if robot is not None else None
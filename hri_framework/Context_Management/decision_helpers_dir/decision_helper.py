@@ -1,5 +1,15 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIRequest
+from collections import OrderedDict
+import functools
+import threading
+from typing import TYPE_CHECKING
+
+from hri_framework.Context_Management import instrumentation
+
+if TYPE_CHECKING:
+    from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIRequest
 
 
 class Decision:
@@ -7,6 +17,9 @@ class Decision:
     # speedFactor   = a value 0..2 affecting the speed of actions, i.e., speed --> speed*value
     # emotion       = a string depcting the emotion of the robot, may affect face displays or LLM messages
     # reason        = a string explaining the reason
+    # decisions may be cached and shared between callers, treat them as immutable
+    __slots__ = ("go", "speedFactor", "emotion", "reason")
+
     def __init__(self,go:bool, speedFactor:float, emotion:str, reason:str) -> None:
         self.go=go # go / no go
         self.speedFactor=speedFactor
@@ -14,10 +27,59 @@ class Decision:
         self.reason=reason
 
 class DecisionHelper(ABC):
+    # the decision cache of each DecisionHelper class: subject -> (version, Decision),
+    # least recently used first, guarded by _decisions_lock. it keeps at most max_decisions subjects
+    _decisions = OrderedDict()
+    _decisions_lock = threading.Lock()
+    max_decisions = 1000
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._decisions = OrderedDict()
+        cls._decisions_lock = threading.Lock()
+        instrumentation.register(cls, "decision_helper")
+
     @abstractmethod
     def copy(self):
         pass
 
+    def decision_key(self, req:HRIRequest):
+        # helpers that know when their answer changes return (subject, version),
+        # e.g., (person, availability version), to have decide() memoized by cached_decision.
+        # None means the decision for this request is not cached
+        return None
+
     @abstractmethod
     def decide(self, req:HRIRequest) -> Decision: 
-        pass
\ No newline at end of file
+        pass
+
+
+def cached_decision(decide):
+    ##
+    # memoizes a DecisionHelper.decide implementation on decision_key(req).
+    # only the decision of the latest version of each subject is kept, so the
+    # cache is invalidated exactly when the subject's version changes. the least
+    # recently used subjects are dropped beyond max_decisions.
+    # cached Decision objects are shared and must not be modified.
+    # decide runs outside the cache lock, concurrent misses may both compute the decision.
+    #
+    @functools.wraps(decide)
+    def wrapper(self, req):
+        key = self.decision_key(req)
+        if key is None:
+            return decide(self, req)
+        subject, version = key
+        decisions = self._decisions
+        with self._decisions_lock:
+            cached = decisions.get(subject)
+            if cached is not None and cached[0] == version:
+                decisions.move_to_end(subject)
+                return cached[1]
+        decision = decide(self, req)
+        with self._decisions_lock:
+            decisions[subject] = (version, decision)
+            decisions.move_to_end(subject)
+            while len(decisions) > self.max_decisions:
+                decisions.popitem(last=False)
+        return decision
+    return wrapper
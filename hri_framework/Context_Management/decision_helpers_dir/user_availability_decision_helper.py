@@ -1,7 +1,17 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from decision_helper import DecisionHelper
-from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision, cached_decision
 from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
 
+if TYPE_CHECKING:
+    from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIRequest
+
+
+_NO_PERSON = Decision(False, 0, "neutral", "You did not specify a person")
+
 
 ##
 # @brief This class is a decision helper that checks if a user is available
@@ -10,18 +20,33 @@ class UserAvailabilityDecisionHelper(DecisionHelper):
 
 
     def copy(self):
-        pass
+        # the decision cache is kept per class, copies share it
+        return type(self)()
+
+
+    def _hri_id(self, person):
+        return person["id"] if isinstance(person, dict) else person
+
+
+    def decision_key(self, req: HRIRequest):
+        if req.person is None:
+            return None
+        hri_id = self._hri_id(req.person)
+        return (hri_id, AvailabilityManager().version(hri_id))
 
 
+    @cached_decision
     def decide(self, req: HRIRequest) -> Decision:
 
         # TODO: need to extract the person for which availability check is needed
         person = req.person
 
         if person is None:
-            return Decision(False, 0, "neutral", "You did not specify a person")
+            return _NO_PERSON
 
-        if AvailabilityManager().is_available(person):
+        # the scores are evaluated on read, at the time of the request
+        hri_id = self._hri_id(person)
+        if AvailabilityManager().is_available(hri_id):
             return Decision(True, 0, "neutral", f"{person} is available")
 
         return Decision(False, 0, "neutral", f"{person} is not available")
@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from hri_framework.Context_Management.event_handlers_dir.event_handlers import EventHandler, AsyncEventHandler
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequestHandler, AsyncHRIRequestHandler
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+
+logger = logging.getLogger(__name__)
+
+
+##
+# @brief The outcome of a single dispatched handler call
+#
+class DispatchResult:
+
+    __slots__ = ("handler", "response", "error", "timed_out", "cancelled", "elapsed")
+
+    def __init__(self, handler, response=None, error: BaseException | None = None,
+                 timed_out: bool = False, cancelled: bool = False, elapsed: float = 0.0) -> None:
+        self.handler = handler
+        self.response = response
+        self.error = error
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+        self.elapsed = elapsed
+
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out and not self.cancelled
+
+
+##
+# @brief Runs independent event / request handlers concurrently on an asyncio loop
+#
+# async handlers (AsyncEventHandler, AsyncHRIRequestHandler) are awaited on the
+# loop, sync handlers run on the dispatcher's thread pool, so a slow LLM
+# round-trip does not stall presence updates or short responses.
+# every call is bounded by the handler's timeout (or the dispatcher's default).
+# a sync handler that times out or is cancelled keeps running on its worker
+# thread, but its result is discarded.
+#
+# with process_workers, sync handlers whose class sets process = True run in a
+# process pool instead, out of the way of the presence tracking loop's GIL.
+# the AvailabilityManager then publishes its state to shared memory after every
+# frame, and the workers' AvailabilityManager reads it from there (see
+# AvailabilityManager.attach()). timeouts and result order are the same as for
+# threads, a worker that timed out finishes its call before taking the next one.
+#
+class AsyncDispatcher:
+
+    def __init__(self, max_workers: int | None = None, default_timeout: float | None = None,
+                 process_workers: int | None = None) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hri-handler")
+        self.default_timeout = default_timeout
+        self.process_executor = None
+        if process_workers:
+            from concurrent.futures import ProcessPoolExecutor
+
+            snapshot = AvailabilityManager.publish()
+            self.process_executor = ProcessPoolExecutor(max_workers=process_workers, initializer=AvailabilityManager.attach,
+                                                        initargs=(snapshot.name,))
+        self._tasks = set()
+
+
+    def _executor(self, handler):
+        if getattr(handler, "process", False) and self.process_executor is not None:
+            return self.process_executor
+        return self.executor
+
+
+    def handle(self, handler: EventHandler, beliefSystem) -> asyncio.Task:
+        if isinstance(handler, AsyncEventHandler):
+            call = handler.handleAsync(beliefSystem)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(self._executor(handler), handler.handle, beliefSystem)
+        return self._start(handler, call)
+
+
+    def handle_request(self, handler: HRIRequestHandler, request, beliefSystem) -> asyncio.Task:
+        if isinstance(handler, AsyncHRIRequestHandler):
+            call = handler.handle_request_async(request, beliefSystem)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(self._executor(handler), handler.handle_request, request, beliefSystem)
+        return self._start(handler, call)
+
+
+    async def gather(self, *tasks: asyncio.Task) -> list:
+        ##
+        # waits for the given calls, results are returned in the order of the calls
+        #
+        return list(await asyncio.gather(*tasks))
+
+
+    def cancel(self) -> int:
+        ##
+        # cancels every call still in flight, returns how many were cancelled
+        #
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+
+    def shutdown(self, wait: bool = False):
+        self.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        if self.process_executor is not None:
+            self.process_executor.shutdown(wait=wait, cancel_futures=True)
+
+
+    def _start(self, handler, call) -> asyncio.Task:
+        task = asyncio.ensure_future(self._run(handler, call))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+    async def _run(self, handler, call) -> DispatchResult:
+        timeout = handler.timeout if handler.timeout is not None else self.default_timeout
+        start = time.perf_counter()
+        result = DispatchResult(handler)
+        try:
+            result.response = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s timed out after %s seconds", type(handler).__name__, timeout)
+            result.timed_out = True
+        except asyncio.CancelledError:
+            result.cancelled = True
+        except Exception as e:
+            logger.exception("%s failed", type(handler).__name__)
+            result.error = e
+        result.elapsed = time.perf_counter() - start
+        return result
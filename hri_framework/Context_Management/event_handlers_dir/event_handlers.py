@@ -1,27 +1,115 @@
-import math
-from ament_index_python.packages import get_package_share_directory
+from __future__ import annotations
 
-from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIRequest,HRIResponse, HRIBeliefSystem
-from hri_framework.HRI_LIB.hri_types.hri_action import HRIAction
+import math
+from typing import TYPE_CHECKING
 
-from hri_framework.Context_Management.HRI_DB import HRI_DB
+if TYPE_CHECKING:
+    from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIRequest,HRIResponse, HRIBeliefSystem
+    from hri_framework.HRI_LIB.hri_types.hri_action import HRIAction
+    from hri_framework.HRI_LIB.hri_interfaces.llm import LLM
 
-from hri_framework.HRI_LIB.hri_interfaces.llm import LLM
+from hri_framework.Context_Management.event_handlers_dir.pattern_matcher import compile_pattern, PatternMatcher
+from hri_framework.Context_Management.event_handlers_dir.value_template import parse_template
+from hri_framework.Context_Management.event_handlers_dir.symbol_table import SymbolTable
+from hri_framework.Context_Management.event_handlers_dir.llm_cache import ResponseCache, CachedLLM
+from hri_framework.Context_Management import instrumentation, registry
 
 
 from abc import ABC, abstractmethod
-import re
 import json
 import os
 import importlib
-import string
+import logging
+import threading
 
 
 msgGen=True
 
-tempSymbolTable=dict()
+logger=logging.getLogger(__name__)
+
+# heavy dependencies are imported on first use, which keeps importing the
+# EventHandler base class cheap. they remain importable from this module.
+_lazyImports={
+    "get_package_share_directory": "ament_index_python.packages",
+    "HRIRequest": "hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers",
+    "HRIResponse": "hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers",
+    "HRIBeliefSystem": "hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers",
+    "HRIAction": "hri_framework.HRI_LIB.hri_types.hri_action",
+    "HRI_DB": "hri_framework.Context_Management.HRI_DB",
+    "LLM": "hri_framework.HRI_LIB.hri_interfaces.llm",
+}
+
+def __getattr__(name):
+    module=_lazyImports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value=getattr(importlib.import_module(module),name)
+    globals()[name]=value
+    return value
+
+##
+# @brief Marks a sub handler that is still shared with the prototype it was cloned from
+#
+class _Inherited:
+    __slots__=("handler",)
+
+    def __init__(self,handler) -> None:
+        self.handler=handler
+
+
+def _subHandler(name,scoped=True):
+    # sub handlers (ack, on failure, on success, social planner) of a clone are
+    # only copied from the prototype when they are first accessed.
+    # scoped sub event handlers share one fork of their parent's symbol table, see subScope()
+    attr="_"+name
+
+    def get(self):
+        h=self.__dict__[attr]
+        if type(h) is _Inherited:
+            h=h.handler.copy(self.subScope()) if scoped else h.handler.copy()
+            self.__dict__[attr]=h
+        return h
+
+    def set(self,h):
+        self.__dict__[attr]=h
+
+    return property(get,set)
+
 
 class EventHandler(ABC):
+    """
+    Handlers configured from the hri_config.json file act as prototypes, every request
+    works on a copy(). copies are copy-on-write: the values dict is shared with the
+    prototype until the copy writes to it (or hands it out through the values property),
+    and sub handlers are cloned only when first accessed, so copying costs the same
+    regardless of the depth of the handler chain.
+    prototypes must therefore not be modified once they are being copied.
+
+    symbols set and read by setValues / updateParameters live in the handler's SymbolTable.
+    copying a prototype starts a new interaction with its own table (a fork of the prototype's
+    table, if it has one), copying a handler that already belongs to an interaction shares its
+    table. the sub handlers of a handler share one fork of its table: a symbol set by ack is
+    seen by ons / onf, while the handler itself does not see the symbols its sub handlers set.
+    """
+
+    # seconds the AsyncDispatcher waits for this handler, None waits forever
+    timeout=None
+    # run by the AsyncDispatcher's process pool (when it has one) instead of a thread,
+    # for CPU bound handlers. the handler and the belief system are pickled for every call
+    process=False
+
+    ack=_subHandler("ack")
+    onf=_subHandler("onf")
+    ons=_subHandler("ons")
+    socialPlanner=_subHandler("socialPlanner",scoped=False)
+
+    # set on copies, which belong to an interaction
+    _interaction=False
+    _subScope=None
+
+    def __init_subclass__(cls,**kwargs):
+        super().__init_subclass__(**kwargs)
+        instrumentation.register(cls,"event_handler")
 
     def __init__(self) -> None:
         self.values=dict()
@@ -35,17 +123,50 @@ class EventHandler(ABC):
         self.emotion="natural"
         self.id=0
         self.handled = False  # Add this flag
+        self.symbols=None
+
+    @property
+    def values(self) -> dict:
+        # the caller may modify the dict, so a shared one is materialized first
+        if not self._ownValues:
+            self._values=self._values.copy()
+            self._ownValues=True
+        return self._values
+
+    @values.setter
+    def values(self,values:dict):
+        self._values=values
+        self._ownValues=True
     
-    def copy(self):
+    def scope(self) -> SymbolTable:
+        if self.symbols is None:
+            self.symbols=SymbolTable()
+        return self.symbols
+
+    def subScope(self) -> SymbolTable:
+        # the scope the sub handlers share and write to
+        if self._subScope is None:
+            self._subScope=self.scope().fork()
+        return self._subScope
+
+    def copy(self,symbols:SymbolTable=None):
         n=type(self)()
-        n.values=self.values.copy()
+        if symbols is None:
+            if self._interaction:
+                symbols=self.scope()
+            else:
+                symbols=self.symbols.fork() if self.symbols is not None else SymbolTable()
+        n.symbols=symbols
+        n._interaction=True
+        n._values=self._values
+        n._ownValues=False
         #n.futures=self.futures.copy()
         n.match=self.match
 
-        n.ack=self.ack.copy() if self.ack!=None else None
-        n.onf=self.onf.copy() if self.onf!=None else None
-        n.ons=self.ons.copy() if self.ons!=None else None
-        n.socialPlanner= self.socialPlanner.copy() if self.socialPlanner!=None else None        
+        d=n.__dict__
+        for attr in ("_ack","_onf","_ons","_socialPlanner"):
+            h=self.__dict__[attr]
+            d[attr]=h if h is None or type(h) is _Inherited else _Inherited(h)
         n.person=self.person
         n.emotion=self.emotion
         return n
@@ -53,11 +174,9 @@ class EventHandler(ABC):
                 
 
     def setValues(self,values):
-        global tempSymbolTable
-        for k,v in values.items():
-            tempSymbolTable[k]=v
+        self.scope().update(values)
 
-        if self.values==None or len(self.values)==0:
+        if self._values==None or len(self._values)==0:
             self.values=values
         # else:
         #     print("self...")
@@ -79,37 +198,29 @@ class EventHandler(ABC):
     #         handler.person=self.person
     
     def updateParameters(self):
-        global tempSymbolTable
-        futures=tempSymbolTable
+        futures=self.scope()
         # for k,v in futures.items():
         #     self.values[k]=v
 
-        print(f"\tsymtable {futures}")
-        print(f"\tbefore values {self.values}")
+        debug=logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("\tsymtable %s", futures)
+            logger.debug("\tbefore values %s", self.values)
         for k,v in self.values.items():
-            if v in futures.keys():
+            if v in futures:
                 self.values[k]=futures[v]
             else:
-                text=v
-                # Define punctuation to strip (exclude { and })
-                punctuation_to_strip = string.punctuation.replace("{", "").replace("}", "")
-                # Replace words in the text based on futures
-                text = ' '.join([
-                    futures[w.strip(punctuation_to_strip)] if w.strip(punctuation_to_strip) in futures and futures[w.strip(punctuation_to_strip)] is not None else w
-                    for w in text.split()
-                ])
-                self.values[k]=text
-        print(f"\tafter values {self.values}")
-
-    def extractValues(self,pattern:str,input:str):        
-        regex_pattern = re.sub(r'\{(\w+)\}', r'(?P<\1>.+)', pattern)
-        placeholders = re.findall(r'\{(\w+)\}', pattern)
-        # Match the input string against the regex pattern
-        match = re.match(regex_pattern, input)
-        if match:
+                # Replace words in the text based on futures, see value_template.py
+                self.values[k]=parse_template(v).substitute(futures)
+        if debug:
+            logger.debug("\tafter values %s", self.values)
+
+    def extractValues(self,pattern:str,input:str):
+        # patterns are translated and compiled once, see pattern_matcher.py
+        values = compile_pattern(pattern).extract(input)
+        if values is not None:
             # Populate self.values with placeholder keys and corresponding matched values
-            self.values = {f'{{{name}}}': value for name, value in zip(placeholders, match.groups())}
-            
+            self.values = values
             self.match = True
         else:
             # Clear values and set match to False if there's no match
@@ -120,6 +231,12 @@ class EventHandler(ABC):
     def handle(self,beliefSystem:HRIBeliefSystem) -> HRIResponse:
         pass
 
+    async def handleAsync(self,beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        # sync handlers run on the loop's executor, so they do not block the loop
+        import asyncio
+        loop=asyncio.get_running_loop()
+        return await loop.run_in_executor(None,self.handle,beliefSystem)
+
 
     def setAck(self,ack):        
         self.ack=ack
@@ -134,65 +251,190 @@ class EventHandler(ABC):
         self.socialPlanner=socialPlanner
 
     def setPerson(self, person):
-        print(f"Setting person: {person}")  # Debug print
+        logger.debug("Setting person: %s", person)
         self.person = person  # Fix the typo from self.perosn to self.person
 
     def setFutures(self, f:dict):
         self.futures=f
 
 
+##
+# @brief Base class for handlers that are natively asynchronous (e.g., waiting on an LLM)
+#
+class AsyncEventHandler(EventHandler):
+    _instrument=False  # only its subclasses are timed
+
+    @abstractmethod
+    async def handleAsync(self,beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        pass
+
+    def handle(self,beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        # for sync callers, from a thread that has no running event loop
+        import asyncio
+        return asyncio.run(self.handleAsync(beliefSystem))
+
+
+##
+# @brief Routes an input to the configured handler whose trigger it matches, in a single pass
+#
+# the triggers of all the handlers are merged into one PatternMatcher (see pattern_matcher.py),
+# so an utterance is matched once whatever the number of handlers, with the result of calling
+# extractValues on every handler in turn and taking the first match.
+# a handler is added as a prototype, or as the "code" of its class in the config, which is
+# resolved through registry.event_handlers the first time one of its triggers matches.
+#
+class EventHandlerDispatcher:
+
+    def __init__(self) -> None:
+        self.matcher=PatternMatcher()
+        self._prototypes=dict()  # code -> prototype
+        self._lock=threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.matcher)
+
+    def add(self,trigger:str,handler) -> None:
+        self.matcher.add(trigger,handler)
+
+    def addConfig(self,entries:list) -> None:
+        # the "event handlers" entries of the config, in their order. entries whose handler
+        # is an "event" / "events" list are expanded by the toolkit, not dispatched here
+        for entry in entries:
+            code=entry.get("handler",{}).get("code")
+            if code is None:
+                continue
+            triggers=[entry["system trigger"]] if "system trigger" in entry else []
+            for trigger in triggers+entry.get("verbal triggers",[]):
+                self.add(trigger,code)
+
+    def _prototype(self,handler) -> EventHandler:
+        if not isinstance(handler,str):
+            return handler
+        prototype=self._prototypes.get(handler)
+        if prototype is None:
+            with self._lock:
+                prototype=self._prototypes.get(handler)
+                if prototype is None:
+                    prototype=self._prototypes[handler]=registry.event_handlers.get(handler)()
+        return prototype
+
+    def dispatch(self,input:str) -> EventHandler | None:
+        ##
+        # a copy of the first handler whose trigger matches input, holding the extracted values, or None
+        #
+        found=self.matcher.match(input)
+        if found is None:
+            return None
+        handler,_,values=found
+        handler=self._prototype(handler).copy()
+        handler.values=values
+        handler.match=True
+        return handler
+
+
 def sayAction(text,emotion="natural")->HRIAction:
+    from hri_framework.HRI_LIB.hri_types.hri_action import HRIAction
     action = HRIAction(0,text,"say",emotion,{})
     #action.params.append(text.replace("_"," ")) 
     return action
 
 def sayResponse(text,emotion="natural")->HRIResponse:
-    actions=[sayAction(text,emotion)]    
-    reason=""
-    success=True
-    missing_info=[]
-    response=HRIResponse(actions,emotion,reason,success,missing_info)
-    return response
+    from hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers import HRIResponse
+    # the shared empty missing_info, the actions stay a list callers may extend
+    return HRIResponse([sayAction(text,emotion)],emotion,"",True)
 
 
 
 
 class LLMLoader:
     _instances = {}  # Dictionary to store loaded LLM instances
+    _config = None   # llms_config.json, parsed once
+    _lock = threading.Lock()
+    _key_locks = {}
+    response_cache = None  # optional ResponseCache in front of the loaded LLMs
+    response_cache_methods = ()  # the LLM methods it answers
+
+    @staticmethod
+    def _load_config() -> dict:
+        if LLMLoader._config is None:
+            with LLMLoader._lock:
+                if LLMLoader._config is None:
+                    from ament_index_python.packages import get_package_share_directory
+
+                    # Get the configuration file path
+                    package_share_dir = get_package_share_directory('hri_framework')
+                    llms_config_path = os.path.join(
+                        package_share_dir, 'config', 'layers_config', 'llms_config.json'
+                    )
+
+                    # Load the JSON configuration
+                    with open(llms_config_path, 'r') as f:
+                        LLMLoader._config = json.load(f)
+        return LLMLoader._config
+
+    @staticmethod
+    def _key_lock(key: str) -> threading.Lock:
+        with LLMLoader._lock:
+            return LLMLoader._key_locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def enable_response_cache(methods, maxsize: int = 256, ttl: float = 300.0):
+        """
+        Answers repeated prompts from a bounded LRU cache whose entries expire after ttl seconds.
+        Only calls of the given prompt / completion methods (names of methods of the LLM
+        interface, e.g. the one the handlers prompt the LLM with) are cached, per LLM.
+        Applies to the LLMs loaded from now on, loading an LLM without these methods fails.
+        """
+        LLMLoader.response_cache = ResponseCache(maxsize, ttl)
+        LLMLoader.response_cache_methods = tuple(methods)
 
     @staticmethod
     def load(key: str)->LLM:
         """
         Loads and returns an LLM instance based on the key.
         If the instance is already loaded, returns the cached instance.
+        Concurrent loads of the same key instantiate the LLM only once.
         """
-        if key in LLMLoader._instances:
-            return LLMLoader._instances[key]
-        
-        # Get the configuration file path
-        package_share_dir = get_package_share_directory('hri_framework')
-        llms_config_path = os.path.join(
-            package_share_dir, 'config', 'layers_config', 'llms_config.json'
-        )
-        
-        # Load the JSON configuration
-        with open(llms_config_path, 'r') as f:
-            llms_config = json.load(f)
-        
-        # Get the module path from the config
-        llm_module_path = llms_config.get(key)
-        if not llm_module_path:
-            return None  # Return None if the key is not found
-        
-        try:
-            module_name, class_name = llm_module_path.rsplit('.', 1)
-            module = importlib.import_module(module_name)
-            LLMClass = getattr(module, class_name)
-            instance = LLMClass()
-            
-            # Cache the instance
-            LLMLoader._instances[key] = instance
+        instance = LLMLoader._instances.get(key)
+        if instance is not None:
             return instance
-        except (ImportError, AttributeError) as e:
-            print(f"Error loading LLM class for key '{key}': {e}")
-            return None
+
+        with LLMLoader._key_lock(key):
+            instance = LLMLoader._instances.get(key)
+            if instance is not None:
+                return instance
+
+            # Get the module path from the config
+            llm_module_path = LLMLoader._load_config().get(key)
+            if not llm_module_path:
+                return None  # Return None if the key is not found
+
+            try:
+                module_name, class_name = llm_module_path.rsplit('.', 1)
+                module = importlib.import_module(module_name)
+                LLMClass = getattr(module, class_name)
+                instance = LLMClass()
+                if LLMLoader.response_cache is not None:
+                    instance = CachedLLM(instance, LLMLoader.response_cache, key, LLMLoader.response_cache_methods)
+                instance = instrumentation.wrap_llm(key, instance)
+
+                # Cache the instance
+                LLMLoader._instances[key] = instance
+                return instance
+            except (ImportError, AttributeError) as e:
+                logger.error(f"Error loading LLM class for key '{key}': {e}")
+                return None
+
+    @staticmethod
+    def preload(keys: list, max_workers: int = None) -> dict:
+        """
+        Loads the given LLMs on a thread pool, e.g., at startup, so their warm-up time
+        is not spent on a user facing interaction.
+        Returns a dictionary of key -> Future of the loaded instance.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-preload")
+        futures = {key: executor.submit(LLMLoader.load, key) for key in keys}
+        executor.shutdown(wait=False)
+        return futures
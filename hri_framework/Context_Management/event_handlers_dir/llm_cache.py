@@ -0,0 +1,111 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+def normalize_prompt(prompt: str) -> str:
+    return ' '.join(prompt.casefold().split())
+
+
+##
+# @brief Bounded, thread safe LRU cache whose entries expire after ttl seconds
+#
+class ResponseCache:
+
+    _missing = object()
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()     # key -> (expires, value)
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, self._missing)
+            if entry is not self._missing:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+##
+# @brief Puts a ResponseCache in front of a loaded LLM
+#
+# calls of the given prompt methods (methods, which the LLM must have) with a
+# prompt string as their first argument are answered from the cache when the
+# same LLM (key, as loaded by LLMLoader) was asked the same (normalized) prompt
+# before. every other attribute, including stateful or side effecting methods,
+# is passed through to the wrapped LLM.
+# the proxy reports the LLM's class, so isinstance checks against it still hold.
+#
+class CachedLLM:
+
+    def __init__(self, llm, cache: ResponseCache, key: str, methods) -> None:
+        self._llm = llm
+        self._cache = cache
+        self._key = key
+        for name in methods:
+            method = getattr(llm, name, None)
+            if not callable(method):
+                raise ValueError(f"{type(llm).__name__} has no method '{name}' to cache")
+            # bound once, found before __getattr__
+            self.__dict__[name] = self._cached(name, method)
+
+
+    @property
+    def __class__(self):
+        return type(self._llm)
+
+
+    def __getattr__(self, name):
+        llm = self.__dict__.get("_llm")
+        if llm is None:
+            raise AttributeError(name)
+        return getattr(llm, name)
+
+
+    def _cached(self, name: str, method):
+        cache = self._cache
+
+        def cached(*args, **kwargs):
+            if not args or not isinstance(args[0], str):
+                return method(*args, **kwargs)
+            try:
+                key = (self._key, name, normalize_prompt(args[0]), args[1:], tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return method(*args, **kwargs)
+            response = cache.get(key, ResponseCache._missing)
+            if response is ResponseCache._missing:
+                response = method(*args, **kwargs)
+                cache.put(key, response)
+            return response
+
+        return cached
@@ -0,0 +1,92 @@
+import itertools
+import re
+
+
+_placeholder = re.compile(r'\{(\w+)\}')
+
+
+##
+# @brief A "{placeholder}" trigger pattern translated to a regex and compiled once
+#
+# the translation is the one EventHandler.extractValues always used: every
+# {name} becomes a greedy group and the input is matched from its start.
+#
+class CompiledPattern:
+
+    __slots__ = ("pattern", "placeholders", "regex", "keys")
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.placeholders = _placeholder.findall(pattern)
+        self.keys = [f'{{{name}}}' for name in self.placeholders]
+        self.regex = re.compile(_translate(pattern))
+
+
+    def extract(self, input: str) -> dict | None:
+        match = self.regex.match(input)
+        if match is None:
+            return None
+        return dict(zip(self.keys, match.groups()))
+
+
+def _translate(pattern: str, prefix: str | None = None) -> str:
+    if prefix is None:
+        return _placeholder.sub(r'(?P<\1>.+)', pattern)
+    # inside a combined regex every group needs a unique name
+    counter = itertools.count()
+    return _placeholder.sub(lambda m: f'(?P<{prefix}_{next(counter)}>.+)', pattern)
+
+
+_compiled = dict()
+
+def compile_pattern(pattern: str) -> CompiledPattern:
+    compiled = _compiled.get(pattern)
+    if compiled is None:
+        compiled = _compiled.setdefault(pattern, CompiledPattern(pattern))
+    return compiled
+
+
+##
+# @brief Matches an input against many patterns in a single regex pass
+#
+# all the registered patterns are merged into one alternation, tried in
+# registration order, so the result is the same as calling extractValues on
+# every handler in turn and taking the first match.
+#
+class PatternMatcher:
+
+    def __init__(self) -> None:
+        self._entries = []     # (CompiledPattern, target)
+        self._regex = None
+
+
+    def add(self, pattern: str, target) -> None:
+        self._entries.append((compile_pattern(pattern), target))
+        self._regex = None
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def _compile(self):
+        alternatives = [f'(?P<p{i}>{_translate(compiled.pattern, f"p{i}")})' for i, (compiled, _) in enumerate(self._entries)]
+        self._regex = re.compile('|'.join(alternatives))
+
+
+    def match(self, input: str) -> tuple | None:
+        ##
+        # returns (target, pattern, values) for the first matching pattern or None
+        #
+        if not self._entries:
+            return None
+        if self._regex is None:
+            self._compile()
+        match = self._regex.match(input)
+        if match is None:
+            return None
+        # the enclosing group of an alternative closes last
+        name = match.lastgroup
+        compiled, target = self._entries[int(name[1:])]
+        values = {key: match.group(f'{name}_{k}') for k, key in enumerate(compiled.keys)}
+        return target, compiled.pattern, values
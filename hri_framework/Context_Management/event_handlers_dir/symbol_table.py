@@ -0,0 +1,72 @@
+##
+# @brief Symbol table scoped to a single interaction
+#
+# lookups fall back to the parent scope, writes always go to the scope itself.
+# forking is O(1): the sub handlers (ack, on success, on failure) of a handler
+# share a fork of its scope, so they see the parent's symbols and each other's
+# without being able to change the parent's. nothing is shared between interactions, so handlers of different
+# interactions can run concurrently, and a scope is released together with the
+# handlers that use it.
+#
+class SymbolTable:
+
+    __slots__ = ("symbols", "parent")
+
+    def __init__(self, parent: "SymbolTable | None" = None) -> None:
+        self.symbols = dict()
+        self.parent = parent
+
+
+    def fork(self) -> "SymbolTable":
+        return SymbolTable(self)
+
+
+    def get(self, key, default=None):
+        scope = self
+        while scope is not None:
+            if key in scope.symbols:
+                return scope.symbols[key]
+            scope = scope.parent
+        return default
+
+
+    def __getitem__(self, key):
+        scope = self
+        while scope is not None:
+            if key in scope.symbols:
+                return scope.symbols[key]
+            scope = scope.parent
+        raise KeyError(key)
+
+
+    def __contains__(self, key) -> bool:
+        scope = self
+        while scope is not None:
+            if key in scope.symbols:
+                return True
+            scope = scope.parent
+        return False
+
+
+    def __setitem__(self, key, value):
+        self.symbols[key] = value
+
+
+    def update(self, values: dict):
+        self.symbols.update(values)
+
+
+    def flatten(self) -> dict:
+        chain = []
+        scope = self
+        while scope is not None:
+            chain.append(scope.symbols)
+            scope = scope.parent
+        result = dict()
+        for symbols in reversed(chain):
+            result.update(symbols)
+        return result
+
+
+    def __repr__(self) -> str:
+        return repr(self.flatten())
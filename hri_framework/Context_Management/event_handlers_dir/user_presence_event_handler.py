@@ -6,13 +6,26 @@ from hri_framework.Context_Management.requests.hri_request_handlers import HRIBe
 # @brief This class is an event handler that handles user presence events
 # and updates the availability of the user in the AvailabilityManager
 #
+# the whole belief system snapshot is pushed to the manager in one batch, as
+# the full snapshot of the presence source: the manager, which keeps the
+# persons it last saw present, applies only the presence changes (the delta)
+# and reports the persons that are no longer present, or no longer listed, as
+# absent. the state lives in the manager, so every copy of the handler
+# continues from the previous snapshot.
+# the ids whose availability crossed the threshold are kept in
+# availability_changes, for downstream handlers to react to.
+#
 class UserPresenceEventHandler(EventHandler):
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.availability_changes = set()
+
+
     def handle(self, belief_system: HRIBeliefSystem) -> HRIResponse | None:
 
         persons = belief_system.get("person", "presence")
-
-        for person in persons:
-            AvailabilityManager().set_availability(person["id"], person["presence"])
+        presence = {person["id"]: bool(person.get("presence", True)) for person in persons}
+        self.availability_changes = AvailabilityManager().update_presence(presence, snapshot=True)
 
         return None
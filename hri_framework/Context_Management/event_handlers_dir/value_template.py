@@ -0,0 +1,40 @@
+from functools import lru_cache
+import string
+
+
+# punctuation stripped around a word before looking it up (keeps { and })
+_punctuation_to_strip = string.punctuation.replace("{", "").replace("}", "")
+
+
+##
+# @brief A handler value pre-parsed for symbol substitution
+#
+# the value is split into words once, and every word is stored together with
+# the key it is looked up by, so substituting is a single pass over the words.
+#
+class ValueTemplate:
+
+    __slots__ = ("text", "words", "keys")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.words = text.split()
+        self.keys = [w.strip(_punctuation_to_strip) for w in self.words]
+
+
+    def substitute(self, symbols: dict) -> str:
+        ##
+        # a word whose key has a value in symbols is replaced by that value,
+        # other words are kept as they are
+        #
+        words = self.words
+        result = []
+        for i, key in enumerate(self.keys):
+            value = symbols.get(key)
+            result.append(words[i] if value is None else value)
+        return ' '.join(result)
+
+
+@lru_cache(maxsize=4096)
+def parse_template(text: str) -> ValueTemplate:
+    return ValueTemplate(text)
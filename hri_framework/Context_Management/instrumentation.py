@@ -0,0 +1,297 @@
+"""
+Hot-path instrumentation for event handlers, request handlers, decision helpers and LLMs.
+
+EventHandler, HRIRequestHandler and DecisionHelper subclasses register themselves here when they
+are defined. While instrumentation is disabled nothing else happens, their methods are left
+untouched, so it costs nothing at call time. enable() wraps handle / handleAsync / handle_request /
+handle_request_async / decide of every registered class (and of classes defined later) with a timer
+that keeps, per class, a latency histogram plus call and error counters. LLMs loaded by LLMLoader
+while instrumentation is enabled are wrapped the same way. disable() restores the original methods,
+a wrapper that was itself wrapped since (e.g., by tracing) stays in place and passes calls through.
+
+profile(cls, calls) samples the next calls of one class with cProfile, profile_report(cls) prints them.
+snapshot() returns the collected metrics, export_prometheus(path) renders them in the Prometheus text format.
+
+usage:
+    from hri_framework.Context_Management import instrumentation
+    instrumentation.enable()
+    ...
+    instrumentation.export_prometheus("/tmp/hri_metrics.prom")
+"""
+import bisect
+import functools
+import sys
+import threading
+import time
+import weakref
+
+
+METHODS = ("handle", "handleAsync", "handle_request", "handle_request_async", "decide")
+
+# upper bounds (seconds) of the latency histogram buckets, the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+
+    def __init__(self, kind: str, name: str) -> None:
+        self.kind = kind
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.lock = threading.Lock()
+
+
+    def record(self, elapsed: float, failed: bool):
+        bucket = bisect.bisect_left(BUCKETS, elapsed)
+        with self.lock:
+            self.calls += 1
+            self.total += elapsed
+            self.buckets[bucket] += 1
+            if failed:
+                self.errors += 1
+
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {
+                "kind": self.kind,
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_seconds": self.total,
+                "buckets": dict(zip([*BUCKETS, float("inf")], self.buckets)),
+            }
+
+
+_enabled = False
+_lock = threading.RLock()
+_classes = weakref.WeakKeyDictionary()      # class -> kind
+_originals = dict()                         # (class, method name) -> (original function, its wrapper)
+_metrics = dict()                           # metric name -> Metric
+_profilers = dict()                         # metric name -> [cProfile.Profile, remaining calls]
+# held while a call is profiled and while a profile is read. only one profiler can be active at a time
+_profile_lock = threading.Lock()
+
+
+def _metric(kind: str, name: str) -> Metric:
+    metric = _metrics.get(name)
+    if metric is None:
+        with _lock:
+            metric = _metrics.setdefault(name, Metric(kind, name))
+    return metric
+
+
+def _timed(fn, metric: Metric):
+    import inspect
+
+    clock = time.perf_counter
+    name = metric.name
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not _enabled:
+                return await fn(*args, **kwargs)
+            start = clock()
+            failed = True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metric.record(clock() - start, failed)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        start = clock()
+        failed = True
+        try:
+            if name in _profilers:
+                result = _profiled(name, fn, args, kwargs)
+            else:
+                result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            metric.record(clock() - start, failed)
+    return wrapper
+
+
+def _profiler_active() -> bool:
+    # a profiler of the application, cProfile cannot run while another one is active
+    monitoring = getattr(sys, "monitoring", None)
+    if monitoring is not None and monitoring.get_tool(monitoring.PROFILER_ID) is not None:
+        return True
+    return sys.getprofile() is not None
+
+
+def _profiled(name: str, fn, args, kwargs):
+    # calls made while another call is profiled (nested, or on another thread) are not sampled
+    if not _profile_lock.acquire(blocking=False):
+        return fn(*args, **kwargs)
+    sample = _profilers.get(name)
+    if sample is None or sample[1] <= 0 or _profiler_active():
+        _profile_lock.release()
+        return fn(*args, **kwargs)
+    sample[1] -= 1
+    try:
+        return sample[0].runcall(fn, *args, **kwargs)
+    finally:
+        _profile_lock.release()
+
+
+def _instrument(cls, kind: str):
+    for method in METHODS:
+        fn = cls.__dict__.get(method)
+        if fn is None or getattr(fn, "__isabstractmethod__", False) or (cls, method) in _originals:
+            continue
+        wrapper = _timed(fn, _metric(kind, cls.__qualname__))
+        _originals[(cls, method)] = (fn, wrapper)
+        setattr(cls, method, wrapper)
+
+
+def register(cls, kind: str):
+    ##
+    # called by the instrumented base classes for every subclass they get.
+    # classes that set _instrument = False in their body (e.g., the sync / async shims of the
+    # framework's base classes) are skipped
+    #
+    if not cls.__dict__.get("_instrument", True):
+        return
+    with _lock:
+        _classes[cls] = kind
+        if _enabled:
+            _instrument(cls, kind)
+
+
+def enable():
+    global _enabled
+    with _lock:
+        _enabled = True
+        for cls, kind in list(_classes.items()):
+            _instrument(cls, kind)
+
+
+def disable():
+    global _enabled
+    with _lock:
+        _enabled = False
+        for (cls, method), (fn, wrapper) in list(_originals.items()):
+            # only our own wrapper is replaced, one wrapped since (its __wrapped__ chain leads to ours) stays
+            if cls.__dict__.get(method) is wrapper:
+                setattr(cls, method, fn)
+                del _originals[(cls, method)]
+        with _profile_lock:
+            _profilers.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def wrap_llm(key: str, llm):
+    ##
+    # returns llm itself while instrumentation is disabled
+    #
+    if not _enabled or llm is None:
+        return llm
+    return _InstrumentedLLM(llm, _metric("llm", f"LLM[{key}]"))
+
+
+class _InstrumentedLLM:
+
+    def __init__(self, llm, metric: Metric) -> None:
+        self._llm = llm
+        self._metric = metric
+
+
+    @property
+    def __class__(self):
+        # isinstance checks against the LLM's class still hold
+        return type(self._llm)
+
+
+    def __getattr__(self, name):
+        llm = self.__dict__.get("_llm")
+        if llm is None:
+            raise AttributeError(name)
+        attr = getattr(llm, name)
+        if callable(attr) and not name.startswith("_"):
+            return _timed(attr, self._metric)
+        return attr
+
+
+def profile(cls, calls: int = 50):
+    ##
+    # samples the next calls of cls with cProfile, instrumentation must be enabled
+    #
+    import cProfile
+
+    with _profile_lock:
+        _profilers[cls.__qualname__] = [cProfile.Profile(), calls]
+
+
+def profile_report(cls, sort: str = "cumulative", limit: int = 30) -> str:
+    import io
+    import pstats
+
+    out = io.StringIO()
+    # no call is being sampled while the stats are read
+    with _profile_lock:
+        sample = _profilers.get(cls.__qualname__)
+        if sample is None:
+            return ""
+        pstats.Stats(sample[0], stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def snapshot() -> dict:
+    with _lock:
+        metrics = list(_metrics.values())
+    return {metric.name: metric.as_dict() for metric in metrics}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export_prometheus(path: str | None = None) -> str:
+    lines = [
+        "# HELP hri_call_duration_seconds Duration of handler, decision helper and LLM calls.",
+        "# TYPE hri_call_duration_seconds histogram",
+    ]
+    errors = [
+        "# HELP hri_call_errors_total Calls that raised an exception.",
+        "# TYPE hri_call_errors_total counter",
+    ]
+    for name, metric in sorted(snapshot().items()):
+        labels = f'kind="{metric["kind"]}",class="{_label(name)}"'
+        cumulative = 0
+        for bound, count in metric["buckets"].items():
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'hri_call_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"hri_call_duration_seconds_sum{{{labels}}} {metric['total_seconds']}")
+        lines.append(f"hri_call_duration_seconds_count{{{labels}}} {metric['calls']}")
+        errors.append(f"hri_call_errors_total{{{labels}}} {metric['errors']}")
+    text = "\n".join(lines + errors) + "\n"
+
+    if path is not None:
+        # written to a temporary file first, so a scraper never reads a partial snapshot
+        import os
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    return text
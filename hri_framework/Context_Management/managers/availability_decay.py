@@ -0,0 +1,32 @@
+import numpy as np
+
+
+##
+# @brief Wall clock availability curve
+#
+# a present person's score rises linearly from the score it had on arrival and
+# reaches 1 after rise_time seconds of presence starting from 0.
+# an absent person's score decays from the score it had when last seen, either
+# exponentially (halving every half_life seconds) or linearly (losing 0.5 every
+# half_life seconds).
+#
+class AvailabilityDecay:
+
+    def __init__(self, rise_time: float = 5.0, half_life: float = 10.0, decay: str = "exponential") -> None:
+        if decay not in ("exponential", "linear"):
+            raise ValueError(f"unknown availability decay '{decay}'")
+        if rise_time <= 0 or half_life <= 0:
+            raise ValueError("rise_time and half_life must be positive")
+        self.rise_time = rise_time
+        self.half_life = half_life
+        self.decay = decay
+
+
+    def __call__(self, present: np.ndarray, anchor_score: np.ndarray, elapsed: np.ndarray) -> np.ndarray:
+        elapsed = np.maximum(elapsed, 0.0)
+        risen = np.minimum(anchor_score + elapsed / self.rise_time, 1.0)
+        if self.decay == "exponential":
+            decayed = anchor_score * np.exp2(-elapsed / self.half_life)
+        else:
+            decayed = np.maximum(anchor_score - 0.5 * elapsed / self.half_life, 0.0)
+        return np.where(present, risen, decayed)
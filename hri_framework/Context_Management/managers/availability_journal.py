@@ -0,0 +1,270 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+
+
+MAGIC = b"HRIJRNL1"
+VERSION = 1
+
+# file header: magic, version, record size, epoch, committed records. it fills the first record slot
+_file_header = struct.Struct("<8sIIQQ")
+# record: kind, present, name length, key, anchor_time (frame time for FRAME), anchor_score, name bytes
+_record = struct.Struct("<BBHIdd40s")
+RECORD_SIZE = _record.size
+_chunk = 40
+
+# record kinds
+NAME = 1        # binds key to the json encoded hri_id, continued by CONT records when longer than 40 bytes
+CONT = 2
+UPDATE = 3      # presence and anchors of key
+REMOVE = 4      # key was evicted
+CLEAR = 5       # every person was forgotten
+FRAME = 6       # end of a batch, carries the time of its last frame
+
+
+def _read_header(path: str):
+    try:
+        with open(path, "rb") as f:
+            data = f.read(_file_header.size)
+    except FileNotFoundError:
+        return None
+    if len(data) < _file_header.size:
+        return None
+    magic, version, record_size, epoch, committed = _file_header.unpack(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        return None
+    return epoch, committed
+
+
+def _replay(path: str, committed: int, state: dict) -> float:
+    ##
+    # applies the committed records of a journal / snapshot file to state, returns the time of its last frame
+    #
+    last = 0.0
+    names = dict()
+    partial = dict()    # key -> [missing bytes, name bytes]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        committed = min(committed, len(mm) // RECORD_SIZE - 1)
+        records = memoryview(mm)[RECORD_SIZE:RECORD_SIZE * (committed + 1)]
+        try:
+            for kind, present, length, key, t, score, data in _record.iter_unpack(records):
+                if kind == UPDATE:
+                    state[names[key]] = (bool(present), t, score)
+                elif kind == FRAME:
+                    last = max(last, t)
+                elif kind == NAME:
+                    if length <= _chunk:
+                        names[key] = json.loads(data[:length])
+                    else:
+                        partial[key] = [length - _chunk, bytearray(data)]
+                elif kind == CONT:
+                    name = partial[key]
+                    name[1] += data[:min(name[0], _chunk)]
+                    name[0] -= _chunk
+                    if name[0] <= 0:
+                        names[key] = json.loads(partial.pop(key)[1])
+                elif kind == REMOVE:
+                    state.pop(names[key], None)
+                elif kind == CLEAR:
+                    state.clear()
+        finally:
+            records.release()
+    return last
+
+
+##
+# @brief Append only journal of the AvailabilityManager's updates, for warm restarts
+#
+# every frame, the rows (hri_id, presence, anchor time, anchor score) of the persons
+# whose presence changed and the ids of evicted persons are handed to a background
+# thread, which appends them as fixed size records to a memory mapped file and
+# then commits them by advancing the committed count in the file header.
+# the detection loop only copies the changed rows and queues them, it never
+# waits for the file. frames queued while the writer is busy are written together.
+#
+# when the journal is full it is compacted: the writer's mirror of the state is
+# written to a snapshot file (path + ".snapshot", replaced atomically) and the
+# journal starts over in a new epoch. a journal older than the snapshot was
+# already compacted into it and is ignored by recover().
+#
+# anchors are wall clock times (time.time()), so recovered scores continue to
+# rise and decay across the restart.
+#
+class AvailabilityJournal:
+
+    def __init__(self, path: str, capacity: int = 65536) -> None:
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.capacity = capacity
+        self.epoch = 0
+        self.committed = 0
+        self.stats = {"frames": 0, "records": 0, "compactions": 0}
+        self._keys = dict()         # hri_id -> key, in the current epoch
+        self._mirror = dict()       # hri_id -> (present, anchor_time, anchor_score), as written
+        self._last = 0.0
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._mm = None
+        self._thread = None
+
+
+    @staticmethod
+    def recover(path: str) -> tuple:
+        ##
+        # returns ({hri_id: (present, anchor_time, anchor_score)}, time of the last recorded frame)
+        #
+        state = dict()
+        last = 0.0
+        snapshot = _read_header(path + ".snapshot")
+        if snapshot is not None:
+            last = _replay(path + ".snapshot", snapshot[1], state)
+        journal = _read_header(path)
+        if journal is not None and (snapshot is None or journal[0] >= snapshot[0]):
+            last = max(last, _replay(path, journal[1], state))
+        return state, last
+
+
+    def start(self, rows: list):
+        ##
+        # compacts the current state (the rows of every tracked person) into a new epoch and starts the writer thread
+        #
+        epochs = [header[0] for header in (_read_header(self.snapshot_path), _read_header(self.path)) if header is not None]
+        self.epoch = max(epochs, default=0)
+        self._mirror = {row[0]: row[1:] for row in rows}
+        self._last = 0.0
+
+        size = RECORD_SIZE * (self.capacity + 1)
+        self._file = open(self.path, "a+b")
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._compact()
+
+        self._thread = threading.Thread(target=self._run, name="hri-availability-journal", daemon=True)
+        self._thread.start()
+
+
+    # called on the detection threads
+
+    def frame(self, rows, removed, now: float):
+        self._queue.put(("frame", now, rows, removed))
+
+
+    def clear(self, now: float):
+        self._queue.put(("clear", now, (), ()))
+
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+
+    # writer thread
+
+    def _run(self):
+        while True:
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batches
+            self._write([batch for batch in batches if batch is not None])
+            if stop:
+                return
+
+
+    def _write(self, batches: list):
+        if not batches:
+            return
+        mirror = self._mirror
+        ops = []
+        for kind, now, rows, removed in batches:
+            if kind == "clear":
+                mirror.clear()
+                ops.append((CLEAR, None, None))
+            for row in rows:
+                mirror[row[0]] = row[1:]
+                ops.append((UPDATE, row[0], row[1:]))
+            for hri_id in removed:
+                if mirror.pop(hri_id, None) is not None:
+                    ops.append((REMOVE, hri_id, None))
+            # concurrent streams may queue their frames slightly out of order
+            self._last = max(self._last, now)
+        self.stats["frames"] += len(batches)
+
+        data = self._encode(ops)
+        if self.committed + len(data) // RECORD_SIZE > self.capacity:
+            # the mirror already holds these batches, the snapshot covers them
+            self._compact()
+            return
+        start = RECORD_SIZE * (self.committed + 1)
+        self._mm[start:start + len(data)] = data
+        self.committed += len(data) // RECORD_SIZE
+        self.stats["records"] += len(data) // RECORD_SIZE
+        self._write_header(self._mm, self.epoch, self.committed)
+
+
+    def _encode(self, ops: list) -> bytes:
+        keys = self._keys
+        pack = _record.pack
+        out = bytearray()
+        for kind, hri_id, row in ops:
+            if kind == CLEAR:
+                out += pack(CLEAR, 0, 0, 0, 0.0, 0.0, b"")
+                continue
+            key = keys.get(hri_id)
+            if key is None:
+                key = keys[hri_id] = len(keys)
+                name = json.dumps(hri_id).encode()
+                out += pack(NAME, 0, len(name), key, 0.0, 0.0, name[:_chunk])
+                for i in range(_chunk, len(name), _chunk):
+                    out += pack(CONT, 0, 0, key, 0.0, 0.0, name[i:i + _chunk])
+            if kind == UPDATE:
+                out += pack(UPDATE, row[0], 0, key, row[1], row[2], b"")
+            else:
+                out += pack(REMOVE, 0, 0, key, 0.0, 0.0, b"")
+        out += pack(FRAME, 0, 0, 0, self._last, 0.0, b"")
+        return bytes(out)
+
+
+    @staticmethod
+    def _write_header(buf, epoch: int, committed: int):
+        _file_header.pack_into(buf, 0, MAGIC, VERSION, RECORD_SIZE, epoch, committed)
+
+
+    def _compact(self):
+        self.epoch += 1
+        self._keys = dict()
+        data = self._encode([(UPDATE, hri_id, row) for hri_id, row in self._mirror.items()])
+
+        header = bytearray(RECORD_SIZE)
+        self._write_header(header, self.epoch, len(data) // RECORD_SIZE)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+        # the journal restarts empty in the snapshot's epoch
+        self._keys = dict()
+        self.committed = 0
+        self._write_header(self._mm, self.epoch, 0)
+        self._mm.flush()
+        self.stats["compactions"] += 1
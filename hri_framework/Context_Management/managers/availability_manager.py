@@ -1,36 +1,328 @@
+import math
+import threading
+import time
 
+from hri_framework.Context_Management.managers.availability_shards import ShardedAvailabilityTable
+from hri_framework.Context_Management.managers.availability_table import AvailabilityView
+from hri_framework.Context_Management.managers.scoring_models import make_model
+
+
+##
+# @brief Tracks the availability of the persons the robot perceives
+#
+# several sources (e.g., one per camera stream, each on its own thread) can
+# report detections concurrently, every call is tagged with its source. a person
+# is present while at least one source sees them.
+# the state is striped into lock protected shards by hri_id (configure
+# {"shards": n}), so streams updating different persons do not serialize on one lock.
+# a given source must report from one thread at a time.
+# scores come from a pluggable, vectorized scoring model (configure {"model": ...},
+# see scoring_models), fed with the presence of the persons, the distance and
+# engagement signals the detections carry and the recorded interactions.
+#
 class AvailabilityManager:
 
-    availability_state = dict()
+    # shared by all the AvailabilityManager() instances
+    shards = 1
+    table = ShardedAvailabilityTable(shards)
+    availability_state = table.view()
+
+    # wall clock of the updates and queries that do not pass a time, see use_clock()
+    clock = staticmethod(time.time)
+
+    # source -> the hri_ids it currently sees
+    sources = dict()
+    _sources_lock = threading.Lock()
+    _publish_lock = threading.Lock()
+
+    initial_score = 0.5
+    availability_threshold = 0.5
+
+    # retention of departed persons
+    max_entries = 1000
+    ttl = 60.0
+    zero_score = 0.01
+    sweep_interval = 1.0
+
+    # shared memory snapshot published after every update, see publish()
+    snapshot = None
+    # journal of every update, see open_journal()
+    journal = None
+
+
+    @classmethod
+    def reset(cls):
+        ##
+        # forgets every tracked person and every source, the configuration is kept
+        #
+        cls.table = ShardedAvailabilityTable(cls.shards, model=cls.table.model)
+        cls.availability_state = AvailabilityView(cls.table, cls.clock)
+        with cls._sources_lock:
+            cls.sources = dict()
+        if cls.journal is not None:
+            cls.journal.clear(cls.clock())
+        cls._publish(cls.clock())
+
+
+    @classmethod
+    def configure(cls, config: dict):
+        ##
+        # config keys (all optional): initial_score, availability_threshold,
+        # max_entries, ttl, zero_score and sweep_interval (seconds), shards,
+        # model ("decay", "step", "smoothing" or "linear") and the parameters of the model:
+        #   decay       rise_time, half_life (seconds), decay ("exponential" / "linear")
+        #   step        step, fps
+        #   smoothing   half_life (seconds)
+        #   linear      weights, limits ({feature: value}), bias
+        # changing the number of shards resets the tracked persons
+        #
+        shards = config.get("shards", cls.shards)
+        if shards != cls.shards:
+            cls.shards = shards
+            cls.reset()
+        for key in ("initial_score", "availability_threshold", "max_entries", "ttl", "zero_score", "sweep_interval"):
+            setattr(cls, key, config.get(key, getattr(cls, key)))
+        cls.table.model = make_model(config, cls.table.model)
+        # availability may have changed for everyone
+        cls.table.invalidate_versions()
+        cls._publish(cls.clock())
 
 
-    def _on_new_person_appeared(self, hri_id:str):
-        self.availability_state[hri_id] = {"present": True, "availability_score": 0.5}
+    @classmethod
+    def use_clock(cls, clock):
+        ##
+        # replaces the wall clock (time.time) the manager reads the current time
+        # from, e.g., with the trace time while replaying a trace
+        #
+        cls.clock = staticmethod(clock)
+        cls.availability_state = AvailabilityView(cls.table, clock)
 
 
-    def _on_person_disappeared(self, hri_id:str):
-        self.availability_state[hri_id]["present"] = False
-        self.availability_state[hri_id]["availability_score"] = max(self.availability_state[hri_id]["availability_score"] - 0.1, 0.0)
+    @classmethod
+    def publish(cls):
+        ##
+        # starts publishing the state to shared memory after every update, so
+        # other processes can attach() to it. returns the snapshot, its name is
+        # what they attach to
+        #
+        if cls.snapshot is None:
+            from hri_framework.Context_Management.managers.availability_snapshot import AvailabilitySnapshot
 
+            cls.snapshot = AvailabilitySnapshot()
+            cls._publish(cls.clock())
+        return cls.snapshot
 
-    def _on_person_present(self, hri_id:str):
-        self.availability_state[hri_id]["present"] = True
-        self.availability_state[hri_id]["availability_score"] = min(self.availability_state[hri_id]["availability_score"] + 0.1, 1.0)
 
+    @classmethod
+    def unpublish(cls):
+        if cls.snapshot is not None:
+            cls.snapshot.close()
+            cls.snapshot = None
 
-    def _update_present_person_availability(self, hri_id:str):
-        if hri_id not in self.availability_state:
-            self._on_new_person_appeared(hri_id)
-        else:
-            self._on_person_present(hri_id)
 
+    @classmethod
+    def attach(cls, name: str):
+        ##
+        # makes the AvailabilityManager of this process a read only view of the
+        # snapshot another process publishes, e.g., in process pool workers.
+        # queries read the current published state, updates are not supported
+        #
+        from hri_framework.Context_Management.managers.availability_snapshot import AvailabilitySnapshotReader
 
-    def handle_persons(self, persons:dict) -> dict:
-        for person in persons:
-            self._update_present_person_availability(person["hri_id"])
+        reader = AvailabilitySnapshotReader(name)
+        cls.table = reader
+        cls.availability_state = reader.view()
+        cls.availability_threshold = reader.threshold
 
-        for hri_id in self.availability_state:
-            if hri_id not in persons:
-                self._on_person_disappeared(hri_id)
 
+    @classmethod
+    def open_journal(cls, path: str, capacity: int = 65536) -> int:
+        ##
+        # restores the state recorded in the journal at path (if any), then
+        # journals every update to it. persons that were present when the
+        # journal was last written are restored as having left at that time.
+        # returns the number of restored persons
+        #
+        from hri_framework.Context_Management.managers.availability_journal import AvailabilityJournal
+
+        cls.close_journal()
+        rows, last = AvailabilityJournal.recover(path)
+        now = cls.clock()
+        cls.reset()
+        if rows:
+            ids = list(rows)
+            present, anchor_time, anchor_score = zip(*rows.values())
+            cls.table.load(ids, present, anchor_time, anchor_score, now)
+            cls.table.depart([hri_id for hri_id, row in rows.items() if row[0]], last)
+
+        cls.journal = AvailabilityJournal(path, capacity)
+        cls.journal.start(cls.table.rows())
+        cls._publish(now)
+        return len(rows)
+
+
+    @classmethod
+    def close_journal(cls):
+        ##
+        # writes out the queued frames and stops journaling
+        #
+        if cls.journal is not None:
+            cls.journal.close()
+            cls.journal = None
+
+
+    @classmethod
+    def _publish(cls, now: float):
+        if cls.snapshot is not None:
+            with cls._publish_lock:
+                cls.snapshot.publish(cls.table, cls.availability_threshold, now)
+
+
+    def handle_persons(self, persons: list, now: float | None = None, source="default") -> dict:
+        ##
+        # the persons source detects in its current frame. persons it saw in its
+        # previous frame and no longer detects are absent, unless another source sees them.
+        # persons may carry "distance" and "engagement" signals for the scoring model
+        #
+        if now is None:
+            now = self.clock()
+        detected = {person["hri_id"] for person in persons}
+        signals = {person["hri_id"]: (person.get("distance", math.nan), person.get("engagement", math.nan))
+                   for person in persons if "distance" in person or "engagement" in person}
+        with self._sources_lock:
+            previous = self.sources.get(source, frozenset())
+            self.sources[source] = detected
+
+        self._sight(detected - previous, previous - detected, now, signals)
+        self._publish(now)
         return self.availability_state
+
+
+    def update_presence(self, presence: dict, now: float | None = None, source="presence", snapshot: bool = False) -> set:
+        ##
+        # batch entry point for {hri_id: present} updates. only the listed
+        # persons are touched, so a caller can pass either a full snapshot or
+        # just the persons whose presence changed since its last call.
+        # with snapshot=True presence is the source's full snapshot: the persons
+        # the source saw and no longer lists are absent too. either way only the
+        # persons whose presence changed for the source touch the tables.
+        # returns the ids whose availability crossed availability_threshold
+        # since the previous call.
+        #
+        if now is None:
+            now = self.clock()
+        with self._sources_lock:
+            seen = self.sources.get(source)
+            if seen is None:
+                seen = self.sources[source] = set()
+            gained = {hri_id for hri_id, present in presence.items() if present and hri_id not in seen}
+            if snapshot:
+                lost = {hri_id for hri_id in seen if not presence.get(hri_id, False)}
+            else:
+                lost = {hri_id for hri_id, present in presence.items() if not present and hri_id in seen}
+            seen |= gained
+            seen -= lost
+
+        self._sight(gained, lost, now)
+        crossings = self.table.crossings(self.availability_threshold, now)
+        self._publish(now)
+        return crossings
+
+
+    def set_availability(self, hri_id: str, present: bool, now: float | None = None, source="presence") -> set:
+        return self.update_presence({hri_id: present}, now, source)
+
+
+    def record_interaction(self, hri_id, now: float | None = None):
+        ##
+        # the robot interacted with the person, feeds the since_interaction feature
+        #
+        if now is None:
+            now = self.clock()
+        self.table.interact([hri_id], now)
+        self._publish(now)
+
+
+    def forget_source(self, source, now: float | None = None):
+        ##
+        # for a source that stopped reporting (e.g., a camera that went offline):
+        # the persons only it saw become absent
+        #
+        self.handle_persons([], now, source)
+        with self._sources_lock:
+            self.sources.pop(source, None)
+
+
+    def _sight(self, gained, lost, now: float, signals: dict | None = None):
+        # only presence changes (and reported signals) touch the tables, absent persons cost nothing per frame
+        journal = self.journal
+        journaled = False
+        touched = []
+        for shard, (gained, lost, observed) in self.table.partition(gained, lost, signals or ()):
+            touched.append(shard)
+            with shard.lock:
+                arrived, departed = shard.sight(gained, lost)
+                table = shard.table
+                slots = table.slots
+                new_ids = [hri_id for hri_id in arrived if hri_id not in slots]
+                table.depart(departed, now)
+                table.arrive([hri_id for hri_id in arrived if hri_id in slots], now)
+                table.add(new_ids, self.initial_score, now)
+                self._evict(table, now)
+                removed = shard.take_removed()
+                if observed:
+                    observed = [hri_id for hri_id in observed if hri_id in slots]
+                    table.observe(observed, [signals[hri_id][0] for hri_id in observed],
+                                  [signals[hri_id][1] for hri_id in observed])
+                if journal is not None and (arrived or departed or removed):
+                    # queued under the shard lock, so the journal sees each person's updates in order
+                    journal.frame(table.rows(departed + arrived), removed, now)
+                    journaled = True
+        # the other shards are swept once sweep_interval elapsed, so departed persons expire without churn
+        for shard in self.table.shards:
+            if shard not in touched and now - shard.table.last_sweep >= self.sweep_interval:
+                with shard.lock:
+                    self._evict(shard.table, now)
+                    removed = shard.take_removed()
+                    if journal is not None and removed:
+                        journal.frame((), removed, now)
+                        journaled = True
+        if journal is not None and not journaled:
+            journal.frame((), (), now)
+
+
+    def _evict(self, table, now: float):
+        if now - table.last_sweep >= self.sweep_interval:
+            table.last_sweep = now
+            table.evict_expired(now, self.ttl, self.zero_score)
+        table.evict_lru(max(1, self.max_entries // self.shards))
+
+
+    def eviction_stats(self) -> dict:
+        return {"entries": len(self.table), **self.table.evictions}
+
+
+    def get_availability(self, hri_id: str, now: float | None = None) -> float:
+        if now is None:
+            now = self.clock()
+        try:
+            return self.table.entry(hri_id, now)["availability_score"]
+        except KeyError:
+            return 0.0
+
+
+    def is_available(self, hri_id: str, now: float | None = None) -> bool:
+        return self.get_availability(hri_id, now) >= self.availability_threshold
+
+
+    def version(self, hri_id: str, now: float | None = None) -> int:
+        ##
+        # monotonically increasing per person, changes only when is_available()
+        # of the person changes. 0 for persons that are not tracked.
+        #
+        if now is None:
+            now = self.clock()
+        try:
+            return self.table.version(hri_id, self.availability_threshold, now)
+        except KeyError:
+            return 0
@@ -0,0 +1,251 @@
+from collections.abc import Mapping
+import threading
+import zlib
+
+import numpy as np
+
+from hri_framework.Context_Management.managers.availability_table import AvailabilityTable, AvailabilityView
+from hri_framework.Context_Management.managers.scoring_models import DecayModel, ScoringModel
+
+
+def shard_index(hri_id, shards: int) -> int:
+    ##
+    # the shard of hri_id, the same in every process (str hashes are salted per process)
+    #
+    return zlib.crc32(str(hri_id).encode()) % shards
+
+
+##
+# @brief One stripe of a ShardedAvailabilityTable: a table, the lock guarding it and its sightings
+#
+class AvailabilityShard:
+
+    __slots__ = ("table", "lock", "sightings", "removed")
+
+    def __init__(self, table: AvailabilityTable) -> None:
+        self.table = table
+        self.lock = threading.Lock()
+        self.sightings = dict()     # hri_id -> number of sources currently seeing the person
+        self.removed = []           # ids evicted since take_removed()
+        table.on_remove = self._on_remove
+
+
+    def _on_remove(self, hri_ids: list):
+        self.removed.extend(hri_ids)
+
+
+    def take_removed(self) -> list:
+        removed, self.removed = self.removed, []
+        return removed
+
+
+    def sight(self, gained, lost) -> tuple:
+        ##
+        # counts the sources that started (gained) and stopped (lost) seeing persons,
+        # returns (arrived, departed): the persons seen by a first source, and by no source anymore
+        #
+        sightings = self.sightings
+        arrived = []
+        for hri_id in gained:
+            count = sightings.get(hri_id, 0)
+            sightings[hri_id] = count + 1
+            if count == 0:
+                arrived.append(hri_id)
+        departed = []
+        for hri_id in lost:
+            count = sightings.get(hri_id, 0) - 1
+            if count > 0:
+                sightings[hri_id] = count
+            elif count == 0:
+                del sightings[hri_id]
+                departed.append(hri_id)
+        return arrived, departed
+
+
+##
+# @brief AvailabilityTables striped by hri_id, each behind its own lock
+#
+# the writers (the AvailabilityManager) lock the shards they update, so streams
+# updating different persons rarely wait for each other. the read side has what
+# the manager's queries, its view and the shared memory snapshot need
+# (slots, ids, size, entry(), version(), crossings(), export(), view()), each read
+# locks the shard(s) it reads.
+# slots maps every tracked hri_id to its slot within its own shard.
+#
+class ShardedAvailabilityTable:
+
+    def __init__(self, shards: int = 1, model: ScoringModel | None = None) -> None:
+        if shards < 1:
+            raise ValueError("an availability table needs at least one shard")
+        model = model if model is not None else DecayModel()
+        self.shards = [AvailabilityShard(AvailabilityTable(model=model)) for _ in range(shards)]
+        self.slots = _Slots(self)
+        self._ids = (None, [])      # (the shard id lists and lengths it was built from, concatenated ids)
+
+
+    def shard(self, hri_id) -> AvailabilityShard:
+        shards = self.shards
+        return shards[shard_index(hri_id, len(shards))] if len(shards) > 1 else shards[0]
+
+
+    def partition(self, *groups) -> list:
+        ##
+        # splits every group of ids by shard, returns [(shard, [ids of each group])]
+        # for the shards that got any
+        #
+        shards = self.shards
+        if len(shards) == 1:
+            return [(shards[0], list(groups))] if any(groups) else []
+        parts = dict()
+        for i, group in enumerate(groups):
+            for hri_id in group:
+                index = shard_index(hri_id, len(shards))
+                if index not in parts:
+                    parts[index] = [[] for _ in groups]
+                parts[index][i].append(hri_id)
+        return [(shards[index], part) for index, part in parts.items()]
+
+
+    @property
+    def model(self) -> ScoringModel:
+        return self.shards[0].table.model
+
+
+    @model.setter
+    def model(self, model: ScoringModel):
+        for shard in self.shards:
+            with shard.lock:
+                shard.table.model = model
+
+
+    def __len__(self) -> int:
+        return sum(shard.table.size for shard in self.shards)
+
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+
+    @property
+    def ids(self) -> list:
+        shards = self.shards
+        if len(shards) == 1:
+            table = shards[0].table
+            return table.ids[:table.size]
+        key = [(shard.table.ids, shard.table.size) for shard in shards]
+        built, ids = self._ids
+        if built is None or any(a[0] is not b[0] or a[1] != b[1] for a, b in zip(built, key)):
+            ids = [hri_id for table_ids, size in key for hri_id in table_ids[:size]]
+            self._ids = (key, ids)
+        return ids
+
+
+    @property
+    def evictions(self) -> dict:
+        evictions = {"ttl": 0, "lru": 0}
+        for shard in self.shards:
+            for kind, count in shard.table.evictions.items():
+                evictions[kind] += count
+        return evictions
+
+
+    def entry(self, hri_id, now: float | None = None) -> dict:
+        shard = self.shard(hri_id)
+        with shard.lock:
+            return shard.table.entry(hri_id, now)
+
+
+    def version(self, hri_id, threshold: float, now: float | None = None) -> int:
+        shard = self.shard(hri_id)
+        with shard.lock:
+            return shard.table.version(hri_id, threshold, now)
+
+
+    def crossings(self, threshold: float, now: float) -> set:
+        crossed = set()
+        for shard in self.shards:
+            with shard.lock:
+                crossed |= shard.table.crossings(threshold, now)
+        return crossed
+
+
+    def invalidate_versions(self):
+        for shard in self.shards:
+            with shard.lock:
+                shard.table.invalidate_versions()
+
+
+    def rows(self, hri_ids=None) -> list:
+        rows = []
+        for shard in self.shards:
+            with shard.lock:
+                rows.extend(shard.table.rows(hri_ids))
+        return rows
+
+
+    def load(self, hri_ids: list, present, anchor_time, anchor_score, now: float):
+        rows = {hri_id: i for i, hri_id in enumerate(hri_ids)}
+        for shard, (ids,) in self.partition(hri_ids):
+            index = [rows[hri_id] for hri_id in ids]
+            with shard.lock:
+                shard.table.load(ids, np.asarray(present)[index], np.asarray(anchor_time)[index],
+                                 np.asarray(anchor_score)[index], now)
+
+
+    def depart(self, hri_ids, now: float):
+        for shard, (ids,) in self.partition(hri_ids):
+            with shard.lock:
+                shard.table.depart(ids, now)
+
+
+    def interact(self, hri_ids, now: float):
+        for shard, (ids,) in self.partition(hri_ids):
+            with shard.lock:
+                shard.table.interact([hri_id for hri_id in ids if hri_id in shard.table.slots], now)
+
+
+    def export(self) -> tuple:
+        shards = self.shards
+        if len(shards) == 1:
+            with shards[0].lock:
+                ids, columns = shards[0].table.export()
+                return ids, {column: values.copy() for column, values in columns.items()}
+        # every shard is locked for the copy, so the ids and the columns match.
+        # writers hold one shard lock at a time, taking them in order cannot deadlock
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            ids = self.ids
+            columns = {column: np.concatenate([getattr(shard.table, column)[:shard.table.size] for shard in shards])
+                       for column in AvailabilityTable.columns}
+            return ids, columns
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+
+    def view(self) -> AvailabilityView:
+        return AvailabilityView(self)
+
+
+class _Slots(Mapping):
+
+    def __init__(self, table: ShardedAvailabilityTable) -> None:
+        self._table = table
+
+
+    def __getitem__(self, hri_id) -> int:
+        return self._table.shard(hri_id).table.slots[hri_id]
+
+
+    def __contains__(self, hri_id) -> bool:
+        return hri_id in self._table.shard(hri_id).table.slots
+
+
+    def __iter__(self):
+        return iter(self._table.ids)
+
+
+    def __len__(self) -> int:
+        return len(self._table)
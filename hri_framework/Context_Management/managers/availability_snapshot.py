@@ -0,0 +1,287 @@
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hri_framework.Context_Management.managers.availability_table import AvailabilityView
+from hri_framework.Context_Management.managers.scoring_models import DecayModel, feature_matrix, make_model
+
+
+# control block: sequence (odd while a publication is being written), generation of the data block, its name
+_control = struct.Struct("<QQ64s")
+# data block header: ids version, size, ids length, model config length, threshold, published at
+_header = struct.Struct("<QQQQdd")
+
+_dtypes = {"anchor_time": np.float64, "anchor_score": np.float64, "versions": np.int64, "distance": np.float64,
+           "engagement": np.float64, "last_interaction": np.float64, "present": bool, "versioned": bool}
+
+
+def _layout(size: int, ids_length: int, model_length: int) -> dict:
+    # offsets of the columns in the data block, all 8 byte aligned, followed by the ids and the model config
+    offsets = dict()
+    offset = _header.size
+    for column, dtype in _dtypes.items():
+        offsets[column] = offset
+        offset += (size * np.dtype(dtype).itemsize + 7) & ~7
+    offsets["ids"] = offset
+    offsets["model"] = offset + ids_length
+    offsets["end"] = offsets["model"] + model_length
+    return offsets
+
+
+def _columns(buf, size: int, offsets: dict) -> dict:
+    return {column: np.ndarray(size, dtype=dtype, buffer=buf, offset=offsets[column]) for column, dtype in _dtypes.items()}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # readers must not unlink the blocks they attach to when they exit, only the publisher does
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # python < 3.13 always registers the block with the resource tracker
+        from multiprocessing import resource_tracker
+
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+##
+# @brief Publishes the state of an AvailabilityTable to shared memory, for other processes to read
+#
+# a small control block holds a sequence number and the name of the data block,
+# which holds the anchors, presence, signals and versions of every tracked person,
+# the scoring model's config and the threshold. scores are not published, readers
+# evaluate them with the same model at the time they read, exactly like the table does.
+# the sequence number is odd while a publication is written (a seqlock), readers
+# retry reads that overlapped one. the data block is replaced by a larger one
+# when the table outgrows it. there must be a single publisher per snapshot.
+#
+class AvailabilitySnapshot:
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name if name is not None else f"hri_availability_{os.getpid()}_{id(self):x}"
+        self.control = shared_memory.SharedMemory(self.name, create=True, size=_control.size)
+        self.control.buf[:_control.size] = _control.pack(0, 0, b"")
+        self.data = None
+        self.generation = 0
+        self.sequence = 0
+        self.ids_version = 0
+        self._ids = None            # the published ids list, and its length
+        self._ids_length = 0
+        self._ids_blob = b"[]"
+        self._model = None          # the published model, and its config
+        self._model_blob = b""
+
+
+    def _ensure_capacity(self, needed: int):
+        if self.data is not None and self.data.size >= needed:
+            return
+        old = self.data
+        self.generation += 1
+        self.data = shared_memory.SharedMemory(f"{self.name}_{self.generation}", create=True, size=max(needed * 2, 4096))
+        if old is not None:
+            # readers still attached to the old block keep their mapping until they move on
+            old.close()
+            old.unlink()
+
+
+    def publish(self, table, threshold: float, now: float | None = None):
+        ##
+        # table is an AvailabilityTable or a ShardedAvailabilityTable
+        #
+        if now is None:
+            now = time.time()
+        ids, columns = table.export()
+        n = len(columns["present"])
+        if ids is not self._ids or n != self._ids_length:
+            # the id list only changes when persons are added or evicted
+            self._ids = ids
+            self._ids_length = n
+            self._ids_blob = json.dumps(ids[:n], separators=(",", ":")).encode()
+            self.ids_version += 1
+
+        model = table.model
+        if model is not self._model:
+            self._model = model
+            self._model_blob = json.dumps(model.config(), separators=(",", ":")).encode()
+
+        offsets = _layout(n, len(self._ids_blob), len(self._model_blob))
+        control = self.control.buf
+        self.sequence += 1
+        control[:8] = struct.pack("<Q", self.sequence)
+        try:
+            self._ensure_capacity(offsets["end"])
+            buf = self.data.buf
+            _header.pack_into(buf, 0, self.ids_version, n, len(self._ids_blob), len(self._model_blob), threshold, now)
+            for column, values in _columns(buf, n, offsets).items():
+                values[:] = columns[column]
+            buf[offsets["ids"]:offsets["model"]] = self._ids_blob
+            buf[offsets["model"]:offsets["end"]] = self._model_blob
+            control[8:_control.size] = _control.pack(0, self.generation, self.data.name.encode())[8:]
+        finally:
+            self.sequence += 1
+            control[:8] = struct.pack("<Q", self.sequence)
+
+
+    def close(self):
+        for block in (self.data, self.control):
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.data = None
+
+
+##
+# @brief Read only AvailabilityTable look-alike over a published AvailabilitySnapshot
+#
+# it has what the AvailabilityManager queries and its view need (slots, ids, size,
+# entry(), version(), view()), so a manager attached to it answers from the
+# snapshot (see AvailabilityManager.attach()).
+# a person whose availability changed since the publisher last handed out a
+# version gets the negated version, which no publisher version can be.
+#
+class AvailabilitySnapshotReader:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.control = _attach(name)
+        self.data = None
+        self.generation = 0
+        self.ids_version = 0
+        self.sequence = -1
+        self.model = DecayModel()
+        self._model_blob = b""
+        self.threshold = 0.5
+        self.published_at = 0.0
+        self._slots = dict()
+        self._ids = []
+        self._size = 0
+        self._columns = dict()
+
+
+    def _sequence(self) -> int:
+        return struct.unpack_from("<Q", self.control.buf, 0)[0]
+
+
+    def _begin(self) -> int:
+        ##
+        # waits for a complete publication and moves to it, returns its sequence number
+        #
+        while True:
+            sequence = self._sequence()
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if sequence == self.sequence:
+                return sequence
+            try:
+                self._load()
+            except (ValueError, FileNotFoundError):
+                # the publisher moved on while we were loading
+                continue
+            if self._sequence() == sequence:
+                self.sequence = sequence
+                return sequence
+
+
+    def _load(self):
+        _, generation, name = _control.unpack_from(self.control.buf, 0)
+        if generation == 0:
+            return
+        if generation != self.generation:
+            self._columns = dict()
+            if self.data is not None:
+                self.data.close()
+            self.data = _attach(name.rstrip(b"\0").decode())
+            self.generation = generation
+        buf = self.data.buf
+        ids_version, size, ids_length, model_length, threshold, published_at = _header.unpack_from(buf, 0)
+        offsets = _layout(size, ids_length, model_length)
+        if ids_version != self.ids_version or size != self._size:
+            ids = json.loads(bytes(buf[offsets["ids"]:offsets["model"]]))
+            self._slots = {hri_id: slot for slot, hri_id in enumerate(ids)}
+            self._ids = ids
+            self.ids_version = ids_version
+        self._size = size
+        self._columns = _columns(buf, size, offsets)
+        model_blob = bytes(buf[offsets["model"]:offsets["end"]])
+        if model_blob != self._model_blob:
+            self.model = make_model(json.loads(model_blob))
+            self._model_blob = model_blob
+        self.threshold = threshold
+        self.published_at = published_at
+
+
+    def __len__(self) -> int:
+        self._begin()
+        return self._size
+
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+
+    @property
+    def slots(self) -> dict:
+        self._begin()
+        return self._slots
+
+
+    @property
+    def ids(self) -> list:
+        self._begin()
+        return self._ids
+
+
+    def _read(self, hri_id) -> dict:
+        # {column: 1 element array} of one person, from a single publication
+        # a person missing from a publication the writer has since replaced is looked up again
+        while True:
+            sequence = self._begin()
+            slot = self._slots.get(hri_id)
+            if slot is None:
+                if self._sequence() == sequence:
+                    raise KeyError(hri_id)
+                continue
+            values = {column: values[slot:slot + 1].copy() for column, values in self._columns.items()}
+            if self._sequence() == sequence:
+                return values
+
+
+    def _score(self, values: dict, now: float | None) -> float:
+        if now is None:
+            now = time.time()
+        model = self.model
+        return float(model(feature_matrix(values, now, model.features))[0])
+
+
+    def entry(self, hri_id: str, now: float | None = None) -> dict:
+        values = self._read(hri_id)
+        return {"present": bool(values["present"][0]), "availability_score": self._score(values, now)}
+
+
+    def version(self, hri_id: str, threshold: float, now: float | None = None) -> int:
+        values = self._read(hri_id)
+        available = self._score(values, now) >= threshold
+        versions = int(values["versions"][0])
+        return versions if available == values["versioned"][0] else -versions
+
+
+    def view(self) -> AvailabilityView:
+        return AvailabilityView(self)
+
+
+    def close(self):
+        self._columns = dict()
+        for block in (self.data, self.control):
+            if block is not None:
+                block.close()
+        self.data = None
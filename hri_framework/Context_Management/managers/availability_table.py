@@ -0,0 +1,301 @@
+from collections.abc import Mapping
+import threading
+import time
+
+import numpy as np
+
+from hri_framework.Context_Management.managers.scoring_models import DecayModel, ScoringModel, feature_matrix, inputs
+
+
+##
+# @brief Column store behind the AvailabilityManager.
+#
+# every hri_id is interned to a dense slot, and the per person state lives in
+# contiguous numpy columns indexed by that slot.
+# scores are not stepped per frame: each slot keeps the time of its last
+# presence change (anchor_time) and the score at that moment (anchor_score),
+# and the current score is computed by the scoring model only when someone
+# reads it, from the features of the persons (see scoring_models).
+# the signal columns (distance, engagement, last_interaction) hold the latest
+# reported values, nan until reported.
+# departed persons are evicted either once a ttl has passed since their departure
+# (their anchor_time) and their score decayed to nothing, or earliest departed
+# first when the table is over capacity. present persons are never evicted.
+# every slot also carries a version that changes whenever the person's
+# availability (score against the threshold) changes. versions come from one
+# increasing counter, so a person that is evicted and seen again never reuses
+# an old version.
+#
+class AvailabilityTable:
+
+    columns = ("present", "anchor_time", "anchor_score", "available", "versioned", "versions",
+               "distance", "engagement", "last_interaction")
+    signals = ("distance", "engagement", "last_interaction")
+
+    # versions are drawn from one counter shared by every table, so a table that
+    # replaces another (reset, reconfigured shards) never hands out a version again
+    next_version = 1
+    _versions_lock = threading.Lock()
+
+    def __init__(self, capacity: int = 64, model: ScoringModel | None = None) -> None:
+        self.model = model if model is not None else DecayModel()
+        self.slots = dict()         # hri_id -> slot
+        self.ids = []               # slot -> hri_id
+        self.present_ids = set()
+        self.size = 0
+        self.evictions = {"ttl": 0, "lru": 0}
+        self.last_sweep = 0.0
+        self.present = np.zeros(capacity, dtype=bool)
+        self.anchor_time = np.zeros(capacity, dtype=np.float64)
+        self.anchor_score = np.zeros(capacity, dtype=np.float64)
+        self.available = np.zeros(capacity, dtype=bool)     # as last reported by crossings()
+        self.versioned = np.zeros(capacity, dtype=bool)     # availability the version refers to
+        self.versions = np.zeros(capacity, dtype=np.int64)
+        self.distance = np.full(capacity, np.nan)
+        self.engagement = np.full(capacity, np.nan)
+        self.last_interaction = np.full(capacity, np.nan)
+        self.on_remove = None       # called with the ids of removed persons
+
+
+    def __len__(self) -> int:
+        return self.size
+
+
+    def _grow(self, needed: int):
+        capacity = len(self.present)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for column in self.columns:
+            setattr(self, column, np.resize(getattr(self, column), capacity))
+
+
+    def add(self, hri_ids: list, score: float, now: float) -> np.ndarray:
+        start = self.size
+        end = start + len(hri_ids)
+        self._grow(end)
+        for slot, hri_id in enumerate(hri_ids, start):
+            self.slots[hri_id] = slot
+        self.ids.extend(hri_ids)
+        self.present_ids.update(hri_ids)
+        self.present[start:end] = True
+        self.anchor_time[start:end] = now
+        self.anchor_score[start:end] = score
+        self.available[start:end] = False
+        self.versioned[start:end] = False
+        self.versions[start:end] = self._new_versions(end - start)
+        for column in self.signals:
+            getattr(self, column)[start:end] = np.nan
+        self.size = end
+        return np.arange(start, end)
+
+
+    def load(self, hri_ids: list, present, anchor_time, anchor_score, now: float) -> np.ndarray:
+        ##
+        # adds persons with a known state, e.g., recovered from a journal
+        #
+        slots = self.add(hri_ids, 0.0, now)
+        self.present[slots] = present
+        self.anchor_time[slots] = anchor_time
+        self.anchor_score[slots] = anchor_score
+        self.present_ids.difference_update(hri_id for hri_id, p in zip(hri_ids, present) if not p)
+        return slots
+
+
+    def lookup(self, hri_ids) -> np.ndarray:
+        slots = self.slots
+        return np.fromiter((slots[hri_id] for hri_id in hri_ids), dtype=np.intp, count=len(hri_ids))
+
+
+    def scores(self, slots: np.ndarray | None = None, now: float | None = None) -> np.ndarray:
+        if now is None:
+            now = time.time()
+        if slots is None:
+            slots = slice(0, self.size)
+        model = self.model
+        columns = {column: getattr(self, column)[slots] for column in inputs(model.features)}
+        return model(feature_matrix(columns, now, model.features))
+
+
+    def observe(self, hri_ids, distance, engagement):
+        ##
+        # records the latest signals of the given persons, nan for signals a detection did not report
+        #
+        slots = self.lookup(hri_ids)
+        self.distance[slots] = distance
+        self.engagement[slots] = engagement
+
+
+    def interact(self, hri_ids, now: float):
+        self.last_interaction[self.lookup(hri_ids)] = now
+
+
+    def _set_presence(self, hri_ids, present: bool, now: float):
+        if not hri_ids:
+            return
+        slots = self.lookup(hri_ids)
+        # re-anchor at the score reached so far, so the model continues from there
+        self.anchor_score[slots] = self.scores(slots, now)
+        self.anchor_time[slots] = now
+        self.present[slots] = present
+
+
+    def arrive(self, hri_ids, now: float):
+        self._set_presence(hri_ids, True, now)
+        self.present_ids.update(hri_ids)
+
+
+    def depart(self, hri_ids, now: float):
+        self._set_presence(hri_ids, False, now)
+        self.present_ids.difference_update(hri_ids)
+
+
+    def crossings(self, threshold: float, now: float) -> set:
+        ##
+        # returns the ids whose availability crossed the threshold since the
+        # previous call, in either direction
+        #
+        n = self.size
+        available = self.scores(None, now) >= threshold
+        crossed = np.flatnonzero(available != self.available[:n])
+        self.available[:n] = available
+        ids = self.ids
+        return {ids[slot] for slot in crossed}
+
+
+    def _new_versions(self, count: int) -> np.ndarray:
+        cls = AvailabilityTable
+        with cls._versions_lock:
+            start = cls.next_version
+            cls.next_version += count
+        return np.arange(start, start + count, dtype=np.int64)
+
+
+    def version(self, hri_id: str, threshold: float, now: float | None = None) -> int:
+        slot = self.slots[hri_id]
+        available = self.scores(np.array([slot]), now)[0] >= threshold
+        if available != self.versioned[slot]:
+            self.versioned[slot] = available
+            self.versions[slot] = self._new_versions(1)[0]
+        return int(self.versions[slot])
+
+
+    def invalidate_versions(self):
+        self.versions[:self.size] = self._new_versions(self.size)
+
+
+    def remove(self, slots: np.ndarray):
+        if len(slots) == 0:
+            return
+        keep = np.ones(self.size, dtype=bool)
+        keep[slots] = False
+        keep = np.flatnonzero(keep)
+        n = len(keep)
+
+        # compact the columns so the live slots stay dense
+        removed = [self.ids[slot] for slot in slots]
+        for hri_id in removed:
+            del self.slots[hri_id]
+            self.present_ids.discard(hri_id)
+        self.ids = [self.ids[slot] for slot in keep]
+        for slot, hri_id in enumerate(self.ids):
+            self.slots[hri_id] = slot
+        for column in self.columns:
+            values = getattr(self, column)
+            values[:n] = values[keep]
+        self.size = n
+        if self.on_remove is not None:
+            self.on_remove(removed)
+
+
+    def evict_expired(self, now: float, ttl: float, zero_score: float) -> int:
+        ##
+        # removes absent persons whose score is at most zero_score and who departed
+        # (anchor_time, the update in which they stopped being seen) at least ttl seconds ago
+        #
+        n = self.size
+        expired = ~self.present[:n] & (now - self.anchor_time[:n] >= ttl)
+        expired &= self.scores(None, now) <= zero_score
+        slots = np.flatnonzero(expired)
+        self.remove(slots)
+        self.evictions["ttl"] += len(slots)
+        return len(slots)
+
+
+    def evict_lru(self, max_entries: int) -> int:
+        excess = self.size - max_entries
+        if excess <= 0:
+            return 0
+        absent = np.flatnonzero(~self.present[:self.size])
+        if len(absent) > excess:
+            # absent persons are anchored at their departure
+            oldest = np.argpartition(self.anchor_time[absent], excess - 1)[:excess]
+            absent = absent[oldest]
+        self.remove(absent)
+        self.evictions["lru"] += len(absent)
+        return len(absent)
+
+
+    def entry(self, hri_id: str, now: float | None = None) -> dict:
+        slot = self.slots[hri_id]
+        score = self.scores(np.array([slot]), now)[0]
+        return {"present": bool(self.present[slot]), "availability_score": float(score)}
+
+
+    def rows(self, hri_ids=None) -> list:
+        ##
+        # [(hri_id, present, anchor_time, anchor_score)] of the given (default: all) tracked persons
+        #
+        slots = self.slots
+        if hri_ids is None:
+            hri_ids = self.ids[:self.size]
+        present, anchor_time, anchor_score = self.present, self.anchor_time, self.anchor_score
+        return [
+            (hri_id, bool(present[slot]), float(anchor_time[slot]), float(anchor_score[slot]))
+            for hri_id, slot in ((hri_id, slots.get(hri_id)) for hri_id in hri_ids) if slot is not None
+        ]
+
+
+    def export(self) -> tuple:
+        ##
+        # (ids, {column: values}) of the tracked persons, the values are views of the columns
+        #
+        n = self.size
+        return self.ids, {column: getattr(self, column)[:n] for column in self.columns}
+
+
+    def view(self) -> "AvailabilityView":
+        return AvailabilityView(self)
+
+
+##
+# @brief Read only {hri_id: {"present": bool, "availability_score": float}} view over a table
+#
+# scores are evaluated at the time of the lookup, read from clock (default: the wall clock).
+#
+class AvailabilityView(Mapping):
+
+    def __init__(self, table: AvailabilityTable, clock=None) -> None:
+        self._table = table
+        self._clock = clock
+
+
+    def __getitem__(self, hri_id: str) -> dict:
+        return self._table.entry(hri_id, self._clock() if self._clock is not None else None)
+
+
+    def __contains__(self, hri_id) -> bool:
+        return hri_id in self._table.slots
+
+
+    def __iter__(self):
+        return iter(self._table.ids[:self._table.size])
+
+
+    def __len__(self) -> int:
+        return self._table.size
+
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
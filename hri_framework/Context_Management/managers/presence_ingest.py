@@ -0,0 +1,116 @@
+import threading
+import time
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+
+##
+# @brief Streaming ingest of person detection frames in front of the AvailabilityManager
+#
+# the perception pipeline submit()s frames from its own thread(s), a background
+# thread hands them to AvailabilityManager.handle_persons() at most rate times a
+# second. a frame is the full set of persons a source detects, so a newer frame of
+# a source supersedes the older one: at most one frame per source waits, frames
+# arriving faster than the update rate (e.g., the backlog after a CPU stall) are
+# coalesced into the latest one and counted, instead of being replayed one by one.
+# a late frame, captured before the frame of its source already waiting, is dropped
+# and counted apart.
+# the merged frame keeps the latest capture time, and a frame never waits more than
+# one update interval plus the time of one update.
+#
+class PresenceIngest:
+
+    def __init__(self, manager: AvailabilityManager | None = None, rate: float = 30.0) -> None:
+        self.manager = manager if manager is not None else AvailabilityManager()
+        self.interval = 1.0 / rate if rate else 0.0
+        # frames: submitted, coalesced: superseded before they were applied, dropped_late: older than the
+        # frame already waiting, updates: handle_persons() calls,
+        # max_latency: longest wait (seconds) of a frame between its submission and its update
+        self.stats = {"frames": 0, "coalesced": 0, "dropped_late": 0, "updates": 0, "max_latency": 0.0}
+        self._pending = dict()      # source -> (persons, capture time, submission time of the oldest coalesced frame)
+        self._condition = threading.Condition()
+        # held from taking the waiting frames until they are applied, so frames are applied in the order they were taken
+        self._apply_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="hri-presence-ingest", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        ##
+        # applies the frames still waiting and stops the ingest thread
+        #
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def submit(self, persons: list, now: float | None = None, source="default"):
+        ##
+        # queues the detections of a frame captured at now, never blocks on the manager
+        #
+        if now is None:
+            now = self.manager.clock()
+        submitted = time.monotonic()
+        with self._condition:
+            self.stats["frames"] += 1
+            pending = self._pending.get(source)
+            if pending is not None:
+                if now < pending[1]:
+                    # a late frame, older than the one already waiting
+                    self.stats["dropped_late"] += 1
+                    return
+                self.stats["coalesced"] += 1
+                submitted = pending[2]
+            self._pending[source] = (persons, now, submitted)
+            self._condition.notify()
+
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+    def flush(self) -> int:
+        ##
+        # applies the waiting frames on the calling thread, returns how many.
+        # waits for an update in progress on the ingest thread first
+        #
+        with self._apply_lock:
+            with self._condition:
+                pending, self._pending = self._pending, dict()
+            for source, (persons, now, submitted) in pending.items():
+                self.manager.handle_persons(persons, now, source)
+                latency = time.monotonic() - submitted
+                with self._condition:
+                    self.stats["updates"] += 1
+                    self.stats["max_latency"] = max(self.stats["max_latency"], latency)
+            return len(pending)
+
+
+    def _run(self):
+        next_update = 0.0
+        while True:
+            with self._condition:
+                while self._running:
+                    if not self._pending:
+                        self._condition.wait()
+                        continue
+                    delay = next_update - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if not self._running and not self._pending:
+                    return
+            next_update = time.monotonic() + self.interval
+            self.flush()
@@ -0,0 +1,198 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+
+from hri_framework.Context_Management.managers.availability_decay import AvailabilityDecay
+
+
+# the features a model can ask for, per tracked person:
+#   present             1.0 while a source sees the person, else 0.0
+#   elapsed             seconds since the person's last presence change (the anchor)
+#   anchor_score        score at the last presence change
+#   dwell, absence      seconds present / absent so far (the other one is 0)
+#   distance            meters, as last reported by the detections
+#   engagement          0..1 gaze / engagement estimate, as last reported by the detections
+#   since_interaction   seconds since the last recorded interaction with the person
+# signals that were never reported are nan
+FEATURES = ("present", "elapsed", "anchor_score", "dwell", "absence", "distance", "engagement", "since_interaction")
+
+_features = {
+    "present": lambda columns, elapsed, now: columns["present"],
+    "elapsed": lambda columns, elapsed, now: elapsed,
+    "anchor_score": lambda columns, elapsed, now: columns["anchor_score"],
+    "dwell": lambda columns, elapsed, now: np.where(columns["present"], elapsed, 0.0),
+    "absence": lambda columns, elapsed, now: np.where(columns["present"], 0.0, elapsed),
+    "distance": lambda columns, elapsed, now: columns["distance"],
+    "engagement": lambda columns, elapsed, now: columns["engagement"],
+    "since_interaction": lambda columns, elapsed, now: now - columns["last_interaction"],
+}
+
+
+# the table columns each feature is computed from
+_columns = {"anchor_score": ("anchor_score",), "distance": ("distance",), "engagement": ("engagement",),
+            "since_interaction": ("last_interaction",)}
+
+
+@lru_cache(maxsize=None)
+def inputs(features: tuple) -> tuple:
+    ##
+    # the table columns feature_matrix() needs for the given features
+    #
+    columns = ["present", "anchor_time"]
+    for feature in features:
+        columns.extend(column for column in _columns.get(feature, ()) if column not in columns)
+    return tuple(columns)
+
+
+def feature_matrix(columns, now: float, features: tuple = FEATURES) -> np.ndarray:
+    ##
+    # (persons x features) matrix of the given features, from the table columns of the persons
+    #
+    elapsed = np.maximum(now - columns["anchor_time"], 0.0)
+    # column major, every feature is filled (and read by the model) as one contiguous column
+    matrix = np.empty((len(features), len(elapsed))).T
+    for i, feature in enumerate(features):
+        matrix[:, i] = _features[feature](columns, elapsed, now)
+    return matrix
+
+
+##
+# @brief Computes the availability scores of a batch of persons
+#
+# a model lists the features it needs, and is called with the
+# (persons x features) matrix of those features, in that order.
+# it returns the score of every person, in [0, 1].
+# scores are re-anchored at every presence change, a model that scores from
+# (present, anchor_score, elapsed) continues from the score reached so far.
+# parameters are the keyword arguments of the constructor, configure() and the
+# shared memory snapshot rebuild models from them.
+#
+class ScoringModel(ABC):
+
+    name = None
+    parameters = ()
+    features = ()
+
+    @abstractmethod
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        pass
+
+
+    def params(self) -> dict:
+        return {parameter: getattr(self, parameter) for parameter in self.parameters}
+
+
+    def config(self) -> dict:
+        return {"model": self.name, **self.params()}
+
+
+##
+# @brief The wall clock rise / decay curve (see AvailabilityDecay), the default model
+#
+class DecayModel(ScoringModel):
+
+    name = "decay"
+    parameters = ("rise_time", "half_life", "decay")
+    features = ("present", "anchor_score", "elapsed")
+
+    def __init__(self, rise_time: float = 5.0, half_life: float = 10.0, decay: str = "exponential") -> None:
+        self.curve = AvailabilityDecay(rise_time, half_life, decay)
+        self.rise_time = rise_time
+        self.half_life = half_life
+        self.decay = decay
+
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return self.curve(features[:, 0] > 0, features[:, 1], features[:, 2])
+
+
+##
+# @brief The original rule: +step per frame while present, -step per frame while absent, at a nominal fps
+#
+class StepModel(ScoringModel):
+
+    name = "step"
+    parameters = ("step", "fps")
+    features = ("present", "anchor_score", "elapsed")
+
+    def __init__(self, step: float = 0.1, fps: float = 15.0) -> None:
+        if step <= 0 or fps <= 0:
+            raise ValueError("step and fps must be positive")
+        self.step = step
+        self.fps = fps
+
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        direction = np.where(features[:, 0] > 0, 1.0, -1.0)
+        return np.clip(features[:, 1] + direction * self.step * self.fps * features[:, 2], 0.0, 1.0)
+
+
+##
+# @brief Exponential smoothing of presence: the score closes half of its gap to 1 (present) or 0 (absent) every half_life seconds
+#
+class SmoothingModel(ScoringModel):
+
+    name = "smoothing"
+    parameters = ("half_life",)
+    features = ("present", "anchor_score", "elapsed")
+
+    def __init__(self, half_life: float = 3.0) -> None:
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.half_life = half_life
+
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        target = features[:, 0] > 0
+        return target + (features[:, 1] - target) * np.exp2(-features[:, 2] / self.half_life)
+
+
+##
+# @brief bias + weights . features, clipped to [0, 1]
+#
+# features are capped at their limit first, so e.g. a long dwell saturates.
+# unreported (nan) signals contribute nothing.
+#
+class LinearModel(ScoringModel):
+
+    name = "linear"
+    parameters = ("weights", "bias", "limits")
+
+    def __init__(self, weights: dict | None = None, bias: float = 0.1, limits: dict | None = None) -> None:
+        if weights is None:
+            weights = {"present": 0.4, "dwell": 0.01, "absence": -0.005, "distance": -0.1, "engagement": 0.3}
+        if limits is None:
+            limits = {"dwell": 30.0, "absence": 60.0, "distance": 5.0, "since_interaction": 300.0}
+        unknown = (weights.keys() | limits.keys()) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features {sorted(unknown)}")
+        self.weights = dict(weights)
+        self.bias = bias
+        self.limits = dict(limits)
+        self.features = tuple(feature for feature in FEATURES if weights.get(feature, 0.0))
+        self._weights = np.array([weights[feature] for feature in self.features])
+        self._limits = np.array([limits.get(feature, np.inf) for feature in self.features])
+
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        features = np.nan_to_num(np.minimum(features, self._limits), nan=0.0)
+        return np.clip(features @ self._weights + self.bias, 0.0, 1.0)
+
+
+MODELS = {model.name: model for model in (DecayModel, StepModel, SmoothingModel, LinearModel)}
+
+
+def make_model(config: dict, current: ScoringModel | None = None) -> ScoringModel:
+    ##
+    # the model named by config["model"] (default: the current model's kind, or "decay"),
+    # with the parameters found in config. the other parameters are the current
+    # model's if it is of the same kind, else the defaults
+    #
+    name = config.get("model", current.name if current is not None else DecayModel.name)
+    model = MODELS.get(name)
+    if model is None:
+        raise ValueError(f"unknown availability scoring model '{name}'")
+    params = current.params() if current is not None and current.name == name else dict()
+    params.update({parameter: config[parameter] for parameter in model.parameters if parameter in config})
+    return model(**params)
@@ -0,0 +1,81 @@
+import importlib
+import pkgutil
+import threading
+
+
+##
+# @brief Lazily populated registry of the classes found in a package directory
+#
+# names() lists the package's modules without importing any of them, and a
+# class is imported the first time it is asked for, so startup only pays for
+# the handlers that are actually used.
+# a name is either a class name (looked up in the module of the same name
+# first), a full dotted path, as used by the "code" entries of the config, or
+# "module:Qualified.Name", as recorded by tracing.
+#
+class LazyRegistry:
+
+    def __init__(self, package: str) -> None:
+        self.package = package
+        self._classes = dict()
+        self._lock = threading.Lock()
+
+
+    def names(self) -> list:
+        path = importlib.import_module(self.package).__path__
+        return sorted(module.name for module in pkgutil.iter_modules(path))
+
+
+    def get(self, name: str):
+        cls = self._classes.get(name)
+        if cls is None:
+            with self._lock:
+                cls = self._classes.get(name)
+                if cls is None:
+                    cls = self._resolve(name)
+                    self._classes[name] = cls
+        return cls
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._classes
+
+
+    def _resolve(self, name: str):
+        if ":" in name:
+            module_name, qualname = name.split(":")
+            cls = importlib.import_module(module_name)
+            for attr in qualname.split("."):
+                cls = getattr(cls, attr)
+            return cls
+
+        if "." in name:
+            # "package.module.Class", or "package.Module" for a module holding a class of the same name
+            module_name, class_name = name.rsplit(".", 1)
+            try:
+                module = importlib.import_module(name)
+            except ModuleNotFoundError as e:
+                if e.name != name:
+                    raise
+                module = importlib.import_module(module_name)
+            return getattr(module, class_name)
+
+        candidates = self.names()
+        if name in candidates:
+            # the usual layout: the module has the name of its class
+            candidates.remove(name)
+            candidates.insert(0, name)
+        for module_name in candidates:
+            try:
+                module = importlib.import_module(f"{self.package}.{module_name}")
+            except ImportError:
+                if module_name == name:
+                    raise
+                continue
+            if hasattr(module, name):
+                return getattr(module, name)
+        raise KeyError(f"{name} not found in {self.package}")
+
+
+event_handlers = LazyRegistry("hri_framework.Context_Management.event_handlers_dir")
+request_handlers = LazyRegistry("hri_framework.Context_Management.requests")
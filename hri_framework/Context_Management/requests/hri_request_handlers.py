@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+import asyncio
 
+from hri_framework.Context_Management import instrumentation
+
+
+# the missing_info of the responses that lack nothing, shared since it cannot be modified
+NO_MISSING_INFO = ()
 
 class HRIVerbalRequest:
     """
@@ -13,6 +19,8 @@ class HRIVerbalRequest:
     values (dict): the extracted values for the parameters in the pattern e.g., {"{object}":"bottle", "{who}":"bob"}
     emotion (str): the associated emotion (if) detected by the HRI toolkit    
     """
+    __slots__ = ("rawText", "pattern", "values", "emotion")
+
     def __init__(self,rawText:str, pattern:str,values:dict,emotion:str) -> None:
         self.rawText=rawText
         self.pattern=pattern
@@ -33,6 +41,8 @@ class HRIVisualRequest:
     poseDict (dict): a dictionary of [str,pose] that associates relevant ROS2 Pose objects, e.g., "left hand" with the vector it points to
     otherParams (dict): a dictionary of other parameters the gesture detector may provide     
     """
+    __slots__ = ("gestureName", "poseDict", "otherParams")
+
     def __init__(self,gestureName:str, poseDict:dict,otherParams:dict) -> None:
         self.gestureName=gestureName
         self.poseDict=poseDict
@@ -56,11 +66,14 @@ class HRIRequest:
     priority (int): lower is prioritized
     reactive (boolean): defines whether or not the request will also be handled by the Social Planning mechanism. reactive requests bypass this mechanism
     """
-    def __init__(self,person:dict, verbalReq:HRIVerbalRequest, visualReq:HRIVisualRequest,priority:int) -> None:
+    __slots__ = ("person", "verbalReq", "visualReq", "priority", "reactive")
+
+    def __init__(self,person:dict, verbalReq:HRIVerbalRequest, visualReq:HRIVisualRequest,priority:int,reactive:bool=False) -> None:
         self.person=person
         self.verbalReq=verbalReq
         self.visualReq=visualReq
         self.priority=priority
+        self.reactive=reactive
 
 
 class HRIBeliefSystem(ABC):
@@ -230,14 +243,17 @@ class HRIResponse:
     missing_info : list of str
         A list of information or attributes that were required but missing in order to fully process 
         the request. For example, ["object color", "destination location"].
+        Responses that lack nothing share the empty NO_MISSING_INFO tuple, pass a list to add to it.
 
     Methods:
     --------
-    __init__(self, actions: list, emotion: str, reason: str, success: bool, missing_info: list) -> None:
+    __init__(self, actions: list, emotion: str, reason: str, success: bool, missing_info: list | tuple = NO_MISSING_INFO) -> None:
         Initializes the HRIResponse object with the provided attributes.
     """
 
-    def __init__(self, actions: list, emotion: str, reason: str, success: bool, missing_info: list) -> None:
+    __slots__ = ("actions", "emotion", "reason", "success", "missing_info")
+
+    def __init__(self, actions: list, emotion: str, reason: str, success: bool, missing_info: list | tuple = NO_MISSING_INFO) -> None:
         """
         Initializes the HRIResponse object.
 
@@ -277,8 +293,27 @@ class HRIRequestHandler(ABC):
     --------
     handle_request(self, request: HRIRequest, , beliefSystem:HRIBeliefSystem) -> HRIResponse:
         Processes the given HRIRequest w.r.t hri belief system and returns an HRIResponse.
+
+    handle_request_async(self, request: HRIRequest, beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        Awaitable version of handle_request. By default handle_request runs on the event loop's executor.
+
+    Attributes:
+    -----------
+    timeout : float
+        Seconds the AsyncDispatcher waits for this handler, None waits forever.
+
+    process : bool
+        Run by the AsyncDispatcher's process pool (when it has one) instead of a thread, for CPU bound handlers.
+        The handler, the request and the belief system are pickled for every call.
     """
 
+    timeout = None
+    process = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrumentation.register(cls, "request_handler")
+
     @abstractmethod
     def handle_request(self, request: HRIRequest, beliefSystem:HRIBeliefSystem) -> HRIResponse:
         """
@@ -306,4 +341,28 @@ class HRIRequestHandler(ABC):
         print(response.actions)
         # Output: ["move to living room", "say 'I am bringing the bottle'"]
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def handle_request_async(self, request: HRIRequest, beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        """
+        Processes the given HRIRequest without blocking the event loop.
+        Handlers that are natively asynchronous should derive from AsyncHRIRequestHandler instead.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.handle_request, request, beliefSystem)
+
+
+class AsyncHRIRequestHandler(HRIRequestHandler):
+    """
+    Interface for natively asynchronous request handlers, e.g., handlers waiting on an LLM or on
+    a belief system query. handle_request remains available for sync callers that have no running event loop.
+    """
+
+    _instrument = False  # only its subclasses are timed
+
+    @abstractmethod
+    async def handle_request_async(self, request: HRIRequest, beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        pass
+
+    def handle_request(self, request: HRIRequest, beliefSystem:HRIBeliefSystem) -> HRIResponse:
+        return asyncio.run(self.handle_request_async(request, beliefSystem))
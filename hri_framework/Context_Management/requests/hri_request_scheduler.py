@@ -0,0 +1,228 @@
+from collections import deque
+import heapq
+import itertools
+import threading
+import time
+
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIRequestHandler, HRIResponse
+
+
+class _Entry:
+    __slots__ = ("key", "seq", "enqueued", "request", "alive")
+
+    def __init__(self, key: float, seq: int, enqueued: float, request: HRIRequest) -> None:
+        self.key = key
+        self.seq = seq
+        self.enqueued = enqueued
+        self.request = request
+        self.alive = True
+
+    def __lt__(self, other: "_Entry") -> bool:
+        return (self.key, self.seq) < (other.key, other.seq)
+
+
+def _person_id(request: HRIRequest):
+    person = request.person
+    return person.get("id") if isinstance(person, dict) else person
+
+
+def _verbal_signature(verbal) -> tuple:
+    # the pattern and its extracted values, "bring the cup to alice" and "bring the bottle to bob" differ
+    if verbal.pattern:
+        try:
+            values = tuple(sorted((verbal.values or {}).items()))
+            hash(values)
+            return (verbal.pattern, values)
+        except TypeError:
+            # unhashable or unorderable values
+            pass
+    return (verbal.pattern, verbal.rawText)
+
+
+def _signature(request: HRIRequest) -> tuple:
+    # two requests of the same person with the same signature are duplicates
+    verbal = _verbal_signature(request.verbalReq) if request.verbalReq is not None else None
+    visual = request.visualReq.gestureName if request.visualReq is not None else None
+    return (_person_id(request), verbal, visual)
+
+
+class HRIRequestScheduler:
+    """
+    Schedules HRIRequests in front of an HRIRequestHandler by their priority (lower is prioritized).
+
+    - reactive requests go to a fast lane, served first in arrival order.
+    - other requests wait in a heap. a request gains one priority level for every aging_interval
+      seconds it waits, so low priority requests are not starved.
+      since every waiting request ages at the same rate, its heap key (priority + enqueue time / aging_interval)
+      never has to be updated.
+    - the queue holds at most max_queue requests. when it is full the shedding policy applies:
+        "drop_stale": requests that waited more than stale_after seconds are dropped first,
+        "merge": a new request replaces a queued duplicate of the same person (same pattern and values / gesture),
+                 keeping the better priority and the older enqueue time.
+      if no room is left after that, the worst queued request is dropped, or the new request is rejected
+      when it is the worst.
+    - metrics() reports the queue depth, wait times and counters.
+    """
+
+    policies = ("drop_stale", "merge")
+
+    def __init__(self, handler: HRIRequestHandler, beliefSystem, max_queue: int = 64, aging_interval: float = 2.0,
+                 shedding: str = "drop_stale", stale_after: float = 10.0, clock=time.monotonic) -> None:
+        if shedding not in self.policies:
+            raise ValueError(f"unknown shedding policy '{shedding}'")
+        self.handler = handler
+        self.beliefSystem = beliefSystem
+        self.max_queue = max_queue
+        self.aging_interval = aging_interval
+        self.shedding = shedding
+        self.stale_after = stale_after
+        self.clock = clock
+
+        self._heap = []
+        self._fast = deque()
+        self._duplicates = dict()     # signature -> queued _Entry
+        self._size = 0
+        self._dead = 0                # removed entries still in the heap
+        self._seq = itertools.count()
+        self._ready = threading.Condition()
+
+        self._waits = deque(maxlen=1000)
+        self._counters = {"submitted": 0, "handled": 0, "rejected": 0, "dropped_stale": 0, "dropped_full": 0, "merged": 0}
+        self._max_depth = 0
+
+
+    def __len__(self) -> int:
+        return self._size
+
+
+    def submit(self, request: HRIRequest) -> bool:
+        """
+        Queues a request, returns False if it was rejected by the shedding policy.
+        """
+        now = self.clock()
+        with self._ready:
+            self._counters["submitted"] += 1
+            entry = _Entry(0.0, next(self._seq), now, request)
+
+            if getattr(request, "reactive", False):
+                if self._size >= self.max_queue and not self._drop_worst(None):
+                    self._counters["rejected"] += 1
+                    return False
+                self._fast.append(entry)
+            else:
+                entry.key = request.priority + now / self.aging_interval
+                if self.shedding == "merge" and self._merge(entry):
+                    return True
+                if self._size >= self.max_queue and not self._make_room(entry, now):
+                    self._counters["rejected"] += 1
+                    return False
+                heapq.heappush(self._heap, entry)
+                if self.shedding == "merge":
+                    self._duplicates[_signature(request)] = entry
+
+            self._size += 1
+            self._max_depth = max(self._max_depth, self._size)
+            self._ready.notify()
+            return True
+
+
+    def next(self, timeout: float | None = 0) -> HRIRequest | None:
+        """
+        Removes and returns the next request to handle, waiting up to timeout seconds (None waits forever).
+        """
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._size > 0, timeout):
+                return None
+            if self._fast:
+                entry = self._fast.popleft()
+            else:
+                entry = heapq.heappop(self._heap)
+                while not entry.alive:
+                    self._dead -= 1
+                    entry = heapq.heappop(self._heap)
+                if self.shedding == "merge":
+                    self._duplicates.pop(_signature(entry.request), None)
+            self._size -= 1
+            self._waits.append(self.clock() - entry.enqueued)
+            return entry.request
+
+
+    def run_once(self, timeout: float | None = 0) -> HRIResponse | None:
+        request = self.next(timeout)
+        if request is None:
+            return None
+        response = self.handler.handle_request(request, self.beliefSystem)
+        with self._ready:
+            self._counters["handled"] += 1
+        return response
+
+
+    def metrics(self) -> dict:
+        with self._ready:
+            waits = sorted(self._waits)
+            result = dict(self._counters)
+            result["depth"] = self._size
+            result["max_depth"] = self._max_depth
+            result["wait_mean"] = sum(waits) / len(waits) if waits else 0.0
+            result["wait_p99"] = waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else 0.0
+            return result
+
+
+    def _remove(self, entry: _Entry):
+        # heap entries are removed lazily, next() skips them
+        entry.alive = False
+        self._size -= 1
+        self._dead += 1
+        if self._dead > len(self._heap) // 2:
+            self._heap = [queued for queued in self._heap if queued.alive]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        if self.shedding == "merge":
+            signature = _signature(entry.request)
+            if self._duplicates.get(signature) is entry:
+                del self._duplicates[signature]
+
+
+    def _merge(self, entry: _Entry) -> bool:
+        queued = self._duplicates.get(_signature(entry.request))
+        if queued is None or not queued.alive:
+            return False
+        # a better priority re-queues the duplicate with the queued enqueue time,
+        # otherwise the queued entry keeps its place and only carries the newer request
+        if entry.request.priority < queued.request.priority:
+            self._remove(queued)
+            entry.key = entry.request.priority + queued.enqueued / self.aging_interval
+            entry.enqueued = queued.enqueued
+            heapq.heappush(self._heap, entry)
+            self._duplicates[_signature(entry.request)] = entry
+            self._size += 1
+        else:
+            queued.request = entry.request
+        self._counters["merged"] += 1
+        return True
+
+
+    def _make_room(self, entry: _Entry, now: float) -> bool:
+        if self.shedding == "drop_stale":
+            for queued in self._heap:
+                if queued.alive and now - queued.enqueued > self.stale_after:
+                    self._remove(queued)
+                    self._counters["dropped_stale"] += 1
+            if self._size < self.max_queue:
+                return True
+        return self._drop_worst(entry)
+
+
+    def _drop_worst(self, entry: _Entry | None) -> bool:
+        ##
+        # drops the worst queued request if it is worse than entry (any request if entry is None)
+        #
+        alive = [queued for queued in self._heap if queued.alive]
+        if not alive:
+            return False
+        worst = max(alive)
+        if entry is not None and not entry < worst:
+            return False
+        self._remove(worst)
+        self._counters["dropped_full"] += 1
+        return True
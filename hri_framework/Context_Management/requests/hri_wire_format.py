@@ -0,0 +1,464 @@
+"""
+Compact binary encoding of HRIRequest, HRIResponse and Decision, for handing them between
+processes or recording them.
+
+A message is a 4 byte header (magic, format version, message kind) followed by the fields of
+the message, each encoded as a tagged value:
+    - well known strings (emotions, gesture names, pose names, ...) are interned in STRINGS and
+      take 3 bytes, other strings are stored inline as utf-8
+    - ints and floats are fixed width (int64 / float64)
+    - poses (ROS2 Pose or anything with position.x/y/z and orientation.x/y/z/w) are 7 float64
+    - dicts, lists and tuples nest, HRIActions of a response keep their fields
+
+decode() accepts bytes, bytearray, mmap or memoryview and reads the fields in place, without
+copying the buffer. Poses are decoded as PoseView objects that read their coordinates from the
+buffer when accessed, so they keep the buffer alive.
+
+encode_value() / decode_value() encode a single tagged value without a message header, e.g.,
+for the records of a trace (see Context_Management/tracing.py).
+
+usage:
+    data = encode(request)
+    request = decode(data)
+
+a buffer that ends in the middle of a message or value raises ValueError, like an unknown tag
+or a dict key that is not hashable.
+
+both ends must use the same STRINGS table, strings registered with register_strings() have to be
+registered in the same order by every process.
+"""
+import struct
+from collections import namedtuple
+
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIResponse, HRIVerbalRequest, HRIVisualRequest
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision
+
+
+MAGIC = b"HW"
+VERSION = 1
+
+# message kinds
+REQUEST = 1
+RESPONSE = 2
+DECISION = 3
+
+# the interned strings, appending keeps existing encodings valid, any other change needs a new VERSION
+STRINGS = [
+    "", "neutral", "natural", "happy", "sad", "angry", "frustrated", "surprised", "confused", "excited",
+    "pointing", "waving", "nodding", "head_shake", "thumbs_up", "stop", "come_here",
+    "left hand", "right hand", "head", "say", "id", "name", "presence", "location",
+    "hri_id", "distance", "engagement",
+]
+_string_index = {s: i for i, s in enumerate(STRINGS)}
+
+# value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _INTERNED, _STR, _LIST, _TUPLE, _DICT, _POSE, _ACTION, _BYTES = range(13)
+
+_header = struct.Struct("<2sBB")
+_tag_u16 = struct.Struct("<BH")
+_tag_u32 = struct.Struct("<BI")
+_tag_i64 = struct.Struct("<Bq")
+_tag_f64 = struct.Struct("<Bd")
+_u16 = struct.Struct("<H")
+_u32 = struct.Struct("<I")
+_i64 = struct.Struct("<q")
+_f64 = struct.Struct("<d")
+_pose = struct.Struct("<7d")
+
+Point = namedtuple("Point", "x y z")
+Quaternion = namedtuple("Quaternion", "x y z w")
+
+
+def register_strings(*strings: str):
+    for s in strings:
+        if s not in _string_index:
+            if len(STRINGS) >= 0xFFFF:
+                raise ValueError("the interned string table is full")
+            _string_index[s] = len(STRINGS)
+            STRINGS.append(s)
+
+
+class PoseView:
+    """
+    A pose decoded in place: position (x, y, z) and orientation (x, y, z, w) are read from the
+    encoded buffer on access.
+    """
+    __slots__ = ("_buf", "_offset")
+
+    def __init__(self, buf: memoryview, offset: int) -> None:
+        self._buf = buf
+        self._offset = offset
+
+    def values(self) -> tuple:
+        return _pose.unpack_from(self._buf, self._offset)
+
+    @property
+    def position(self) -> Point:
+        return Point._make(struct.unpack_from("<3d", self._buf, self._offset))
+
+    @property
+    def orientation(self) -> Quaternion:
+        return Quaternion._make(struct.unpack_from("<4d", self._buf, self._offset + 24))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PoseView) and self.values() == other.values()
+
+    def __repr__(self) -> str:
+        return f"PoseView(position={self.position}, orientation={self.orientation})"
+
+
+# encoding
+
+def _write_none(out: bytearray, value):
+    out.append(_NONE)
+
+
+def _write_bool(out: bytearray, value: bool):
+    out.append(_TRUE if value else _FALSE)
+
+
+def _write_int(out: bytearray, value: int):
+    try:
+        out += _tag_i64.pack(_INT, value)
+    except struct.error:
+        raise OverflowError(f"{value} does not fit in 64 bits") from None
+
+
+def _write_float(out: bytearray, value: float):
+    out += _tag_f64.pack(_FLOAT, value)
+
+
+def _write_str(out: bytearray, value: str):
+    index = _string_index.get(value)
+    if index is not None:
+        out += _tag_u16.pack(_INTERNED, index)
+    else:
+        data = value.encode()
+        out += _tag_u32.pack(_STR, len(data))
+        out += data
+
+
+def _write_bytes(out: bytearray, value):
+    out += _tag_u32.pack(_BYTES, len(value))
+    out += value
+
+
+def _write_sequence(out: bytearray, value, tag: int):
+    out += _tag_u32.pack(tag, len(value))
+    for item in value:
+        _write(out, item)
+
+
+def _write_list(out: bytearray, value: list):
+    _write_sequence(out, value, _LIST)
+
+
+def _write_tuple(out: bytearray, value: tuple):
+    _write_sequence(out, value, _TUPLE)
+
+
+def _write_dict(out: bytearray, value: dict):
+    out += _tag_u32.pack(_DICT, len(value))
+    for k, v in value.items():
+        _write(out, k)
+        _write(out, v)
+
+
+def _write_pose(out: bytearray, value):
+    out.append(_POSE)
+    if type(value) is PoseView:
+        out += value._buf[value._offset:value._offset + _pose.size]
+        return
+    p = value.position
+    o = value.orientation
+    out += _pose.pack(p.x, p.y, p.z, o.x, o.y, o.z, o.w)
+
+
+def _write_action(out: bytearray, value):
+    out.append(_ACTION)
+    _write(out, value.id)
+    _write(out, value.text)
+    _write(out, value.type)
+    _write(out, value.emotion)
+    _write(out, value.params)
+
+
+_writers = {
+    type(None): _write_none,
+    bool: _write_bool,
+    int: _write_int,
+    float: _write_float,
+    str: _write_str,
+    bytes: _write_bytes,
+    bytearray: _write_bytes,
+    list: _write_list,
+    tuple: _write_tuple,
+    dict: _write_dict,
+    PoseView: _write_pose,
+}
+
+
+def _write(out: bytearray, value):
+    writer = _writers.get(type(value))
+    if writer is not None:
+        writer(out, value)
+    elif hasattr(value, "position") and hasattr(value, "orientation"):
+        _write_pose(out, value)
+    elif hasattr(value, "text") and hasattr(value, "type") and hasattr(value, "params"):
+        _write_action(out, value)
+    else:
+        # subclasses of the supported builtin types
+        for base in (bool, int, float, str, bytes, list, tuple, dict):
+            if isinstance(value, base):
+                _writers[base](out, value)
+                return
+        raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def encode_value(value, out: bytearray | None = None) -> bytearray:
+    ##
+    # appends the tagged encoding of value (None, bool, int, float, str, bytes, list, tuple, dict, pose, HRIAction) to out
+    #
+    if out is None:
+        out = bytearray()
+    _write(out, value)
+    return out
+
+
+def encode_request(request: HRIRequest) -> bytes:
+    out = bytearray(_header.pack(MAGIC, VERSION, REQUEST))
+    _write(out, request.person)
+    _write(out, request.priority)
+    _write(out, request.reactive)
+    verbal = request.verbalReq
+    if verbal is None:
+        out.append(_NONE)
+    else:
+        out.append(_TRUE)
+        _write(out, verbal.rawText)
+        _write(out, verbal.pattern)
+        _write(out, verbal.values)
+        _write(out, verbal.emotion)
+    visual = request.visualReq
+    if visual is None:
+        out.append(_NONE)
+    else:
+        out.append(_TRUE)
+        _write(out, visual.gestureName)
+        _write(out, visual.poseDict)
+        _write(out, visual.otherParams)
+    return bytes(out)
+
+
+def encode_response(response: HRIResponse) -> bytes:
+    out = bytearray(_header.pack(MAGIC, VERSION, RESPONSE))
+    _write(out, response.actions)
+    _write(out, response.emotion)
+    _write(out, response.reason)
+    _write(out, response.success)
+    _write(out, response.missing_info)
+    return bytes(out)
+
+
+def encode_decision(decision: Decision) -> bytes:
+    out = bytearray(_header.pack(MAGIC, VERSION, DECISION))
+    _write(out, decision.go)
+    _write(out, decision.speedFactor)
+    _write(out, decision.emotion)
+    _write(out, decision.reason)
+    return bytes(out)
+
+
+def encode(message) -> bytes:
+    if isinstance(message, HRIRequest):
+        return encode_request(message)
+    if isinstance(message, HRIResponse):
+        return encode_response(message)
+    if isinstance(message, Decision):
+        return encode_decision(message)
+    raise TypeError(f"cannot encode {type(message).__name__}")
+
+
+# decoding, the readers take the buffer and an offset and return (value, next offset)
+
+def _truncated(offset: int) -> ValueError:
+    return ValueError(f"truncated value at offset {offset}")
+
+
+def _key(k, offset: int):
+    # a corrupted buffer can put a pose, a list or a dict where a key was encoded
+    try:
+        hash(k)
+    except TypeError:
+        raise ValueError(f"unhashable {type(k).__name__} dict key at offset {offset}") from None
+    return k
+
+
+def _read(buf: memoryview, offset: int):
+    # the common tags are handled inline, this runs once per encoded value
+    tag = buf[offset]
+    offset += 1
+    if tag == _INTERNED:
+        return STRINGS[buf[offset] | buf[offset + 1] << 8], offset + 2
+    if tag == _STR:
+        end = offset + 4 + _u32.unpack_from(buf, offset)[0]
+        if end > len(buf):
+            raise _truncated(offset - 1)
+        return str(buf[offset + 4:end], "utf-8"), end
+    if tag == _DICT:
+        items = {}
+        count = _u32.unpack_from(buf, offset)[0]
+        offset += 4
+        for _ in range(count):
+            k, end = _read(buf, offset)
+            k = _key(k, offset)
+            items[k], offset = _read(buf, end)
+        return items, offset
+    if tag == _INT:
+        return _i64.unpack_from(buf, offset)[0], offset + 8
+    if tag == _FLOAT:
+        return _f64.unpack_from(buf, offset)[0], offset + 8
+    if tag == _POSE:
+        if offset + _pose.size > len(buf):
+            raise _truncated(offset - 1)
+        return PoseView(buf, offset), offset + _pose.size
+    if tag <= _FALSE:
+        return (None, True, False)[tag], offset
+    if tag == _LIST or tag == _TUPLE:
+        items = []
+        count = _u32.unpack_from(buf, offset)[0]
+        offset += 4
+        for _ in range(count):
+            item, offset = _read(buf, offset)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), offset
+    if tag == _ACTION:
+        return _read_action(buf, offset)
+    if tag == _BYTES:
+        end = offset + 4 + _u32.unpack_from(buf, offset)[0]
+        if end > len(buf):
+            raise _truncated(offset - 1)
+        return bytes(buf[offset + 4:end]), end
+    raise ValueError(f"unknown value tag {tag} at offset {offset - 1}")
+
+
+def decode_value(data, offset: int = 0) -> tuple:
+    ##
+    # returns (value, offset after it)
+    #
+    buf = data if isinstance(data, memoryview) else memoryview(data)
+    if buf.format != "B":
+        buf = buf.cast("B")
+    try:
+        return _read(buf, offset)
+    except (IndexError, struct.error):
+        # the fixed width fields are read without checking the length first
+        raise ValueError("truncated value") from None
+    except RecursionError:
+        raise ValueError("value nested too deeply") from None
+
+
+_HRIAction = None
+
+
+def _read_action(buf: memoryview, offset: int):
+    global _HRIAction
+    if _HRIAction is None:
+        from hri_framework.HRI_LIB.hri_types.hri_action import HRIAction
+        _HRIAction = HRIAction
+
+    id, offset = _read(buf, offset)
+    text, offset = _read(buf, offset)
+    type, offset = _read(buf, offset)
+    emotion, offset = _read(buf, offset)
+    params, offset = _read(buf, offset)
+    return _HRIAction(id, text, type, emotion, params), offset
+
+
+def _open(data, kind: int) -> memoryview:
+    buf = data if isinstance(data, memoryview) else memoryview(data)
+    if buf.format != "B":
+        buf = buf.cast("B")
+    if len(buf) < _header.size:
+        raise ValueError("truncated HRI wire format message")
+    magic, version, found = _header.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not an HRI wire format v{VERSION} message")
+    if found not in (REQUEST, RESPONSE, DECISION) or kind is not None and found != kind:
+        raise ValueError(f"expected message kind {kind}, found {found}")
+    return buf
+
+
+def _decode_request(buf: memoryview) -> HRIRequest:
+    offset = _header.size
+    person, offset = _read(buf, offset)
+    priority, offset = _read(buf, offset)
+    reactive, offset = _read(buf, offset)
+
+    verbal = None
+    offset += 1
+    if buf[offset - 1] != _NONE:
+        rawText, offset = _read(buf, offset)
+        pattern, offset = _read(buf, offset)
+        values, offset = _read(buf, offset)
+        emotion, offset = _read(buf, offset)
+        verbal = HRIVerbalRequest(rawText, pattern, values, emotion)
+
+    visual = None
+    offset += 1
+    if buf[offset - 1] != _NONE:
+        gestureName, offset = _read(buf, offset)
+        poseDict, offset = _read(buf, offset)
+        otherParams, offset = _read(buf, offset)
+        visual = HRIVisualRequest(gestureName, poseDict, otherParams)
+
+    return HRIRequest(person, verbal, visual, priority, reactive)
+
+
+def _decode_response(buf: memoryview) -> HRIResponse:
+    offset = _header.size
+    actions, offset = _read(buf, offset)
+    emotion, offset = _read(buf, offset)
+    reason, offset = _read(buf, offset)
+    success, offset = _read(buf, offset)
+    missing_info, offset = _read(buf, offset)
+    return HRIResponse(actions, emotion, reason, success, missing_info)
+
+
+def _decode_decision(buf: memoryview) -> Decision:
+    offset = _header.size
+    go, offset = _read(buf, offset)
+    speedFactor, offset = _read(buf, offset)
+    emotion, offset = _read(buf, offset)
+    reason, offset = _read(buf, offset)
+    return Decision(go, speedFactor, emotion, reason)
+
+
+_decoders = {REQUEST: _decode_request, RESPONSE: _decode_response, DECISION: _decode_decision}
+
+
+def _decode(decoder, buf: memoryview):
+    try:
+        return decoder(buf)
+    except (IndexError, struct.error):
+        # the fixed width fields are read without checking the length first
+        raise ValueError("truncated HRI wire format message") from None
+    except RecursionError:
+        raise ValueError("HRI wire format message nested too deeply") from None
+
+
+def decode_request(data) -> HRIRequest:
+    return _decode(_decode_request, _open(data, REQUEST))
+
+
+def decode_response(data) -> HRIResponse:
+    return _decode(_decode_response, _open(data, RESPONSE))
+
+
+def decode_decision(data) -> Decision:
+    return _decode(_decode_decision, _open(data, DECISION))
+
+
+def decode(data):
+    buf = _open(data, None)
+    return _decode(_decoders[buf[3]], buf)
@@ -0,0 +1,379 @@
+"""
+Record and replay of the inputs of the availability pipeline, for reproducing field workloads offline.
+
+start(path, handlers) records, to a compact timestamped trace file, every call of
+    AvailabilityManager.handle_persons                  - the detections, their time and source
+    handle of the given event handler classes           - the belief system queries the handler made
+    handle_request of the given request handler classes - the request and the belief system queries
+(e.g., handlers=[UserPresenceEventHandler, MyRequestHandler]) and of their subclasses until stop().
+calls are recorded under the class of the handler that was called, a handler calling its base
+class' method is recorded once. the handlers see a belief system proxy that records what its get()
+returned, nothing else of the belief system is recorded. while recording is stopped the methods
+are left untouched.
+
+replay(path) runs the AvailabilityManager on an empty state and feeds the trace back through the
+same entry points, then puts the manager's previous state back. it refuses to run while the
+manager journals or publishes its state, or while a trace is being recorded.
+the handlers query a TraceBeliefSystem that answers with the recorded results. the manager's clock
+follows the trace, so a replay ends in the same availability state whether it runs at the recorded
+speed (realtime=True, optionally scaled by speed) or as fast as possible (it differs from the
+recorded run by the few microseconds between a call and the handler reading the clock). it returns
+the per stage latency and the final availability state.
+
+the trace is a header followed by records of (stage, time, payload length) and a payload encoded
+with hri_wire_format.encode_value(), requests in the wire format. recorder and replayer must use
+the same hri_wire_format.STRINGS table.
+
+usage:
+    from hri_framework.Context_Management import tracing
+    tracing.start("/tmp/event.hritrace", [UserPresenceEventHandler])
+    ...
+    tracing.stop()
+    report = tracing.replay("/tmp/event.hritrace")
+"""
+import functools
+import logging
+import statistics
+import struct
+import threading
+import time
+
+from hri_framework.Context_Management import registry
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from hri_framework.Context_Management.requests import hri_wire_format
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIBeliefSystem
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HRITRACE"
+VERSION = 1
+
+# file header: magic, trace format version, wire format version
+_file_header = struct.Struct("<8sHH")
+# record: stage, time of the call (AvailabilityManager clock), payload length
+_record = struct.Struct("<BdI")
+
+# stages
+PERSONS = 1     # payload [persons, time of the detections, source]
+EVENT = 2       # payload [handler, queries]
+REQUEST = 3     # payload [handler, encoded request, queries]
+
+
+_lock = threading.RLock()
+_file = None
+_originals = dict()         # (class, method name) -> (the wrapped function of the class, its wrapper)
+_traced = ()                # the handler classes being recorded
+_local = threading.local()  # .recording: a recorded call is in progress on this thread
+_stats = {"records": 0, "skipped": 0}
+
+
+def _handler_name(cls) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _write(stage: int, t: float, payload: list):
+    try:
+        data = hri_wire_format.encode_value(payload)
+    except TypeError as e:
+        # a value the wire format cannot encode, the call itself goes on
+        with _lock:
+            _stats["skipped"] += 1
+        logger.warning("trace record skipped: %s", e)
+        return
+    with _lock:
+        if _file is not None:
+            _file.write(_record.pack(stage, t, len(data)))
+            _file.write(data)
+            _stats["records"] += 1
+
+
+class _RecordingBeliefSystem:
+
+    def __init__(self, belief_system) -> None:
+        self._belief_system = belief_system
+        self.queries = []
+
+
+    def get(self, type: str, description: str) -> list:
+        result = self._belief_system.get(type, description)
+        self.queries.append([type, description, result])
+        return result
+
+
+    def __getattr__(self, name):
+        return getattr(self._belief_system, name)
+
+
+def _record_persons(fn):
+    @functools.wraps(fn)
+    def handle_persons(self, persons: list, now: float | None = None, source="default"):
+        if _file is None:
+            return fn(self, persons, now, source)
+        t = self.clock()
+        if now is None:
+            now = t
+        _write(PERSONS, t, [persons, now, source])
+        return fn(self, persons, now, source)
+    return handle_persons
+
+
+def _recorded(handler) -> bool:
+    # the outermost call of a traced handler, not a base class method it calls (e.g., through super())
+    return isinstance(handler, _traced) and not getattr(_local, "recording", False)
+
+
+def _record_event(fn):
+    @functools.wraps(fn)
+    def handle(self, beliefSystem):
+        if not _recorded(self):
+            return fn(self, beliefSystem)
+        t = AvailabilityManager.clock()
+        recording = _RecordingBeliefSystem(beliefSystem)
+        _local.recording = True
+        try:
+            return fn(self, recording)
+        finally:
+            _local.recording = False
+            _write(EVENT, t, [_handler_name(type(self)), recording.queries])
+    return handle
+
+
+def _record_request(fn):
+    @functools.wraps(fn)
+    def handle_request(self, request, beliefSystem):
+        if not _recorded(self):
+            return fn(self, request, beliefSystem)
+        t = AvailabilityManager.clock()
+        recording = _RecordingBeliefSystem(beliefSystem)
+        _local.recording = True
+        try:
+            return fn(self, request, recording)
+        finally:
+            _local.recording = False
+            _write(REQUEST, t, [_handler_name(type(self)), hri_wire_format.encode_request(request), recording.queries])
+    return handle_request
+
+
+def _patch(cls, method: str, wrap):
+    # wraps the class that defines the method, once, inherited methods are not wrapped again
+    for owner in cls.__mro__:
+        if method in owner.__dict__:
+            break
+    if (owner, method) not in _originals:
+        fn = owner.__dict__[method]
+        wrapper = wrap(fn)
+        _originals[(owner, method)] = (fn, wrapper)
+        setattr(owner, method, wrapper)
+
+
+def start(path: str, handlers=()):
+    ##
+    # starts recording to path (overwritten). handlers are the event handler (handle) and
+    # request handler (handle_request) classes whose inputs are recorded
+    #
+    global _file, _traced
+    with _lock:
+        if _file is not None:
+            raise RuntimeError("a trace is already being recorded")
+        _file = open(path, "wb")
+        _file.write(_file_header.pack(MAGIC, VERSION, hri_wire_format.VERSION))
+        _stats.update(records=0, skipped=0)
+        _traced = tuple(handlers)
+        _patch(AvailabilityManager, "handle_persons", _record_persons)
+        for cls in handlers:
+            if hasattr(cls, "handle_request"):
+                _patch(cls, "handle_request", _record_request)
+            else:
+                _patch(cls, "handle", _record_event)
+
+
+def stop() -> dict:
+    ##
+    # stops recording, restores the recorded methods, returns {"records": n, "skipped": n}.
+    # a method wrapped again since (e.g., by instrumentation) keeps our wrapper, which
+    # passes calls through while nothing is recorded
+    #
+    global _file, _traced
+    with _lock:
+        for (cls, method), (fn, wrapper) in list(_originals.items()):
+            if cls.__dict__.get(method) is wrapper:
+                setattr(cls, method, fn)
+                del _originals[(cls, method)]
+        _traced = ()
+        if _file is not None:
+            _file.close()
+            _file = None
+        return dict(_stats)
+
+
+def is_recording() -> bool:
+    return _file is not None
+
+
+def read(path: str) -> list:
+    ##
+    # the records of a trace, [(stage, time, payload)] ordered by time
+    #
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, wire_version = _file_header.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not an HRI trace v{VERSION}")
+    if wire_version != hri_wire_format.VERSION:
+        raise ValueError(f"{path} was recorded with wire format v{wire_version}")
+    records = []
+    buf = memoryview(data)
+    offset = _file_header.size
+    while offset + _record.size <= len(data):
+        stage, t, length = _record.unpack_from(data, offset)
+        offset += _record.size
+        if offset + length > len(data):
+            # the recorder was interrupted in the middle of a record
+            break
+        payload, _ = hri_wire_format.decode_value(buf[offset:offset + length])
+        records.append((stage, t, payload))
+        offset += length
+    # records of concurrent calls are written when each call ends
+    records.sort(key=lambda record: record[1])
+    return records
+
+
+##
+# @brief Belief system stand-in answering get() with the results recorded in a trace
+#
+# every call of the handler gets its own, holding the queries of the recorded call.
+# a query is answered with the next recorded result of the same (type, description),
+# or the last one once they are used up, updates are ignored.
+#
+class TraceBeliefSystem(HRIBeliefSystem):
+
+    def __init__(self, queries: list) -> None:
+        self.results = dict()
+        for type, description, result in queries:
+            self.results.setdefault((type, description), []).append(result)
+
+
+    def updateRobotInfo(self, robot: dict):
+        pass
+
+
+    def updatePersonInfo(self, person: dict):
+        pass
+
+
+    def updateObjectInfo(self, object: dict):
+        pass
+
+
+    def get(self, type: str, description: str) -> list:
+        results = self.results.get((type, description))
+        if not results:
+            return []
+        return results.pop(0) if len(results) > 1 else results[0]
+
+
+    def getRobot(self) -> dict:
+        return self.get("robot", "")
+
+
+class _TraceClock:
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def percentiles(samples: list) -> dict:
+    ##
+    # {"calls", "p50", "p99", "max", "mean"} of the samples, zeros when there are none
+    #
+    ordered = sorted(samples)
+    if not ordered:
+        return {"calls": 0, "p50": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    return {
+        "calls": len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def replay(path: str, realtime: bool = False, speed: float = 1.0, handlers: dict | None = None) -> dict:
+    ##
+    # replays the trace at path, at the recorded speed (times speed) or as fast as possible.
+    # handlers maps recorded handler names ("module:Class") to the instances to replay them
+    # with, the others are created with their default constructor.
+    # returns {"records", "trace_seconds", "trace_end", "elapsed_s", "stage_latency_s": {stage: percentiles},
+    # "final_state": {hri_id: {"present", "availability_score"}}}, the state at the end of the trace (trace_end)
+    #
+    if AvailabilityManager.journal is not None or AvailabilityManager.snapshot is not None:
+        raise RuntimeError("cannot replay while the AvailabilityManager journals or publishes its state")
+    if is_recording():
+        raise RuntimeError("cannot replay while a trace is being recorded")
+    records = read(path)
+    handlers = dict(handlers) if handlers is not None else dict()
+    samples = dict()
+    if not records:
+        return {"records": 0, "trace_seconds": 0.0, "trace_end": 0.0, "elapsed_s": 0.0, "stage_latency_s": {},
+                "final_state": {}}
+
+    first, last = records[0][1], records[-1][1]
+    clock = _TraceClock(first)
+    wall_clock = AvailabilityManager.clock
+    live = (AvailabilityManager.table, AvailabilityManager.sources)
+    AvailabilityManager.use_clock(clock)
+    try:
+        AvailabilityManager.reset()
+        manager = AvailabilityManager()
+        perf = time.perf_counter
+        start = perf()
+        for stage, t, payload in records:
+            if realtime:
+                delay = (t - first) / speed - (perf() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            clock.now = t
+
+            if stage == PERSONS:
+                persons, now, source = payload
+                name = "AvailabilityManager.handle_persons"
+                t0 = perf()
+                manager.handle_persons(persons, now, source)
+            else:
+                handler = handlers.get(payload[0])
+                if handler is None:
+                    classes = registry.event_handlers if stage == EVENT else registry.request_handlers
+                    handler = handlers[payload[0]] = classes.get(payload[0])()
+                if stage == EVENT:
+                    name = f"{type(handler).__name__}.handle"
+                    belief_system = TraceBeliefSystem(payload[1])
+                    t0 = perf()
+                    handler.handle(belief_system)
+                else:
+                    name = f"{type(handler).__name__}.handle_request"
+                    request = hri_wire_format.decode_request(payload[1])
+                    belief_system = TraceBeliefSystem(payload[2])
+                    t0 = perf()
+                    handler.handle_request(request, belief_system)
+            samples.setdefault(name, []).append(perf() - t0)
+        elapsed = perf() - start
+
+        table = AvailabilityManager.table
+        final_state = {hri_id: table.entry(hri_id, last) for hri_id in list(table.ids)}
+    finally:
+        AvailabilityManager.table, AvailabilityManager.sources = live
+        AvailabilityManager.use_clock(wall_clock)
+
+    return {
+        "records": len(records),
+        "trace_seconds": last - first,
+        "trace_end": last,
+        "elapsed_s": elapsed,
+        "stage_latency_s": {name: percentiles(stage_samples) for name, stage_samples in samples.items()},
+        "final_state": final_state,
+    }
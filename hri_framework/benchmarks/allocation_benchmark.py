@@ -0,0 +1,105 @@
+"""
+Allocation benchmark for the HRI message model.
+
+Builds the objects created per utterance, gesture and decision evaluation
+(HRIVerbalRequest, HRIVisualRequest, HRIRequest, HRIResponse through sayResponse, Decision)
+under tracemalloc, and reports the bytes retained per message and the number of allocations,
+next to the same attributes held by plain dict-backed objects for comparison.
+
+usage (from the repository root):
+    python hri_framework/benchmarks/allocation_benchmark.py --messages 100000 --output allocations.json
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIVerbalRequest, HRIVisualRequest
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision
+from hri_framework.Context_Management.event_handlers_dir.event_handlers import sayResponse
+
+
+# dict-backed objects with the same attributes, the baseline the slotted model is compared to
+class DictObject:
+
+    def __init__(self, **attrs) -> None:
+        self.__dict__.update(attrs)
+
+
+def slotted_message(i: int) -> tuple:
+    verbal = HRIVerbalRequest("bring the bottle to bob", "bring the {object} to {who}", {"{object}": "bottle", "{who}": "bob"}, "neutral")
+    visual = HRIVisualRequest("pointing", {}, {})
+    request = HRIRequest({"id": i}, verbal, visual, 1)
+    return request, sayResponse("ok", "neutral"), Decision(True, 1.0, "neutral", "")
+
+
+def dict_message(i: int) -> tuple:
+    verbal = DictObject(rawText="bring the bottle to bob", pattern="bring the {object} to {who}",
+                        values={"{object}": "bottle", "{who}": "bob"}, emotion="neutral")
+    visual = DictObject(gestureName="pointing", poseDict={}, otherParams={})
+    request = DictObject(person={"id": i}, verbalReq=verbal, visualReq=visual, priority=1, reactive=False)
+    action = sayResponse("ok", "neutral").actions[0]
+    response = DictObject(actions=[action], emotion="neutral", reason="", success=True, missing_info=[])
+    return request, response, DictObject(go=True, speedFactor=1.0, emotion="neutral", reason="")
+
+
+def measure(build, count: int) -> dict:
+    build(0)  # warm up caches and lazy imports outside of the trace
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    messages = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    del messages
+    return {
+        "messages": count,
+        "bytes_per_message": current / count,
+        "allocations_per_message": blocks / count,
+        "peak_bytes": peak,
+        "build_seconds": elapsed,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "allocations",
+        "commit": bench_support.git_commit(),
+        "python": sys.version.split()[0],
+        "models": {
+            "slotted": measure(slotted_message, args.messages),
+            "dict": measure(dict_message, args.messages),
+        },
+    }
+
+    for name, model in results["models"].items():
+        print(f"{name:8s}: {model['bytes_per_message']:8.1f} bytes/message  "
+              f"{model['allocations_per_message']:6.2f} allocations/message  "
+              f"peak {model['peak_bytes'] / 1024:9.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Shared setup for the benchmarks: makes the Context_Management modules importable
+outside of a ROS2 workspace.
+
+- the repository root and the handler / decision helper directories are put on sys.path
+  (the handlers import their base classes as sibling modules)
+- ament_index_python and the HRI_LIB modules are replaced by local stubs when they are not
+  installed. the HRI_LIB interfaces are served by the copies in Context_Management/requests.
+"""
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import types
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONTEXT_MANAGEMENT = os.path.join(ROOT, "hri_framework", "Context_Management")
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _installed(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+    except ValueError:
+        # already stubbed
+        return True
+
+
+# HRI_LIB stand-ins, module level so their instances can be pickled
+class HRIAction:
+    def __init__(self, id, text, type, emotion, params) -> None:
+        self.id = id
+        self.text = text
+        self.type = type
+        self.emotion = emotion
+        self.params = params
+
+
+class LLM:
+    pass
+
+
+def install_stubs():
+    for path in (ROOT, os.path.join(CONTEXT_MANAGEMENT, "event_handlers_dir"), os.path.join(CONTEXT_MANAGEMENT, "decision_helpers_dir")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    if not _installed("ament_index_python"):
+        share_dir = tempfile.mkdtemp(prefix="hri_framework_share_")
+        _module("ament_index_python")
+        _module("ament_index_python.packages", get_package_share_directory=lambda package: share_dir)
+
+    if not _installed("hri_framework.HRI_LIB"):
+        requests = importlib.import_module("hri_framework.Context_Management.requests.hri_request_handlers")
+        _module("hri_framework.HRI_LIB", __path__=[])
+        _module("hri_framework.HRI_LIB.hri_interfaces", __path__=[])
+        sys.modules["hri_framework.HRI_LIB.hri_interfaces.hri_request_handlers"] = requests
+        _module("hri_framework.HRI_LIB.hri_interfaces.llm", LLM=LLM)
+        _module("hri_framework.HRI_LIB.hri_types", __path__=[])
+        _module("hri_framework.HRI_LIB.hri_types.hri_action", HRIAction=HRIAction)
+
+
+def percentiles(samples: list) -> dict:
+    # the hri modules import only once the stubs are installed
+    from hri_framework.Context_Management.tracing import percentiles
+
+    return percentiles(samples)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
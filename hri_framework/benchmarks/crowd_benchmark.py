@@ -0,0 +1,217 @@
+"""
+Synthetic crowd benchmark for the availability pipeline.
+
+A synthetic person detection stream (crowd size, churn, occlusion rate, frame rate) drives,
+frame by frame, at the time of the frame (the AvailabilityManager clock follows the stream):
+    AvailabilityManager.handle_persons        - the detections of the frame
+    UserPresenceEventHandler.handle           - a stub belief system holding the same persons
+    UserAvailabilityDecisionHelper.decide     - a few availability decisions about people in the crowd
+and reports the throughput (frames per second), the p50/p99 latency per frame and per stage,
+and the peak memory (traced in a second, separate pass).
+
+with --streams N the detections of every frame are split between N camera streams (every
+person is seen by one or two of them), which report concurrently from their own threads,
+and --shards sets the number of lock stripes of the AvailabilityManager.
+
+with --trace PREFIX the inputs of the timed pass are recorded to PREFIX<crowd size>.hritrace,
+for replay_trace.py.
+
+results are written as JSON so regressions can be compared across commits.
+
+usage (from the repository root):
+    python hri_framework/benchmarks/crowd_benchmark.py --crowd 10 100 1000 --frames 500 --output crowd.json
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management import tracing
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest
+from user_presence_event_handler import UserPresenceEventHandler
+from user_availability_decision_helper import UserAvailabilityDecisionHelper
+
+
+##
+# @brief Generates synthetic person detection frames
+#
+# every frame, each person leaves the scene with probability churn (and is replaced by a
+# newcomer with a fresh hri_id), and each present person is missed by the detector with
+# probability occlusion.
+#
+class CrowdStream:
+
+    def __init__(self, crowd_size: int, churn: float, occlusion: float, fps: float, seed: int = 0) -> None:
+        self.fps = fps
+        self.churn = churn
+        self.occlusion = occlusion
+        self.random = random.Random(seed)
+        self.next_id = 0
+        self.crowd = [self._new_id() for _ in range(crowd_size)]
+
+
+    def _new_id(self) -> str:
+        self.next_id += 1
+        return f"person_{self.next_id}"
+
+
+    def frames(self, count: int):
+        ##
+        # yields (timestamp, detections, belief system persons) per frame
+        #
+        rand = self.random.random
+        for frame in range(count):
+            self.crowd = [self._new_id() if rand() < self.churn else hri_id for hri_id in self.crowd]
+            detected = [hri_id for hri_id in self.crowd if rand() >= self.occlusion]
+            detected_set = set(detected)
+            detections = [{"hri_id": hri_id} for hri_id in detected]
+            persons = [{"id": hri_id, "presence": hri_id in detected_set} for hri_id in self.crowd]
+            yield frame / self.fps, detections, persons
+
+
+class FrameClock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubBeliefSystem:
+
+    def __init__(self) -> None:
+        self.persons = []
+
+
+    def get(self, type: str, description: str) -> list:
+        return self.persons
+
+
+def split(detections: list, streams: int) -> list:
+    # person i is seen by stream i % streams, every other person also by the next stream
+    parts = [[] for _ in range(streams)]
+    for i, detection in enumerate(detections):
+        parts[i % streams].append(detection)
+        if i % 2:
+            parts[(i + 1) % streams].append(detection)
+    return parts
+
+
+def run_pass(args, crowd_size: int) -> dict:
+    AvailabilityManager.configure({"shards": args.shards})
+    AvailabilityManager.reset()
+    frame_clock = FrameClock()
+    wall_clock = AvailabilityManager.clock
+    AvailabilityManager.use_clock(frame_clock)
+    manager = AvailabilityManager()
+    pool = ThreadPoolExecutor(args.streams) if args.streams > 1 else None
+    presence_handler = UserPresenceEventHandler()
+    decision_helper = UserAvailabilityDecisionHelper()
+    belief_system = StubBeliefSystem()
+    stream = CrowdStream(crowd_size, args.churn, args.occlusion, args.fps, args.seed)
+    pick = random.Random(args.seed + 1).choice
+
+    stages = {"handle_persons": [], "presence_handler": [], "decide": []}
+    frame_times = []
+    clock = time.perf_counter
+    start = clock()
+    for timestamp, detections, persons in stream.frames(args.frames):
+        frame_clock.now = timestamp
+        t0 = clock()
+        if pool is None:
+            manager.handle_persons(detections, timestamp)
+        else:
+            reports = [pool.submit(manager.handle_persons, part, timestamp, f"camera_{k}")
+                       for k, part in enumerate(split(detections, args.streams))]
+            for report in reports:
+                report.result()
+        t1 = clock()
+        belief_system.persons = persons
+        presence_handler.handle(belief_system)
+        t2 = clock()
+        for _ in range(args.decisions):
+            decision_helper.decide(HRIRequest({"id": pick(stream.crowd)}, None, None, 1))
+        t3 = clock()
+        stages["handle_persons"].append(t1 - t0)
+        stages["presence_handler"].append(t2 - t1)
+        stages["decide"].append(t3 - t2)
+        frame_times.append(t3 - t0)
+    elapsed = clock() - start
+    if pool is not None:
+        pool.shutdown()
+    tracked_entries = len(AvailabilityManager.table)
+    AvailabilityManager.use_clock(wall_clock)
+
+    return {
+        "elapsed_s": elapsed,
+        "frames_per_second": args.frames / elapsed,
+        "frame_latency_s": bench_support.percentiles(frame_times),
+        "stage_latency_s": {stage: bench_support.percentiles(samples) for stage, samples in stages.items()},
+        "tracked_entries": tracked_entries,
+    }
+
+
+def run_scenario(args, crowd_size: int) -> dict:
+    if args.trace:
+        tracing.start(f"{args.trace}{crowd_size}.hritrace", [UserPresenceEventHandler])
+    try:
+        result = {"crowd_size": crowd_size, **run_pass(args, crowd_size)}
+    finally:
+        if args.trace:
+            tracing.stop()
+
+    # memory is traced in its own pass, tracing slows the timed pass down
+    tracemalloc.start()
+    run_pass(args, crowd_size)
+    result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crowd", type=int, nargs="+", default=[10, 100, 1000], help="crowd sizes to run")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--churn", type=float, default=0.01, help="per person, per frame probability of leaving")
+    parser.add_argument("--occlusion", type=float, default=0.05, help="per person, per frame probability of a missed detection")
+    parser.add_argument("--decisions", type=int, default=5, help="availability decisions per frame")
+    parser.add_argument("--streams", type=int, default=1, help="concurrent camera streams")
+    parser.add_argument("--shards", type=int, default=1, help="lock stripes of the AvailabilityManager")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="record the timed pass to <TRACE><crowd size>.hritrace")
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "crowd",
+        "commit": bench_support.git_commit(),
+        "python": sys.version.split()[0],
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "scenarios": [run_scenario(args, crowd_size) for crowd_size in args.crowd],
+    }
+
+    for scenario in results["scenarios"]:
+        latency = scenario["frame_latency_s"]
+        print(f"crowd {scenario['crowd_size']:6d}: {scenario['frames_per_second']:9.1f} frames/s  "
+              f"p50 {latency['p50'] * 1e3:7.3f} ms  p99 {latency['p99'] * 1e3:7.3f} ms  "
+              f"peak {scenario['peak_memory_bytes'] / 1024:9.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
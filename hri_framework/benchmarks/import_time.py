@@ -0,0 +1,91 @@
+"""
+Import time benchmark for the Context_Management modules.
+
+Every module is imported in a fresh interpreter with ``python -X importtime`` and
+its cumulative import time (median of several runs) is compared against the
+budget checked in next to this file, so startup regressions get caught.
+times are relative to the import time of a stdlib module (BASELINE) measured in the
+same run, so the budget holds across machines of different speeds.
+
+usage (from the repository root):
+    python hri_framework/benchmarks/import_time.py            # check against the budget
+    python hri_framework/benchmarks/import_time.py --update   # record the current times as the budget
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = [
+    "hri_framework.Context_Management.event_handlers_dir.event_handlers",
+    "hri_framework.Context_Management.event_handlers_dir.pattern_matcher",
+    "hri_framework.Context_Management.decision_helpers_dir.decision_helper",
+    "hri_framework.Context_Management.managers.availability_manager",
+    "hri_framework.Context_Management.registry",
+]
+
+BASELINE = "asyncio"
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_budget.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_time_us(module: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # lines look like "import time:      self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def measure(modules: list, runs: int) -> dict:
+    return {module: int(statistics.median(import_time_us(module) for _ in range(runs))) for module in modules}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor over the budget")
+    parser.add_argument("--update", action="store_true", help="write the measured times as the new budget")
+    args = parser.parse_args()
+
+    times = measure(MODULES + [BASELINE], args.runs)
+    baseline = times.pop(BASELINE)
+    relative = {module: round(us / baseline, 3) for module, us in times.items()}
+
+    if args.update:
+        with open(BUDGET_PATH, "w") as f:
+            json.dump({"baseline": BASELINE, "budget": relative}, f, indent=4)
+            f.write("\n")
+        print(f"budget written to {BUDGET_PATH}")
+        return 0
+
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+    if budget.get("baseline") != BASELINE:
+        raise SystemExit(f"{BUDGET_PATH} is relative to {budget.get('baseline')}, rerun with --update")
+    budget = budget["budget"]
+
+    print(f"{baseline / 1000:8.1f} ms  baseline  {BASELINE}")
+    failed = False
+    for module, us in times.items():
+        limit = budget.get(module)
+        status = "ok"
+        if limit is not None and relative[module] > limit * args.tolerance:
+            status = "REGRESSION"
+            failed = True
+        print(f"{us / 1000:8.1f} ms  {relative[module]:6.2f}x baseline  (budget {limit if limit else float('nan'):6.2f}x)  "
+              f"{status:10}  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
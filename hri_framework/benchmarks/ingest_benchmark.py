@@ -0,0 +1,116 @@
+"""
+Burst benchmark for the presence ingest.
+
+A synthetic detection stream (see crowd_benchmark.CrowdStream) is produced in real time at --fps,
+except that the producer stalls for --stall seconds every --period seconds and then submits the
+frames it held back all at once, like a perception pipeline catching up after a CPU stall.
+The frames are consumed either
+    direct    - a thread calling AvailabilityManager.handle_persons for every queued frame
+    ingest    - a PresenceIngest coalescing them at --rate updates per second
+and the number of updates, the coalesced and late frames and the submission-to-update latency are reported.
+
+usage (from the repository root):
+    python hri_framework/benchmarks/ingest_benchmark.py --crowd 1000 --seconds 5 --output ingest.json
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from hri_framework.Context_Management.managers.presence_ingest import PresenceIngest
+from crowd_benchmark import CrowdStream
+
+
+def produce(args, crowd_size: int, submit):
+    stream = CrowdStream(crowd_size, args.churn, args.occlusion, args.fps, args.seed)
+    start = time.monotonic()
+    for timestamp, detections, _ in stream.frames(int(args.seconds * args.fps)):
+        due = start + timestamp
+        if args.stall and timestamp % args.period >= args.period - args.stall:
+            # stalled: the frame is held back until the stall is over
+            due = start + (timestamp // args.period + 1) * args.period
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        submit(detections, start + timestamp)
+
+
+def run_direct(args, crowd_size: int) -> dict:
+    AvailabilityManager.reset()
+    manager = AvailabilityManager()
+    frames = queue.SimpleQueue()
+    latencies = []
+
+    def consume():
+        while (frame := frames.get()) is not None:
+            detections, now, submitted = frame
+            manager.handle_persons(detections, now)
+            latencies.append(time.monotonic() - submitted)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    produce(args, crowd_size, lambda detections, now: frames.put((detections, now, time.monotonic())))
+    frames.put(None)
+    consumer.join()
+    return {"frames": len(latencies), "updates": len(latencies), "coalesced": 0, "dropped_late": 0,
+            "latency_s": bench_support.percentiles(latencies)}
+
+
+def run_ingest(args, crowd_size: int) -> dict:
+    AvailabilityManager.reset()
+    ingest = PresenceIngest(AvailabilityManager(), args.rate)
+    ingest.start()
+    produce(args, crowd_size, ingest.submit)
+    ingest.stop()
+    stats = ingest.stats
+    return {"frames": stats["frames"], "updates": stats["updates"], "coalesced": stats["coalesced"],
+            "dropped_late": stats["dropped_late"],
+            "latency_s": {"max": stats["max_latency"]}}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crowd", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--rate", type=float, default=15.0, help="ingest updates per second")
+    parser.add_argument("--stall", type=float, default=0.5, help="seconds the producer stalls every period")
+    parser.add_argument("--period", type=float, default=1.0)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--occlusion", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    scenarios = []
+    for crowd_size in args.crowd:
+        for mode, run in (("direct", run_direct), ("ingest", run_ingest)):
+            scenarios.append({"crowd_size": crowd_size, "mode": mode, **run(args, crowd_size)})
+
+    for scenario in scenarios:
+        print(f"crowd {scenario['crowd_size']:6d} {scenario['mode']:6s}: {scenario['frames']:5d} frames  "
+              f"{scenario['updates']:5d} updates  {scenario['coalesced']:5d} coalesced  {scenario['dropped_late']:5d} late  "
+              f"max latency {scenario['latency_s']['max'] * 1e3:8.3f} ms")
+
+    if args.output:
+        results = {
+            "benchmark": "ingest",
+            "commit": bench_support.git_commit(),
+            "python": sys.version.split()[0],
+            "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+            "scenarios": scenarios,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
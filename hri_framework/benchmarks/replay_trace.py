@@ -0,0 +1,57 @@
+"""
+Replays a trace recorded with Context_Management/tracing.py (e.g., by crowd_benchmark.py --trace, or
+on the robot) through the AvailabilityManager and the recorded handlers, and reports the per stage
+latency and the final availability state.
+
+the replay runs as fast as possible unless --realtime is given (at the recorded speed, times --speed).
+the final state does not depend on the replay speed, so two runs (e.g., before and after a change)
+can be compared with --output.
+
+usage (from the repository root):
+    python hri_framework/benchmarks/replay_trace.py crowd1000.hritrace --output replay.json
+"""
+import argparse
+import json
+import sys
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management import tracing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded speed")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed factor of a realtime replay")
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    report = tracing.replay(args.trace, args.realtime, args.speed)
+
+    print(f"{report['records']} records, {report['trace_seconds']:.3f} s of trace replayed in {report['elapsed_s']:.3f} s")
+    for stage, latency in report["stage_latency_s"].items():
+        print(f"{stage:45s} {latency['calls']:7d} calls  p50 {latency['p50'] * 1e3:7.3f} ms  "
+              f"p99 {latency['p99'] * 1e3:7.3f} ms  max {latency['max'] * 1e3:7.3f} ms")
+    state = report["final_state"]
+    available = sum(entry["availability_score"] >= 0.5 for entry in state.values())
+    print(f"final state: {len(state)} tracked, {sum(entry['present'] for entry in state.values())} present, "
+          f"{available} with a score >= 0.5")
+
+    if args.output:
+        results = {
+            "benchmark": "replay",
+            "commit": bench_support.git_commit(),
+            "python": sys.version.split()[0],
+            "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+            **report,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
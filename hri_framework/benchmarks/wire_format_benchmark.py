@@ -0,0 +1,121 @@
+"""
+Round-trip and size benchmark of the HRI wire format against pickle and JSON.
+
+For a typical request (verbal + pointing gesture with poses), a sayResponse response and a
+decision, reports the payload size and the encode / decode time per message of:
+    wire    - hri_wire_format.encode / decode
+    pickle  - pickle.dumps / loads, highest protocol
+    json    - json.dumps / loads of the messages converted to dicts (conversion included)
+
+usage (from the repository root):
+    python hri_framework/benchmarks/wire_format_benchmark.py --repeat 20000 --output wire.json
+"""
+import argparse
+import json
+import pickle
+import sys
+import time
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management.requests import hri_wire_format
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIVerbalRequest, HRIVisualRequest
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision
+from event_handlers import sayResponse
+
+
+# stand-ins for the ROS2 geometry messages, module level so pickle can find them
+class Point:
+    def __init__(self, x: float, y: float, z: float) -> None:
+        self.x, self.y, self.z = x, y, z
+
+
+class Quaternion:
+    def __init__(self, x: float, y: float, z: float, w: float) -> None:
+        self.x, self.y, self.z, self.w = x, y, z, w
+
+
+class Pose:
+    def __init__(self, position: Point, orientation: Quaternion) -> None:
+        self.position = position
+        self.orientation = orientation
+
+
+def messages() -> dict:
+    poses = {name: Pose(Point(0.1 * i, 0.2 * i, 1.0), Quaternion(0.0, 0.0, 0.38, 0.92))
+             for i, name in enumerate(("left hand", "right hand", "head"))}
+    request = HRIRequest(
+        {"id": 353, "name": "Bob", "location": "living room"},
+        HRIVerbalRequest("bring the bottle to bob", "bring the {object} to {who}", {"{object}": "bottle", "{who}": "bob"}, "neutral"),
+        HRIVisualRequest("pointing", poses, {"confidence": 0.93}),
+        1,
+    )
+    return {
+        "request": request,
+        "response": sayResponse("I am bringing the bottle to Bob", "happy"),
+        "decision": Decision(True, 1.0, "neutral", "Bob is available"),
+    }
+
+
+def to_json(value):
+    if isinstance(value, dict):
+        return {k: to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if hasattr(value, "position") and hasattr(value, "orientation"):
+        p, o = value.position, value.orientation
+        return [p.x, p.y, p.z, o.x, o.y, o.z, o.w]
+    if hasattr(value, "__slots__"):
+        return {name: to_json(getattr(value, name)) for name in value.__slots__}
+    if hasattr(value, "__dict__"):
+        return {k: to_json(v) for k, v in vars(value).items()}
+    return value
+
+
+codecs = {
+    "wire": (hri_wire_format.encode, hri_wire_format.decode),
+    "pickle": (lambda m: pickle.dumps(m, pickle.HIGHEST_PROTOCOL), pickle.loads),
+    "json": (lambda m: json.dumps(to_json(m)).encode(), json.loads),
+}
+
+
+def timed(fn, arg, repeat: int) -> float:
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(repeat):
+        fn(arg)
+    return (clock() - start) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    results = {"benchmark": "wire_format", "commit": bench_support.git_commit(), "python": sys.version.split()[0], "messages": {}}
+    for kind, message in messages().items():
+        results["messages"][kind] = {}
+        for codec, (encode, decode) in codecs.items():
+            data = encode(message)
+            results["messages"][kind][codec] = {
+                "bytes": len(data),
+                "encode_us": timed(encode, message, args.repeat) * 1e6,
+                "decode_us": timed(decode, data, args.repeat) * 1e6,
+            }
+
+    for kind, codecs_results in results["messages"].items():
+        for codec, result in codecs_results.items():
+            print(f"{kind:9s} {codec:7s}: {result['bytes']:5d} bytes  "
+                  f"encode {result['encode_us']:7.2f} us  decode {result['decode_us']:7.2f} us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Makes the Context_Management modules importable outside of a ROS2 workspace, the way the
+benchmarks do (see benchmarks/bench_support.py).
+
+usage (from the repository root):
+    python -m pytest -q hri_framework/tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_support
+
+bench_support.install_stubs()
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+CONFIG = ("shards", "initial_score", "availability_threshold", "max_entries", "ttl", "zero_score", "sweep_interval")
+
+
+@pytest.fixture
+def availability_manager():
+    # the manager's state is class level, every test starts from an empty state and wall clock
+    # and gets the configuration (model included) restored
+    clock = AvailabilityManager.clock
+    config = {key: getattr(AvailabilityManager, key) for key in CONFIG}
+    model = AvailabilityManager.table.model
+    AvailabilityManager.close_journal()
+    AvailabilityManager.unpublish()
+    AvailabilityManager.reset()
+    yield AvailabilityManager()
+    AvailabilityManager.close_journal()
+    AvailabilityManager.unpublish()
+    AvailabilityManager.use_clock(clock)
+    for key, value in config.items():
+        setattr(AvailabilityManager, key, value)
+    AvailabilityManager.reset()
+    AvailabilityManager.table.model = model
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+import time
+
+from hri_framework.Context_Management.event_handlers_dir.async_dispatcher import AsyncDispatcher
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from event_handlers import AsyncEventHandler, EventHandler
+
+
+class SlowHandler(EventHandler):
+
+    def __init__(self, delay: float = 0.2) -> None:
+        super().__init__()
+        self.delay = delay
+
+    def handle(self, beliefSystem):
+        time.sleep(self.delay)
+        return ("slow", threading.current_thread().name)
+
+
+class FastHandler(AsyncEventHandler):
+
+    async def handleAsync(self, beliefSystem):
+        return "fast"
+
+
+class FailingHandler(EventHandler):
+
+    def handle(self, beliefSystem):
+        raise RuntimeError("no")
+
+
+class TimedHandler(SlowHandler):
+    timeout = 0.05
+
+
+class AvailabilityHandler(EventHandler):
+    process = True
+
+    def handle(self, beliefSystem):
+        return os.getpid(), AvailabilityManager().is_available("a")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_sync_handlers_run_on_threads_next_to_async_ones():
+    async def main():
+        dispatcher = AsyncDispatcher(max_workers=2)
+        try:
+            start = time.perf_counter()
+            slow = dispatcher.handle(SlowHandler(), None)
+            fast = dispatcher.handle(FastHandler(), None)
+            # the async handler is done long before the sync one
+            done, _ = await asyncio.wait([slow, fast], return_when=asyncio.FIRST_COMPLETED)
+            assert done == {fast}
+            results = await dispatcher.gather(slow, fast)
+            return results, time.perf_counter() - start
+        finally:
+            dispatcher.shutdown()
+
+    (slow, fast), elapsed = run(main())
+    assert slow.ok and slow.response[0] == "slow" and slow.response[1].startswith("hri-handler")
+    assert fast.ok and fast.response == "fast"
+    assert elapsed < 0.4
+
+
+def test_timeouts_errors_and_cancellation():
+    async def main():
+        dispatcher = AsyncDispatcher(default_timeout=5.0)
+        try:
+            timed = dispatcher.handle(TimedHandler(), None)
+            failing = dispatcher.handle(FailingHandler(), None)
+            pending = dispatcher.handle(SlowHandler(1.0), None)
+            await asyncio.sleep(0.1)
+            assert dispatcher.cancel() == 1
+            return await dispatcher.gather(timed, failing, pending)
+        finally:
+            dispatcher.shutdown()
+
+    timed, failing, pending = run(main())
+    assert timed.timed_out and not timed.ok
+    assert isinstance(failing.error, RuntimeError)
+    assert pending.cancelled
+
+
+def test_process_handlers_read_the_published_availability(availability_manager):
+    availability_manager.handle_persons([{"hri_id": "a"}])
+
+    async def main():
+        dispatcher = AsyncDispatcher(process_workers=1)
+        try:
+            return await dispatcher.gather(dispatcher.handle(AvailabilityHandler(), None),
+                                           dispatcher.handle(SlowHandler(0.0), None))
+        finally:
+            dispatcher.shutdown(wait=True)
+
+    in_process, in_thread = run(main())
+    pid, available = in_process.response
+    assert in_process.ok and pid != os.getpid()
+    assert available
+    assert in_thread.ok and in_thread.response[0] == "slow"
@@ -0,0 +1,81 @@
+import pytest
+
+from hri_framework.Context_Management.managers.availability_decay import AvailabilityDecay
+
+
+@pytest.fixture
+def manager(availability_manager):
+    availability_manager.configure({"model": "decay", "rise_time": 5.0, "half_life": 10.0, "decay": "exponential",
+                                    "initial_score": 0.5, "availability_threshold": 0.5})
+    return availability_manager
+
+
+def score(manager, hri_id: str, now: float) -> float:
+    return manager.get_availability(hri_id, now)
+
+
+def test_scores_follow_the_curve(manager):
+    manager.handle_persons([{"hri_id": "a"}], 0.0)
+    assert score(manager, "a", 0.0) == pytest.approx(0.5)
+    assert score(manager, "a", 1.0) == pytest.approx(0.7)
+    assert score(manager, "a", 2.5) == pytest.approx(1.0)
+    assert score(manager, "a", 100.0) == pytest.approx(1.0)
+
+    manager.handle_persons([], 1.0)
+    # decays from the 0.7 reached on departure, halving every 10 s
+    assert score(manager, "a", 11.0) == pytest.approx(0.35)
+    assert score(manager, "a", 21.0) == pytest.approx(0.175)
+
+
+def test_linear_decay(manager):
+    manager.configure({"decay": "linear"})
+    manager.handle_persons([{"hri_id": "a"}], 0.0)
+    manager.handle_persons([], 2.5)
+    assert score(manager, "a", 12.5) == pytest.approx(0.5)
+    assert score(manager, "a", 30.0) == 0.0
+
+
+@pytest.mark.parametrize("fps", [5, 15, 60])
+def test_scores_do_not_depend_on_the_frame_rate(manager, fps):
+    # present for 1 s, absent for 4 s, present again for 0.5 s
+    curve = AvailabilityDecay(5.0, 10.0)
+    frames = int(5.5 * fps)
+    for frame in range(frames + 1):
+        t = frame / fps
+        seen = t < 1.0 or t >= 5.0
+        manager.handle_persons([{"hri_id": "a"}] if seen else [], t)
+    left = curve([True], [0.5], [1.0])[0]
+    back = curve([False], [left], [4.0])[0]
+    assert score(manager, "a", 5.5) == pytest.approx(curve([True], [back], [0.5])[0])
+
+
+def test_absent_persons_cost_nothing_per_frame(manager):
+    manager.handle_persons([{"hri_id": f"p{i}"} for i in range(100)], 0.0)
+    manager.handle_persons([{"hri_id": "p0"}], 1.0)
+    before = manager.table.rows()
+    for frame in range(2, 30):
+        manager.handle_persons([{"hri_id": "p0"}], 1.0 + frame / 15)
+    # nobody's anchors moved, the scores are evaluated when read
+    assert manager.table.rows() == before
+
+
+def test_threshold_crossings(manager):
+    assert manager.update_presence({"a": True, "b": True}, 0.0) == {"a", "b"}
+    assert manager.update_presence({}, 1.0) == set()
+    # b leaves at 0.7, which decays below 0.5 after 10 * log2(1.4) = 4.85 s
+    assert manager.update_presence({"b": False}, 1.0) == set()
+    assert manager.update_presence({}, 5.0) == set()
+    assert manager.update_presence({}, 6.0) == {"b"}
+    assert manager.update_presence({}, 7.0) == set()
+    assert manager.update_presence({"b": True}, 7.0) == set()
+    assert manager.update_presence({}, 8.0) == {"b"}
+
+
+def test_versions_change_with_availability_only(manager):
+    manager.handle_persons([{"hri_id": "a"}], 0.0)
+    first = manager.version("a", 0.0)
+    assert manager.version("a", 2.0) == first
+    manager.handle_persons([], 2.0)
+    assert manager.version("a", 5.0) == first
+    assert manager.version("a", 15.0) != first
+    assert manager.version("x", 15.0) == 0
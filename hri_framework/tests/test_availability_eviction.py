@@ -0,0 +1,39 @@
+import pytest
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+
+@pytest.fixture
+def retention(monkeypatch):
+    monkeypatch.setattr(AvailabilityManager, "ttl", 5.0)
+    monkeypatch.setattr(AvailabilityManager, "zero_score", 1.0)
+    monkeypatch.setattr(AvailabilityManager, "sweep_interval", 1.0)
+
+
+@pytest.mark.parametrize("shards", [1, 4])
+def test_departed_persons_expire_without_churn(availability_manager, retention, monkeypatch, shards):
+    monkeypatch.setattr(AvailabilityManager, "shards", shards)
+    AvailabilityManager.reset()
+    manager = AvailabilityManager()
+    ids = [f"person_{i}" for i in range(8)]
+    manager.handle_persons([{"hri_id": hri_id} for hri_id in ids], 0.0)
+    manager.handle_persons([{"hri_id": "person_0"}], 1.0)
+
+    # steady frames, nobody arrives or leaves
+    for t in range(2, 6):
+        manager.handle_persons([{"hri_id": "person_0"}], float(t))
+    assert len(AvailabilityManager.table) == 8
+
+    manager.handle_persons([{"hri_id": "person_0"}], 6.0)
+    assert AvailabilityManager.table.ids == ["person_0"]
+    assert manager.eviction_stats()["ttl"] == 7
+
+
+def test_ttl_zero_expires_on_the_next_sweep(availability_manager, retention, monkeypatch):
+    monkeypatch.setattr(AvailabilityManager, "ttl", 0.0)
+    manager = AvailabilityManager()
+    manager.update_presence({"a": True, "b": True}, 0.0)
+    manager.update_presence({"b": False}, 0.5)
+    assert "b" in AvailabilityManager.table.slots
+    manager.update_presence({}, 1.0)
+    assert "b" not in AvailabilityManager.table.slots
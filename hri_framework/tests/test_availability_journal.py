@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from hri_framework.Context_Management.managers.availability_journal import AvailabilityJournal
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+
+def frames(manager, count: int):
+    # anchors are wall clock times
+    start = time.time()
+    for frame in range(count):
+        detected = [{"hri_id": f"p{i}"} for i in range(frame % 20, frame % 20 + 10)]
+        manager.handle_persons(detected + [{"hri_id": 7}, {"hri_id": "x" * 100}], now=start + frame * 0.1)
+    return start + (count - 1) * 0.1
+
+
+def rows():
+    return {row[0]: row[1:] for row in AvailabilityManager.table.rows()}
+
+
+def test_recover_round_trip(availability_manager, tmp_path):
+    path = str(tmp_path / "availability.journal")
+    assert AvailabilityManager.open_journal(path) == 0
+    last = frames(availability_manager, 50)
+    expected = rows()
+    AvailabilityManager.close_journal()
+
+    state, recorded = AvailabilityJournal.recover(path)
+    assert recorded == pytest.approx(last)
+    assert state.keys() == expected.keys()
+    for hri_id, (present, anchor_time, anchor_score) in expected.items():
+        assert state[hri_id][0] == present
+        assert state[hri_id][1] == pytest.approx(anchor_time)
+        assert state[hri_id][2] == pytest.approx(anchor_score, abs=1e-6)
+
+
+def test_compaction_keeps_the_state(availability_manager, tmp_path):
+    path = str(tmp_path / "availability.journal")
+    AvailabilityManager.open_journal(path, capacity=32)
+    frames(availability_manager, 200)
+    expected = rows()
+    journal = AvailabilityManager.journal
+    AvailabilityManager.close_journal()
+    assert journal.stats["compactions"] > 1
+
+    state, _ = AvailabilityJournal.recover(path)
+    assert {hri_id: row[0] for hri_id, row in state.items()} == {hri_id: row[0] for hri_id, row in expected.items()}
+
+
+def test_reopen_restores_present_persons_as_departed(availability_manager, tmp_path):
+    path = str(tmp_path / "availability.journal")
+    AvailabilityManager.open_journal(path)
+    last = frames(availability_manager, 20)
+    tracked = set(rows())
+    AvailabilityManager.close_journal()
+
+    AvailabilityManager.reset()
+    assert AvailabilityManager.open_journal(path) == len(tracked)
+    restored = rows()
+    assert set(restored) == tracked
+    assert not any(present for present, _, _ in restored.values())
+    assert restored[7][1] == pytest.approx(last)
+
+
+def test_reset_clears_the_journal(availability_manager, tmp_path):
+    path = str(tmp_path / "availability.journal")
+    AvailabilityManager.open_journal(path)
+    frames(availability_manager, 10)
+    AvailabilityManager.reset()
+    AvailabilityManager.close_journal()
+    assert AvailabilityJournal.recover(path)[0] == {}
@@ -0,0 +1,97 @@
+import struct
+import threading
+import time
+
+import pytest
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from hri_framework.Context_Management.managers.availability_snapshot import AvailabilitySnapshotReader
+
+
+@pytest.fixture
+def published(availability_manager):
+    AvailabilityManager.publish()
+    reader = AvailabilitySnapshotReader(AvailabilityManager.snapshot.name)
+    yield availability_manager, reader
+    reader.close()
+
+
+def test_reader_matches_the_manager(published):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a", "distance": 1.0}, {"hri_id": "b"}], now=100.0)
+    manager.handle_persons([{"hri_id": "a"}], now=103.0)
+    for hri_id in ("a", "b"):
+        assert reader.entry(hri_id, 105.0) == pytest.approx(AvailabilityManager.table.entry(hri_id, 105.0))
+    assert sorted(reader.ids) == ["a", "b"]
+
+
+def test_unknown_person_raises_key_error(published):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a"}], now=100.0)
+    with pytest.raises(KeyError):
+        reader.entry("nobody")
+
+
+def test_reader_follows_a_grown_data_block(published):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a"}], now=100.0)
+    generation = AvailabilityManager.snapshot.generation
+    manager.handle_persons([{"hri_id": f"p{i}"} for i in range(2000)], now=101.0)
+    assert AvailabilityManager.snapshot.generation > generation
+    assert reader.entry("p1999", 101.0)["present"]
+
+
+def test_reader_waits_for_a_publication_in_progress(published):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a"}], now=100.0)
+    control = AvailabilityManager.snapshot.control.buf
+    sequence = AvailabilityManager.snapshot.sequence
+    control[:8] = struct.pack("<Q", sequence + 1)
+
+    def finish():
+        time.sleep(0.05)
+        control[:8] = struct.pack("<Q", sequence)
+    writer = threading.Thread(target=finish)
+    writer.start()
+    start = time.monotonic()
+    assert reader.entry("a", 100.0)["present"]
+    writer.join()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_lookup_in_a_replaced_publication_is_retried(published, monkeypatch):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a"}], now=100.0)
+    reader.entry("a")
+    stale = reader.sequence
+    manager.handle_persons([{"hri_id": "a"}, {"hri_id": "b"}], now=101.0)
+
+    # the writer publishes b between the reader's _begin() and its lookup
+    begin = reader._begin
+    calls = []
+    def begin_once_stale():
+        calls.append(1)
+        return stale if len(calls) == 1 else begin()
+    monkeypatch.setattr(reader, "_begin", begin_once_stale)
+    assert reader.entry("b", 101.0)["present"]
+    assert len(calls) == 2
+
+
+def test_reads_during_concurrent_publications(published):
+    manager, reader = published
+    manager.handle_persons([{"hri_id": "a"}], now=100.0)
+    stop = threading.Event()
+
+    def write():
+        frame = 0
+        while not stop.is_set():
+            frame += 1
+            manager.handle_persons([{"hri_id": "a"}, {"hri_id": f"n{frame}"}], now=100.0 + frame)
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(500):
+            assert reader.entry("a")["present"]
+    finally:
+        stop.set()
+        writer.join()
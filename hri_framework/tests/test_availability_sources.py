@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+
+
+@pytest.fixture(params=[1, 8])
+def manager(availability_manager, request):
+    AvailabilityManager.configure({"shards": request.param})
+    return AvailabilityManager()
+
+
+def present(manager) -> set:
+    state = manager.availability_state
+    return {hri_id for hri_id in state if state[hri_id]["present"]}
+
+
+def test_a_person_is_present_while_any_source_sees_them(manager):
+    manager.handle_persons([{"hri_id": "a"}, {"hri_id": "b"}], 0.0, "left")
+    manager.handle_persons([{"hri_id": "b"}, {"hri_id": "c"}], 0.0, "right")
+    assert present(manager) == {"a", "b", "c"}
+    manager.handle_persons([{"hri_id": "a"}], 1.0, "left")
+    # b is still seen by the right camera
+    assert present(manager) == {"a", "b", "c"}
+    manager.handle_persons([], 2.0, "right")
+    assert present(manager) == {"a"}
+
+
+def test_forgetting_a_source_only_removes_what_it_alone_saw(manager):
+    manager.handle_persons([{"hri_id": "a"}, {"hri_id": "b"}], 0.0, "left")
+    manager.handle_persons([{"hri_id": "b"}], 0.0, "right")
+    manager.forget_source("left", 1.0)
+    assert present(manager) == {"b"}
+    assert "left" not in AvailabilityManager.sources
+
+
+def test_concurrent_streams(manager):
+    streams, frames = 4, 200
+    persons = [f"p{i}" for i in range(64)]
+    barrier = threading.Barrier(streams)
+
+    def stream(k: int):
+        barrier.wait()
+        for frame in range(frames):
+            # every stream sees its quarter of the crowd, plus a shared part that comes and goes
+            seen = persons[k::streams] + (persons[:8] if frame % (k + 2) else [])
+            manager.handle_persons([{"hri_id": hri_id} for hri_id in seen], frame / 15, f"camera_{k}")
+        # the last frame of every stream: its quarter only
+        manager.handle_persons([{"hri_id": hri_id} for hri_id in persons[k::streams]], frames / 15, f"camera_{k}")
+
+    with ThreadPoolExecutor(streams) as pool:
+        list(pool.map(stream, range(streams)))
+
+    assert present(manager) == set(persons)
+    table = AvailabilityManager.table
+    assert sorted(table.ids) == sorted(persons)
+    # every person is seen by exactly one source
+    for shard in table.shards:
+        assert set(shard.sightings.values()) <= {1}
+    assert sum(len(shard.sightings) for shard in table.shards) == len(persons)
+
+
+def test_concurrent_streams_agree_on_departures(manager):
+    streams = 4
+    persons = [f"p{i}" for i in range(32)]
+
+    def stream(k: int):
+        for frame in range(100):
+            manager.handle_persons([{"hri_id": hri_id} for hri_id in persons], frame / 15, f"camera_{k}")
+        manager.handle_persons([], 100 / 15, f"camera_{k}")
+
+    with ThreadPoolExecutor(streams) as pool:
+        list(pool.map(stream, range(streams)))
+
+    assert present(manager) == set()
+    assert all(not shard.sightings for shard in AvailabilityManager.table.shards)
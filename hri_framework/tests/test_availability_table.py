@@ -0,0 +1,57 @@
+import numpy as np
+
+from hri_framework.Context_Management.managers.availability_table import AvailabilityTable
+
+
+def table_state(table: AvailabilityTable) -> dict:
+    ids, columns = table.export()
+    return {hri_id: (bool(columns["present"][slot]), float(columns["anchor_score"][slot])) for slot, hri_id in enumerate(ids)}
+
+
+def test_columns_grow_and_keep_the_rows():
+    table = AvailabilityTable(capacity=2)
+    ids = [f"p{i}" for i in range(10)]
+    table.add(ids, 0.5, 0.0)
+    assert len(table) == 10
+    assert len(table.present) >= 10
+    assert [table.slots[hri_id] for hri_id in ids] == list(range(10))
+    assert table_state(table) == {hri_id: (True, 0.5) for hri_id in ids}
+
+
+def test_remove_compacts_the_slots():
+    table = AvailabilityTable()
+    table.add(["a", "b", "c", "d"], 0.5, 0.0)
+    table.depart(["b", "d"], 1.0)
+    removed = []
+    table.on_remove = removed.extend
+    table.remove(np.array([table.slots["a"], table.slots["c"]]))
+    assert removed == ["a", "c"]
+    assert table.ids == ["b", "d"]
+    assert table.slots == {"b": 0, "d": 1}
+    assert not table.present[:2].any()
+    assert table.present_ids == set()
+
+
+def test_rows_skip_untracked_ids():
+    table = AvailabilityTable()
+    table.add(["a", "b"], 0.5, 2.0)
+    assert table.rows(["b", "x"]) == [("b", True, 2.0, 0.5)]
+
+
+def test_handle_persons_diffs_the_detected_sets(availability_manager):
+    manager = availability_manager
+    manager.handle_persons([{"hri_id": "a"}, {"hri_id": "b"}], 0.0)
+    state = manager.handle_persons([{"hri_id": "b"}, {"hri_id": "c"}], 1.0)
+    # a left, the person dicts of the frame are not compared against ids
+    assert {hri_id: state[hri_id]["present"] for hri_id in state} == {"a": False, "b": True, "c": True}
+    state = manager.handle_persons([], 2.0)
+    assert not any(state[hri_id]["present"] for hri_id in state)
+
+
+def test_unchanged_frames_do_not_touch_the_table(availability_manager):
+    manager = availability_manager
+    manager.handle_persons([{"hri_id": "a"}], 0.0)
+    before = manager.table.rows()
+    for t in range(1, 5):
+        manager.handle_persons([{"hri_id": "a"}], float(t))
+    assert manager.table.rows() == before
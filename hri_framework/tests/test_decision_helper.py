@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision, DecisionHelper, cached_decision
+
+
+class Helper(DecisionHelper):
+    max_decisions = 8
+    versions = dict()
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def copy(self):
+        return type(self)()
+
+    def decision_key(self, req):
+        return (req, self.versions.get(req, 0))
+
+    @cached_decision
+    def decide(self, req) -> Decision:
+        self.calls += 1
+        return Decision(True, 1, "neutral", f"{req} {self.versions.get(req, 0)}")
+
+
+def test_decisions_are_cached_until_the_version_changes():
+    helper = Helper()
+    first = helper.decide("a")
+    assert helper.decide("a") is first
+    assert helper.calls == 1
+    Helper.versions["a"] = 1
+    assert helper.decide("a").reason == "a 1"
+    assert helper.calls == 2
+    del Helper.versions["a"]
+
+
+def test_concurrent_callers_keep_the_cache_bounded():
+    helper = Helper()
+    subjects = [f"s{i}" for i in range(64)]
+    with ThreadPoolExecutor(8) as pool:
+        reasons = list(pool.map(lambda i: helper.decide(subjects[i % 64]).reason, range(20000)))
+    assert reasons == [f"s{i % 64} 0" for i in range(20000)]
+    assert len(Helper._decisions) == Helper.max_decisions
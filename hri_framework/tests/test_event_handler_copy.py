@@ -0,0 +1,95 @@
+from event_handlers import EventHandler
+
+
+class Handler(EventHandler):
+
+    def handle(self, beliefSystem):
+        pass
+
+
+def chain(depth: int) -> Handler:
+    # a prototype whose on success handlers go depth levels deep
+    root = handler = Handler()
+    handler.values = {"{who}": "bob"}
+    for level in range(depth):
+        handler.ons = Handler()
+        handler.ons.values = {"{level}": str(level)}
+        handler = handler.ons
+    return root
+
+
+def test_copy_shares_values_until_written():
+    prototype = chain(0)
+    clone = prototype.copy()
+    assert clone._values is prototype._values
+    clone.values["{who}"] = "alice"
+    assert prototype.values == {"{who}": "bob"}
+    assert clone.values == {"{who}": "alice"}
+
+
+def test_sub_handlers_are_cloned_on_first_access():
+    prototype = chain(3)
+    clone = prototype.copy()
+    assert type(clone.__dict__["_ons"]).__name__ == "_Inherited"
+    sub = clone.ons
+    assert sub is not prototype.ons
+    assert isinstance(sub, Handler)
+    assert clone.ons is sub
+    assert sub.values == {"{level}": "0"}
+
+
+def test_copy_of_a_copy_does_not_materialize_the_chain():
+    prototype = chain(3)
+    clone = prototype.copy().copy()
+    assert clone.__dict__["_ons"].handler is prototype.ons
+    deepest = clone.ons.ons.ons
+    assert deepest.values == {"{level}": "2"}
+    assert deepest.ons is None
+    # the prototype chain is untouched
+    deepest.values["{level}"] = "changed"
+    assert prototype.ons.ons.ons.values == {"{level}": "2"}
+
+
+def test_sub_handlers_see_a_fork_of_the_symbol_table():
+    prototype = chain(1)
+    clone = prototype.copy()
+    clone.setValues({"x": 1})
+    sub = clone.ons
+    assert sub.scope().get("x") == 1
+    sub.scope().update({"y": 2})
+    assert clone.scope().get("y") is None
+
+
+def test_copy_starts_a_new_interaction():
+    prototype = chain(0)
+    first = prototype.copy()
+    first.setValues({"x": 1})
+    assert prototype.copy().scope().get("x") is None
+    assert first.copy().scope() is first.scope()
+
+
+def test_sibling_sub_handlers_share_their_scope():
+    prototype = chain(0)
+    prototype.ack = Handler()
+    prototype.ons = Handler()
+    prototype.onf = Handler()
+    clone = prototype.copy()
+    clone.setValues({"x": 1})
+    clone.ack.setValues({"ticket": 7})
+    assert clone.ons.scope().get("ticket") == 7
+    assert clone.onf.scope().get("ticket") == 7
+    assert clone.ons.scope().get("x") == 1
+    assert clone.scope().get("ticket") is None
+
+
+def test_copies_of_a_prototype_with_a_scope_do_not_share_it():
+    prototype = chain(0)
+    prototype.setValues({"x": 1})
+    first = prototype.copy()
+    second = prototype.copy()
+    first.setValues({"y": 2})
+    assert first.scope() is not second.scope()
+    assert second.scope().get("y") is None
+    assert prototype.scope().get("y") is None
+    # the prototype's symbols are inherited
+    assert second.scope().get("x") == 1
@@ -0,0 +1,129 @@
+import pytest
+
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIRequestHandler, HRIResponse, HRIVerbalRequest, HRIVisualRequest
+from hri_framework.Context_Management.requests.hri_request_scheduler import HRIRequestScheduler
+
+
+class EchoHandler(HRIRequestHandler):
+
+    def handle_request(self, request, beliefSystem):
+        return HRIResponse([request.verbalReq.rawText], "neutral", "", True, [])
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def verbal(person: str, text: str, values: dict, priority: int = 5, reactive: bool = False) -> HRIRequest:
+    return HRIRequest({"id": person}, HRIVerbalRequest(text, "bring the {object}", values, "neutral"), None, priority, reactive)
+
+
+def drain(scheduler) -> list:
+    requests = []
+    while (request := scheduler.next()) is not None:
+        requests.append(request)
+    return requests
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def scheduler(clock, **kwargs) -> HRIRequestScheduler:
+    return HRIRequestScheduler(EchoHandler(), None, clock=clock, **kwargs)
+
+
+def test_priority_order_and_reactive_fast_lane(clock):
+    queue = scheduler(clock)
+    queue.submit(verbal("a", "low", {}, priority=9))
+    queue.submit(verbal("b", "high", {}, priority=1))
+    queue.submit(verbal("c", "reactive", {}, priority=9, reactive=True))
+    assert [r.verbalReq.rawText for r in drain(queue)] == ["reactive", "high", "low"]
+
+
+def test_waiting_requests_age(clock):
+    queue = scheduler(clock, aging_interval=1.0)
+    queue.submit(verbal("a", "old", {}, priority=5))
+    clock.now = 10.0
+    queue.submit(verbal("b", "new", {}, priority=1))
+    assert queue.next().verbalReq.rawText == "old"
+
+
+def test_merge_replaces_a_queued_duplicate(clock):
+    queue = scheduler(clock, shedding="merge")
+    queue.submit(verbal("a", "bring the bottle", {"{object}": "bottle"}))
+    assert queue.submit(verbal("a", "bring the bottle please", {"{object}": "bottle"}))
+    assert len(queue) == 1
+    assert queue.metrics()["merged"] == 1
+    assert [r.verbalReq.rawText for r in drain(queue)] == ["bring the bottle please"]
+
+
+def test_merge_keeps_the_better_priority_and_older_enqueue_time(clock):
+    queue = scheduler(clock, shedding="merge", aging_interval=1.0)
+    queue.submit(verbal("a", "first", {"{object}": "bottle"}, priority=5))
+    clock.now = 3.0
+    queue.submit(verbal("b", "other", {}, priority=3))
+    queue.submit(verbal("a", "urgent", {"{object}": "bottle"}, priority=2))
+    assert len(queue) == 2
+    # key 2 + 0 beats 3 + 3
+    assert [r.verbalReq.rawText for r in drain(queue)] == ["urgent", "other"]
+
+
+def test_different_values_or_persons_are_not_duplicates(clock):
+    queue = scheduler(clock, shedding="merge")
+    queue.submit(verbal("a", "bring the bottle", {"{object}": "bottle"}))
+    queue.submit(verbal("a", "bring the cup", {"{object}": "cup"}))
+    queue.submit(verbal("b", "bring the bottle", {"{object}": "bottle"}))
+    assert len(queue) == 3
+    assert queue.metrics()["merged"] == 0
+
+
+def test_unhashable_values_fall_back_to_the_raw_text(clock):
+    queue = scheduler(clock, shedding="merge")
+    queue.submit(verbal("a", "bring these", {"{object}": ["cup", "bottle"]}))
+    queue.submit(verbal("a", "bring these", {"{object}": ["cup", "bottle"]}))
+    queue.submit(verbal("a", "bring those", {"{object}": ["cup", "bottle"]}))
+    assert len(queue) == 2
+
+
+def test_gestures_are_part_of_the_signature(clock):
+    queue = scheduler(clock, shedding="merge")
+    for gesture in ("pointing", "pointing", "waving"):
+        queue.submit(HRIRequest({"id": "a"}, None, HRIVisualRequest(gesture, {}, {}), 5))
+    assert len(queue) == 2
+
+
+def test_full_queue_drops_stale_requests_first(clock):
+    queue = scheduler(clock, max_queue=2, stale_after=5.0)
+    queue.submit(verbal("a", "stale", {}, priority=1))
+    clock.now = 4.0
+    queue.submit(verbal("b", "fresh", {}, priority=9))
+    clock.now = 6.0
+    assert queue.submit(verbal("c", "new", {}, priority=9))
+    assert queue.metrics()["dropped_stale"] == 1
+    assert [r.verbalReq.rawText for r in drain(queue)] == ["fresh", "new"]
+
+
+def test_full_queue_rejects_the_worst_request(clock):
+    queue = scheduler(clock, max_queue=1)
+    queue.submit(verbal("a", "important", {}, priority=1))
+    assert not queue.submit(verbal("b", "unimportant", {}, priority=9))
+    assert queue.metrics()["rejected"] == 1
+    assert queue.submit(verbal("c", "more important", {}, priority=0))
+    assert queue.metrics()["dropped_full"] == 1
+    assert [r.verbalReq.rawText for r in drain(queue)] == ["more important"]
+
+
+def test_run_once_handles_the_next_request(clock):
+    queue = scheduler(clock)
+    assert queue.run_once() is None
+    queue.submit(verbal("a", "hello", {}))
+    assert queue.run_once().actions == ["hello"]
+    assert queue.metrics()["handled"] == 1
@@ -0,0 +1,142 @@
+import pytest
+
+from hri_framework.Context_Management.decision_helpers_dir.decision_helper import Decision
+from hri_framework.Context_Management.requests import hri_wire_format
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIResponse, HRIVerbalRequest, HRIVisualRequest
+from hri_framework.HRI_LIB.hri_types.hri_action import HRIAction
+
+
+class Pose:
+
+    class position:
+        x, y, z = 1.0, 2.0, 3.0
+
+    class orientation:
+        x, y, z, w = 0.0, 0.0, 0.0, 1.0
+
+
+def request() -> HRIRequest:
+    verbal = HRIVerbalRequest("bring the red bottle to bob", "bring the {object} to {who}",
+                              {"{object}": "red bottle", "{who}": "bob"}, "happy")
+    visual = HRIVisualRequest("pointing", {"left hand": Pose()}, {"confidence": 0.9, "frames": [1, 2], "raw": b"\x00\x01"})
+    return HRIRequest({"id": "p1", "name": "Bob", "distance": 1.5}, verbal, visual, 2, True)
+
+
+def test_request_round_trip():
+    decoded = hri_wire_format.decode(hri_wire_format.encode(request()))
+    assert isinstance(decoded, HRIRequest)
+    assert decoded.person == {"id": "p1", "name": "Bob", "distance": 1.5}
+    assert (decoded.priority, decoded.reactive) == (2, True)
+    assert decoded.verbalReq.rawText == "bring the red bottle to bob"
+    assert decoded.verbalReq.values == {"{object}": "red bottle", "{who}": "bob"}
+    assert decoded.verbalReq.emotion == "happy"
+    assert decoded.visualReq.gestureName == "pointing"
+    assert decoded.visualReq.otherParams == {"confidence": 0.9, "frames": [1, 2], "raw": b"\x00\x01"}
+    pose = decoded.visualReq.poseDict["left hand"]
+    assert tuple(pose.position) == (1.0, 2.0, 3.0)
+    assert tuple(pose.orientation) == (0.0, 0.0, 0.0, 1.0)
+
+
+def test_request_without_verbal_and_visual_parts():
+    decoded = hri_wire_format.decode_request(hri_wire_format.encode(HRIRequest({"id": 3}, None, None, 1)))
+    assert decoded.verbalReq is None and decoded.visualReq is None
+    assert decoded.person == {"id": 3}
+
+
+def test_response_and_decision_round_trip():
+    response = HRIResponse([HRIAction(1, "hello", "say", "happy", {"volume": 2})], "happy", "greeting", True, ["name"])
+    decoded = hri_wire_format.decode(hri_wire_format.encode(response))
+    action = decoded.actions[0]
+    assert (action.id, action.text, action.type, action.emotion, action.params) == (1, "hello", "say", "happy", {"volume": 2})
+    assert (decoded.emotion, decoded.reason, decoded.success, decoded.missing_info) == ("happy", "greeting", True, ["name"])
+
+    decision = hri_wire_format.decode(hri_wire_format.encode(Decision(True, 0.5, "neutral", "available")))
+    assert (decision.go, decision.speedFactor, decision.emotion, decision.reason) == (True, 0.5, "neutral", "available")
+
+
+def test_values_round_trip():
+    # the person dict carries any encodable value
+    person = {"values": [None, True, False, -2**63, 1.25, "", "neutral", "ünïcode", (1, (2,)), {"k": {"n": [b"x"]}}]}
+    decoded = hri_wire_format.decode(hri_wire_format.encode(HRIRequest(person, None, None, 1)))
+    assert decoded.person == person
+
+
+def test_single_values_round_trip():
+    value = [None, True, False, -2**63, 1.25, "", "neutral", "ünïcode", (1, (2,)), {"k": {"n": [b"x"]}}]
+    data = hri_wire_format.encode_value(value)
+    assert hri_wire_format.decode_value(bytes(data)) == (value, len(data))
+
+
+def test_interned_strings_are_short():
+    interned = hri_wire_format.encode(HRIRequest({"emotion": "neutral"}, None, None, 1))
+    inline = hri_wire_format.encode(HRIRequest({"emotion": "neutraX"}, None, None, 1))
+    assert len(inline) - len(interned) == len("neutraX") + 2
+
+
+def test_unencodable_values_raise_type_error():
+    with pytest.raises(TypeError):
+        hri_wire_format.encode(HRIRequest({"id": object()}, None, None, 1))
+
+
+@pytest.mark.parametrize("data", [b"", b"HW", b"XX\x01\x01", b"HW\x02\x01"])
+def test_bad_headers_raise_value_error(data):
+    with pytest.raises(ValueError):
+        hri_wire_format.decode(data)
+
+
+def test_truncated_messages_raise_value_error():
+    data = hri_wire_format.encode(request())
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            hri_wire_format.decode(data[:length])
+
+
+def test_truncated_values_raise_value_error():
+    data = bytes(hri_wire_format.encode_value({"text": "x" * 10, "items": [1, 2.5]}))
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            hri_wire_format.decode_value(data[:length])
+
+
+def test_unknown_tag_raises_value_error():
+    data = bytearray(hri_wire_format.encode(HRIRequest({"id": "p1"}, None, None, 1)))
+    data[4] = 0xFF
+    with pytest.raises(ValueError, match="unknown value tag"):
+        hri_wire_format.decode(bytes(data))
+
+
+@pytest.mark.parametrize("key", [bytes([7, 0, 0, 0, 0]), bytes([9, 0, 0, 0, 0]), bytes([10]) + bytes(56)])
+def test_unhashable_dict_keys_raise_value_error(key):
+    # a dict of one item whose key is a list, a dict or a pose
+    data = bytes([9, 1, 0, 0, 0]) + key + bytes([0])
+    with pytest.raises(ValueError, match="dict key"):
+        hri_wire_format.decode_value(data)
+
+
+def test_corrupted_messages_raise_value_error():
+    data = hri_wire_format.encode(request())
+    for i in range(len(data)):
+        for byte in (0, 7, 9, 10, 0xFF):
+            corrupted = bytearray(data)
+            corrupted[i] = byte
+            try:
+                hri_wire_format.decode(bytes(corrupted))
+            except ValueError:
+                pass
+
+
+def test_decode_value_casts_memoryviews():
+    data = hri_wire_format.encode_value(["neutral", 3])
+    data += bytes(-len(data) % 4)
+    value, _ = hri_wire_format.decode_value(memoryview(bytes(data)).cast("I"))
+    assert value == ["neutral", 3]
+
+
+def test_responses_without_missing_info_share_it():
+    from hri_framework.Context_Management.requests.hri_request_handlers import NO_MISSING_INFO
+
+    first = HRIResponse([], "neutral", "", True)
+    assert first.missing_info is NO_MISSING_INFO
+    assert HRIResponse([], "neutral", "", True).missing_info is first.missing_info
+    given = []
+    assert HRIResponse([], "neutral", "", True, given).missing_info is given
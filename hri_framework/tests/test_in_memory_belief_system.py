@@ -0,0 +1,64 @@
+from hri_framework.Context_Management.belief_system_dir.in_memory_belief_system import InMemoryBeliefSystem
+
+
+def belief_system() -> InMemoryBeliefSystem:
+    beliefs = InMemoryBeliefSystem()
+    beliefs.updatePersonInfo({"id": "p1", "name": "Bob", "presence": True})
+    beliefs.updatePersonInfo({"id": "p2", "name": "Alice", "presence": False})
+    beliefs.updateObjectInfo({"id": "o1", "label": "bottle", "color": "red", "style": "beautiful"})
+    beliefs.updateObjectInfo({"id": "o2", "label": "bottle", "color": "blue"})
+    beliefs.updateObjectInfo({"id": "o3", "label": "cup", "color": "red"})
+    return beliefs
+
+
+def ids(items: list) -> set:
+    return {item["id"] for item in items}
+
+
+def test_conjunctive_descriptions():
+    beliefs = belief_system()
+    assert ids(beliefs.get("bottle", "beautiful red")) == {"o1"}
+    assert ids(beliefs.get("object", "red")) == {"o1", "o3"}
+    assert ids(beliefs.get("bottle", "the green one")) == set()
+
+
+def test_flags_match_only_when_set():
+    beliefs = belief_system()
+    assert ids(beliefs.get("person", "presence")) == {"p1"}
+    beliefs.updatePersonInfo({"id": "p1", "presence": False})
+    assert ids(beliefs.get("person", "presence")) == set()
+
+
+def test_attribute_names_are_not_indexed():
+    beliefs = belief_system()
+    assert beliefs.get("person", "id") == []
+    assert beliefs.get("object", "color") == []
+    assert ids(beliefs.get("person", "bob")) == {"p1"}
+
+
+def test_updates_and_removals_reindex():
+    beliefs = belief_system()
+    beliefs.updateObjectInfo({"id": "o3", "color": "green"})
+    assert ids(beliefs.get("object", "red")) == {"o1"}
+    beliefs.remove("object", "o1")
+    assert beliefs.get("object", "red") == []
+
+
+def test_returned_items_are_copies():
+    beliefs = belief_system()
+    bob = beliefs.get("person", "bob")[0]
+    bob["name"] = "Robert"
+    assert beliefs.get("person", "bob")[0]["name"] == "Bob"
+
+
+def test_unknown_words_go_to_the_fallback():
+    calls = []
+
+    def fallback(type, description, candidates):
+        calls.append((type, description, ids(candidates)))
+        return candidates[:1]
+
+    beliefs = belief_system()
+    beliefs.fallback = fallback
+    assert len(beliefs.get("bottle", "red bottle with my favorite color")) == 1
+    assert calls == [("bottle", "red bottle with my favorite color", {"o1"})]
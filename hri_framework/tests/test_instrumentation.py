@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hri_framework.Context_Management import instrumentation, tracing
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIResponse, HRIRequestHandler
+
+
+class CountHandler(HRIRequestHandler):
+
+    def handle_request(self, request, beliefSystem):
+        return HRIResponse([], "neutral", str(sum(range(200))), True)
+
+
+class NestingHandler(HRIRequestHandler):
+
+    def handle_request(self, request, beliefSystem):
+        return CountHandler().handle_request(request, beliefSystem)
+
+
+@pytest.fixture
+def instrumented():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def calls(cls) -> int:
+    return instrumentation.snapshot()[cls.__qualname__]["calls"]
+
+
+def test_concurrent_calls_sample_at_most_the_requested_calls(instrumented):
+    instrumented.profile(CountHandler, calls=20)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: CountHandler().handle_request(None, None), range(400)))
+    assert calls(CountHandler) == 400
+    assert instrumentation._profilers["CountHandler"][1] >= 0
+    assert "sum" in instrumented.profile_report(CountHandler)
+
+
+def test_nested_profiled_calls_run_unprofiled(instrumented):
+    instrumented.profile(CountHandler, calls=5)
+    instrumented.profile(NestingHandler, calls=5)
+    for _ in range(5):
+        NestingHandler().handle_request(None, None)
+    assert calls(NestingHandler) == 5
+    assert calls(CountHandler) == 5
+    assert instrumentation._profilers["NestingHandler"][1] == 0
+    # every CountHandler call ran inside a profiled NestingHandler call
+    assert instrumentation._profilers["CountHandler"][1] == 5
+
+
+def test_disable_keeps_a_wrapper_added_on_top(instrumented, tmp_path):
+    timed = CountHandler.__dict__["handle_request"]
+    tracing.start(str(tmp_path / "trace.hritrace"), [CountHandler])
+    traced = CountHandler.__dict__["handle_request"]
+    instrumented.disable()
+    assert CountHandler.__dict__["handle_request"] is traced
+    tracing.stop()
+    # instrumentation's wrapper stayed below, it passes calls through while disabled
+    assert CountHandler.__dict__["handle_request"] is timed
+    CountHandler().handle_request(None, None)
+    assert calls(CountHandler) == 0
+    instrumented.enable()
+    CountHandler().handle_request(None, None)
+    assert calls(CountHandler) == 1
+
+
+def test_tracing_stop_keeps_a_wrapper_added_on_top(tmp_path):
+    original = CountHandler.__dict__["handle_request"]
+    tracing.start(str(tmp_path / "trace.hritrace"), [CountHandler])
+    instrumentation.enable()
+    timed = CountHandler.__dict__["handle_request"]
+    tracing.stop()
+    assert CountHandler.__dict__["handle_request"] is timed
+    instrumentation.disable()
+    assert CountHandler.__dict__["handle_request"].__wrapped__ is original
+    tracing.stop()
+    assert CountHandler.__dict__["handle_request"] is original
+    instrumentation.reset()
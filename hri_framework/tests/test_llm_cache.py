@@ -0,0 +1,54 @@
+import pytest
+
+from hri_framework.Context_Management.event_handlers_dir.event_handlers import LLMLoader
+from hri_framework.Context_Management.event_handlers_dir.llm_cache import CachedLLM, ResponseCache
+
+
+class EchoLLM:
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        return f"{self.calls}: {prompt}"
+
+    def reset(self) -> int:
+        self.calls = 0
+        return self.calls
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    monkeypatch.setattr(LLMLoader, "_config", {"echo": f"{__name__}.EchoLLM"})
+    monkeypatch.setattr(LLMLoader, "_instances", {})
+    monkeypatch.setattr(LLMLoader, "response_cache", None)
+    monkeypatch.setattr(LLMLoader, "response_cache_methods", ())
+    return LLMLoader
+
+
+def test_configured_method_is_answered_from_the_cache(loader):
+    loader.enable_response_cache(["generate"])
+    llm = loader.load("echo")
+    assert llm.generate("Hello  there") == "1: Hello  there"
+    assert llm.generate("hello there") == "1: Hello  there"
+    assert llm.calls == 1
+    assert loader.response_cache.hits == 1
+
+
+def test_other_methods_pass_through(loader):
+    llm = CachedLLM(EchoLLM(), ResponseCache(), "echo", ["generate"])
+    llm.generate("a")
+    assert llm.reset() == 0
+    assert llm.generate("b") == "1: b"
+
+
+def test_cached_llm_keeps_the_type_of_the_model(loader):
+    loader.enable_response_cache(["generate"])
+    llm = loader.load("echo")
+    assert isinstance(llm, EchoLLM)
+
+
+def test_cached_method_must_exist():
+    with pytest.raises(ValueError):
+        CachedLLM(EchoLLM(), ResponseCache(), "echo", ["complete"])
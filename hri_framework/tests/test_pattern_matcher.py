@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from event_handlers import EventHandler, EventHandlerDispatcher
+from hri_framework.Context_Management.event_handlers_dir import pattern_matcher
+from hri_framework.Context_Management.event_handlers_dir.pattern_matcher import PatternMatcher, compile_pattern
+from user_presence_event_handler import UserPresenceEventHandler
+
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "management_layer_config.json")
+
+
+class Handler(EventHandler):
+
+    def __init__(self, name: str = "") -> None:
+        super().__init__()
+        self.name = name
+
+
+    def copy(self, symbols=None):
+        n = super().copy(symbols)
+        n.name = self.name
+        return n
+
+
+    def handle(self, beliefSystem):
+        pass
+
+
+def triggers() -> list:
+    with open(CONFIG) as f:
+        entries = json.load(f)["event handlers"]
+    found = []
+    for entry in entries:
+        found.extend([entry["system trigger"]] if "system trigger" in entry else [])
+        found.extend(entry.get("verbal triggers", []))
+    return found
+
+
+INPUTS = ["say hello there", "move 0.5 90 2", "navigate kitchen 0.7", "load users 3 name into who", "hi Alice",
+          "what can you do", "my favorite color is red", "this cup is mine", "turn around", "bring me a cookie"]
+
+
+@pytest.mark.parametrize("input", INPUTS)
+def test_combined_match_is_the_first_per_pattern_match(input):
+    matcher = PatternMatcher()
+    for trigger in triggers():
+        matcher.add(trigger, trigger)
+    expected = next(((trigger, compile_pattern(trigger).extract(input)) for trigger in triggers()
+                     if compile_pattern(trigger).extract(input) is not None), None)
+    found = matcher.match(input)
+    assert (found[1:] if found is not None else None) == expected
+
+
+def test_repeated_placeholder_names_in_different_patterns():
+    matcher = PatternMatcher()
+    matcher.add("my {subject} is {property}", "is")
+    matcher.add("my {subject} are {property}", "are")
+    assert matcher.match("my cats are black") == ("are", "my {subject} are {property}", {"{subject}": "cats", "{property}": "black"})
+
+
+def test_dispatch_resolves_several_handlers_in_a_single_pass(monkeypatch):
+    dispatcher = EventHandlerDispatcher()
+    for name, trigger in (("say", "say {something}"), ("move", "move {speed} {direction} {seconds}"),
+                          ("navigate", "navigate {location} {stop_distance_m}"), ("fact", "my {subject} is {property}")):
+        dispatcher.add(trigger, Handler(name))
+    # the per pattern regexes are not used for dispatching
+    monkeypatch.setattr(pattern_matcher.CompiledPattern, "extract", lambda self, input: pytest.fail("matched per pattern"))
+
+    cases = {
+        "say good morning": ("say", {"{something}": "good morning"}),
+        "move 0.5 90 2": ("move", {"{speed}": "0.5", "{direction}": "90", "{seconds}": "2"}),
+        "navigate kitchen 0.7": ("navigate", {"{location}": "kitchen", "{stop_distance_m}": "0.7"}),
+        "my name is bob": ("fact", {"{subject}": "name", "{property}": "bob"}),
+    }
+    for input, (name, values) in cases.items():
+        handler = dispatcher.dispatch(input)
+        assert (handler.name, handler.values, handler.match) == (name, values, True)
+    assert dispatcher.dispatch("dance") is None
+
+
+def test_dispatch_returns_copies_of_the_prototype():
+    prototype = Handler("say")
+    dispatcher = EventHandlerDispatcher()
+    dispatcher.add("say {something}", prototype)
+    first = dispatcher.dispatch("say a")
+    second = dispatcher.dispatch("say b")
+    assert first is not prototype and second is not first
+    assert (first.values, second.values, prototype.values) == ({"{something}": "a"}, {"{something}": "b"}, {})
+
+
+def test_config_handlers_are_resolved_through_the_registry():
+    code = "hri_framework.Context_Management.event_handlers_dir.user_presence_event_handler.UserPresenceEventHandler"
+    dispatcher = EventHandlerDispatcher()
+    dispatcher.addConfig([
+        {"verbal triggers": ["set state {state}"], "handler": {"events": ["say ok"]}},
+        {"system trigger": "presence {who}", "verbal triggers": ["is {who} here"], "handler": {"code": code}},
+    ])
+    assert len(dispatcher) == 2
+    handler = dispatcher.dispatch("is bob here")
+    assert type(handler).__name__ == UserPresenceEventHandler.__name__
+    assert handler.values == {"{who}": "bob"}
+    assert dispatcher.dispatch("set state idle") is None
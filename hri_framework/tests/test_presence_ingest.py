@@ -0,0 +1,63 @@
+import threading
+
+from hri_framework.Context_Management.managers.presence_ingest import PresenceIngest
+
+
+class RecordingManager:
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.clock = lambda: 0.0
+        self.release = threading.Event()
+        self.release.set()
+
+    def handle_persons(self, persons, now, source):
+        self.release.wait()
+        self.calls.append((persons, now, source))
+
+
+def frame(*ids) -> list:
+    return [{"hri_id": hri_id} for hri_id in ids]
+
+
+def test_frames_of_a_source_coalesce_into_the_latest():
+    manager = RecordingManager()
+    ingest = PresenceIngest(manager, rate=0)
+    ingest.submit(frame("a"), 1.0)
+    ingest.submit(frame("a", "b"), 2.0)
+    ingest.submit(frame("b"), 3.0)
+    ingest.submit(frame("c"), 1.5, source="right")
+    assert ingest.flush() == 2
+    assert sorted(manager.calls, key=lambda call: call[2]) == [(frame("b"), 3.0, "default"), (frame("c"), 1.5, "right")]
+    assert ingest.stats["frames"] == 4
+    assert ingest.stats["coalesced"] == 2
+    assert ingest.stats["updates"] == 2
+
+
+def test_late_frames_are_dropped_and_counted_apart():
+    manager = RecordingManager()
+    ingest = PresenceIngest(manager, rate=0)
+    ingest.submit(frame("a"), 2.0)
+    ingest.submit(frame("b"), 1.0)
+    ingest.flush()
+    assert manager.calls == [(frame("a"), 2.0, "default")]
+    assert ingest.stats["dropped_late"] == 1
+    assert ingest.stats["coalesced"] == 0
+
+
+def test_bursts_are_coalesced_while_an_update_runs():
+    manager = RecordingManager()
+    ingest = PresenceIngest(manager, rate=1000)
+    manager.release.clear()
+    ingest.start()
+    ingest.submit(frame("a"), 0.0)
+    # the first frame is being applied, the burst behind it waits as one frame
+    while ingest.pending():
+        pass
+    for t in range(1, 50):
+        ingest.submit(frame("a", str(t)), float(t))
+    manager.release.set()
+    ingest.stop()
+    assert [call[1] for call in manager.calls] == [0.0, 49.0]
+    assert ingest.stats["coalesced"] == 48
+    assert ingest.stats["updates"] == 2
@@ -0,0 +1,14 @@
+from hri_framework.Context_Management import registry
+from hri_framework.Context_Management.requests.hri_request_scheduler import HRIRequestScheduler
+
+
+def test_names_are_listed_without_importing():
+    assert "hri_request_scheduler" in registry.request_handlers.names()
+
+
+def test_dotted_and_traced_names_resolve_to_the_same_class():
+    dotted = "hri_framework.Context_Management.requests.hri_request_scheduler.HRIRequestScheduler"
+    traced = "hri_framework.Context_Management.requests.hri_request_scheduler:HRIRequestScheduler"
+    assert registry.request_handlers.get(dotted) is HRIRequestScheduler
+    assert registry.request_handlers.get(traced) is HRIRequestScheduler
+    assert traced in registry.request_handlers
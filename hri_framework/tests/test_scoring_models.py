@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from hri_framework.Context_Management.managers.scoring_models import (
+    DecayModel, LinearModel, SmoothingModel, StepModel, feature_matrix, make_model,
+)
+
+
+def baseline(frames: list) -> list:
+    # the original per frame rule: 0.5 on arrival, then +0.1 per frame seen, -0.1 per frame missed
+    score = None
+    scores = []
+    for seen in frames:
+        if score is None:
+            score = 0.5
+        else:
+            score = min(score + 0.1, 1.0) if seen else max(score - 0.1, 0.0)
+        scores.append(score)
+    return scores
+
+
+def test_step_model_reproduces_the_per_frame_rule(availability_manager):
+    manager = availability_manager
+    manager.configure({"model": "step", "step": 0.1, "fps": 15.0, "initial_score": 0.5})
+    frames = [True] * 3 + [False] * 5
+    scores = []
+    for frame, seen in enumerate(frames):
+        t = frame / 15
+        manager.handle_persons([{"hri_id": "a"}] if seen else [], t)
+        scores.append(manager.get_availability("a", t))
+    expected = baseline(frames)
+    # equal while present. the old rule already stepped down on the frame of the departure,
+    # the model counts it as the last moment the person was seen: two steps above after it
+    assert scores[:3] == pytest.approx(expected[:3])
+    assert scores[3:] == pytest.approx([score + 0.2 for score in expected[3:]])
+
+
+def test_step_model_clamps():
+    model = StepModel(0.1, 10.0)
+    features = np.array([[1.0, 0.9, 1.0], [0.0, 0.1, 1.0]])
+    assert model(features) == pytest.approx([1.0, 0.0])
+
+
+def test_smoothing_model_halves_the_gap_every_half_life():
+    model = SmoothingModel(half_life=2.0)
+    features = np.array([[1.0, 0.5, 2.0], [0.0, 0.5, 2.0], [1.0, 0.5, 4.0]])
+    assert model(features) == pytest.approx([0.75, 0.25, 0.875])
+
+
+def test_linear_model_caps_features_and_ignores_missing_signals():
+    model = LinearModel(weights={"present": 0.4, "dwell": 0.01, "distance": -0.1}, bias=0.1, limits={"dwell": 30.0})
+    assert model.features == ("present", "dwell", "distance")
+    features = np.array([[1.0, 100.0, 2.0], [1.0, 10.0, np.nan], [0.0, 0.0, 50.0]])
+    assert model(features) == pytest.approx([0.4 + 0.3 - 0.2 + 0.1, 0.4 + 0.1 + 0.1, 0.0])
+
+
+def test_linear_model_scores_from_the_detection_signals(availability_manager):
+    manager = availability_manager
+    manager.configure({"model": "linear", "weights": {"present": 0.4, "engagement": 0.5}, "bias": 0.0})
+    manager.handle_persons([{"hri_id": "a", "engagement": 0.8}, {"hri_id": "b"}], 0.0)
+    assert manager.get_availability("a", 1.0) == pytest.approx(0.8)
+    assert manager.get_availability("b", 1.0) == pytest.approx(0.4)
+
+
+def test_feature_matrix():
+    columns = {"present": np.array([True, False]), "anchor_time": np.array([0.0, 4.0]),
+               "anchor_score": np.array([0.5, 0.2]), "last_interaction": np.array([np.nan, 1.0])}
+    matrix = feature_matrix(columns, 10.0, ("present", "dwell", "absence", "since_interaction"))
+    assert np.array_equal(matrix[:, :3], [[1.0, 10.0, 0.0], [0.0, 0.0, 6.0]])
+    assert np.isnan(matrix[0, 3]) and matrix[1, 3] == 9.0
+
+
+def test_make_model_keeps_the_parameters_of_the_same_kind():
+    model = make_model({"model": "smoothing", "half_life": 4.0})
+    assert make_model({}, model).half_life == 4.0
+    assert type(make_model({"model": "decay"}, model)) is DecayModel
+    with pytest.raises(ValueError):
+        make_model({"model": "nope"})
+    with pytest.raises(ValueError):
+        LinearModel(weights={"height": 1.0})
@@ -0,0 +1,129 @@
+import pytest
+
+from hri_framework.Context_Management import tracing
+from hri_framework.Context_Management.managers.availability_manager import AvailabilityManager
+from hri_framework.Context_Management.requests.hri_request_handlers import HRIRequest, HRIRequestHandler, HRIResponse, HRIVerbalRequest
+
+
+class Clock:
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BeliefSystem:
+
+    def get(self, type: str, description: str) -> list:
+        return [{"id": description, "type": type}]
+
+
+class AskHandler(HRIRequestHandler):
+
+    def __init__(self) -> None:
+        self.calls = []
+
+
+    def handle_request(self, request, beliefSystem):
+        self.calls.append((type(self).__name__, request.person["id"], beliefSystem.get("person", request.person["id"])))
+        return HRIResponse([], "neutral", "", True)
+
+
+class PoliteAskHandler(AskHandler):
+
+    def handle_request(self, request, beliefSystem):
+        return super().handle_request(request, beliefSystem)
+
+
+class InheritingAskHandler(AskHandler):
+    pass
+
+
+def request(person: str) -> HRIRequest:
+    return HRIRequest({"id": person}, HRIVerbalRequest("hi", "hi", {}, "neutral"), None, 1)
+
+
+def record(path, manager, handlers=(AskHandler,)) -> dict:
+    clock = Clock(1000.0)
+    AvailabilityManager.use_clock(clock)
+    handler = handlers[0]()
+    tracing.start(path, handlers)
+    try:
+        for frame in range(30):
+            clock.now = 1000.0 + frame / 15
+            manager.handle_persons([{"hri_id": f"p{i}"} for i in range(frame % 7, frame % 7 + 5)])
+            if frame % 10 == 0:
+                handler.handle_request(request(f"p{frame}"), BeliefSystem())
+    finally:
+        tracing.stop()
+    return {hri_id: AvailabilityManager.table.entry(hri_id, clock.now) for hri_id in AvailabilityManager.table.ids}
+
+
+def test_replay_reproduces_the_recorded_state(availability_manager, tmp_path):
+    path = str(tmp_path / "run.hritrace")
+    expected = record(path, availability_manager)
+    handler = AskHandler()
+    name = tracing._handler_name(AskHandler)
+
+    report = tracing.replay(path, handlers={name: handler})
+    assert report["records"] == 33
+    assert report["trace_seconds"] == pytest.approx(29 / 15)
+    assert report["final_state"].keys() == expected.keys()
+    for hri_id, entry in expected.items():
+        assert report["final_state"][hri_id] == pytest.approx(entry)
+    assert [(person, result) for _, person, result in handler.calls] == \
+        [(f"p{frame}", [{"id": f"p{frame}", "type": "person"}]) for frame in (0, 10, 20)]
+
+    again = tracing.replay(path, realtime=True, speed=100.0, handlers={name: AskHandler()})
+    assert again["final_state"] == report["final_state"]
+
+
+def test_stop_restores_the_recorded_methods(availability_manager, tmp_path):
+    originals = (AvailabilityManager.__dict__["handle_persons"], AskHandler.__dict__["handle_request"])
+    record(str(tmp_path / "run.hritrace"), availability_manager)
+    assert (AvailabilityManager.__dict__["handle_persons"], AskHandler.__dict__["handle_request"]) == originals
+    assert "handle_request" not in InheritingAskHandler.__dict__
+    assert not tracing.is_recording()
+
+
+def test_subclasses_are_recorded_once_under_their_own_class(availability_manager, tmp_path):
+    path = str(tmp_path / "run.hritrace")
+    tracing.start(path, [AskHandler, PoliteAskHandler])
+    try:
+        PoliteAskHandler().handle_request(request("a"), BeliefSystem())
+        InheritingAskHandler().handle_request(request("b"), BeliefSystem())
+    finally:
+        tracing.stop()
+    names = [payload[0] for stage, _, payload in tracing.read(path) if stage == tracing.REQUEST]
+    assert names == [tracing._handler_name(PoliteAskHandler), tracing._handler_name(InheritingAskHandler)]
+
+
+def test_replay_restores_the_live_state(availability_manager, tmp_path):
+    path = str(tmp_path / "run.hritrace")
+    record(path, availability_manager)
+    clock = Clock(5000.0)
+    AvailabilityManager.use_clock(clock)
+    availability_manager.handle_persons([{"hri_id": "live"}])
+    table = AvailabilityManager.table
+    before = {hri_id: table.entry(hri_id, 5000.0) for hri_id in table.ids}
+
+    tracing.replay(path, handlers={tracing._handler_name(AskHandler): AskHandler()})
+    assert AvailabilityManager.table is table
+    assert {hri_id: table.entry(hri_id, 5000.0) for hri_id in table.ids} == before
+    assert AvailabilityManager.clock() == 5000.0
+    assert AvailabilityManager.availability_state["live"]["present"]
+
+
+def test_replay_refuses_to_touch_a_journal_or_snapshot(availability_manager, tmp_path):
+    path = str(tmp_path / "run.hritrace")
+    record(path, availability_manager)
+    AvailabilityManager.open_journal(str(tmp_path / "availability.journal"))
+    with pytest.raises(RuntimeError):
+        tracing.replay(path)
+    AvailabilityManager.close_journal()
+    AvailabilityManager.publish()
+    with pytest.raises(RuntimeError):
+        tracing.replay(path)
@@ -0,0 +1,32 @@
+from user_presence_event_handler import UserPresenceEventHandler
+
+
+class BeliefSystem:
+
+    def __init__(self, persons: list) -> None:
+        self.persons = persons
+
+
+    def get(self, type: str, description: str) -> list:
+        return self.persons
+
+
+def snapshot(*present) -> BeliefSystem:
+    return BeliefSystem([{"id": hri_id, "presence": True} for hri_id in present])
+
+
+def test_copies_report_persons_dropped_from_the_snapshot(availability_manager):
+    prototype = UserPresenceEventHandler()
+    prototype.copy().handle(snapshot("a", "b"))
+    assert availability_manager.availability_state["b"]["present"]
+
+    prototype.copy().handle(snapshot("a"))
+    assert availability_manager.availability_state["a"]["present"]
+    assert not availability_manager.availability_state["b"]["present"]
+
+
+
+def test_absent_persons_listed_by_the_belief_system_leave(availability_manager):
+    UserPresenceEventHandler().handle(snapshot("a", "b"))
+    UserPresenceEventHandler().handle(BeliefSystem([{"id": "a", "presence": True}, {"id": "b", "presence": False}]))
+    assert not availability_manager.availability_state["b"]["present"]
@@ -0,0 +1,66 @@
+import random
+import string
+
+import pytest
+
+from event_handlers import EventHandler
+from value_template import parse_template
+
+
+class Handler(EventHandler):
+
+    def handle(self, beliefSystem):
+        pass
+
+
+def reference(values: dict, futures: dict) -> dict:
+    # the updateParameters substitution the templates replaced
+    values = dict(values)
+    for k, v in values.items():
+        if v in futures.keys():
+            values[k] = futures[v]
+        else:
+            punctuation_to_strip = string.punctuation.replace("{", "").replace("}", "")
+            values[k] = ' '.join([
+                futures[w.strip(punctuation_to_strip)] if w.strip(punctuation_to_strip) in futures and futures[w.strip(punctuation_to_strip)] is not None else w
+                for w in v.split()
+            ])
+    return values
+
+
+def substituted(values: dict, futures: dict) -> dict:
+    handler = Handler()
+    handler.values = dict(values)
+    handler.scope().update(futures)
+    handler.updateParameters()
+    return handler.values
+
+
+CASES = [
+    ({"{text}": "hello {who}, how are you?"}, {"{who}": "bob"}),
+    ({"{text}": "say ok."}, {"ok": "fine"}),
+    ({"{text}": "{who}! {who}? ({who})"}, {"{who}": "alice"}),
+    ({"{text}": "  spaced   out\twords \n"}, {"out": "in"}),
+    ({"{text}": "nothing {set}"}, {"{set}": None}),
+    ({"{who}": "{user}"}, {"{user}": "carol"}),
+    ({"{who}": "{user}", "{where}": "to the {place}."}, {"{user}": "dave", "{place}": "kitchen"}),
+    ({"{text}": ""}, {"": "never"}),
+]
+
+
+@pytest.mark.parametrize("values, futures", CASES)
+def test_substitution_matches_the_original(values, futures):
+    assert substituted(values, futures) == reference(values, futures)
+
+
+def test_random_substitutions_match_the_original():
+    rand = random.Random(0)
+    words = ["{a}", "{b}", "a", "b.", "(c)", "{c}!", "hi", "?", "d,e", "{ x }"]
+    for _ in range(500):
+        futures = {key: rand.choice([None, "X", "two words", "{a}"]) for key in rand.sample(["{a}", "{b}", "a", "c", "{c}", "hi"], 3)}
+        values = {f"{{v{i}}}": " ".join(rand.choice(words) for _ in range(rand.randint(0, 6))) for i in range(3)}
+        assert substituted(values, futures) == reference(values, futures)
+
+
+def test_templates_are_parsed_once():
+    assert parse_template("hello {who}") is parse_template("hello {who}")